@@ -0,0 +1,249 @@
+"""Admission control for LLM-backed endpoints.
+
+Two layers keep one heavy user from degrading everyone else:
+
+1. Admission: a request declares how many LLM calls it will make. If that
+   would push its session or the server past the pending-call limits, it is
+   rejected up front with ``429`` and a ``Retry-After`` estimate, instead of
+   being accepted and served slowly.
+2. Scheduling: admitted calls wait for a slot. At most
+   ``MAX_CONCURRENT_LLM_CALLS`` run at once, and at most
+   ``MAX_SESSION_LLM_CALLS`` per session. Free slots go to waiting sessions
+   by weighted fair queuing, so a session with a 500-persona survey queued
+   gets its share, not the whole pool.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+
+from centuria.config import (
+    MAX_CONCURRENT_LLM_CALLS,
+    MAX_PENDING_LLM_CALLS,
+    MAX_SESSION_LLM_CALLS,
+    MAX_SESSION_PENDING_LLM_CALLS,
+)
+
+# Initial guess at LLM call latency (seconds), refined as calls complete
+DEFAULT_CALL_SECONDS = 3.0
+
+# Weight of the newest sample in the running call-latency average
+_LATENCY_SMOOTHING = 0.1
+
+
+class AdmissionRejected(Exception):
+    """The request would exceed a pending-call limit."""
+
+    def __init__(self, message: str, status_code: int = 429, retry_after: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """An admitted request's reservation of pending calls.
+
+    Release it (``with ticket:``) when the request finishes; ``gate`` is the
+    per-call slot factory to install with ``centuria.llm.call_gate``.
+    """
+
+    def __init__(self, controller: "AdmissionController", session_id: str, calls: int):
+        self.controller = controller
+        self.session_id = session_id
+        self.calls = calls
+        self._released = False
+
+    def gate(self):
+        return self.controller.slot(self.session_id)
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.controller._unreserve(self.session_id, self.calls)
+
+    def __enter__(self) -> "Ticket":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class AdmissionController:
+    """Pending-call limits plus weighted fair scheduling of LLM call slots."""
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_LLM_CALLS,
+        max_per_session: int = MAX_SESSION_LLM_CALLS,
+        max_pending: int = MAX_PENDING_LLM_CALLS,
+        max_session_pending: int = MAX_SESSION_PENDING_LLM_CALLS,
+        weight: Callable[[str], float] | None = None,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_session = max_per_session
+        self.max_pending = max_pending
+        self.max_session_pending = max_session_pending
+        self._weight = weight or (lambda session_id: 1.0)
+
+        self._pending = 0
+        self._session_pending: dict[str, int] = {}
+        self._running = 0
+        self._session_running: dict[str, int] = {}
+
+        # Weighted fair queuing: each waiting call gets a virtual finish tag;
+        # the lowest eligible tag is served next
+        self._virtual_time = 0.0
+        self._last_tag: dict[str, float] = {}
+        self._waiting: dict[str, deque[tuple[float, asyncio.Future]]] = {}
+
+        self._call_seconds = DEFAULT_CALL_SECONDS
+
+    # -- admission -----------------------------------------------------------
+
+    def admit(self, session_id: str, calls: int) -> Ticket:
+        """Reserve ``calls`` pending LLM calls for a request.
+
+        Raises:
+            AdmissionRejected: 413 if the request alone exceeds the session
+                limit, 429 (with ``retry_after``) if the session or server is
+                saturated
+        """
+        if calls > self.max_session_pending:
+            raise AdmissionRejected(
+                f"Request needs {calls} LLM calls; the limit per session is "
+                f"{self.max_session_pending}. Submit it as a background job instead.",
+                status_code=413,
+            )
+
+        session_pending = self._session_pending.get(session_id, 0)
+        session_excess = session_pending + calls - self.max_session_pending
+        if session_excess > 0:
+            raise AdmissionRejected(
+                "Too many LLM calls pending for this session",
+                retry_after=self._drain_seconds(session_excess, self.max_per_session),
+            )
+        global_excess = self._pending + calls - self.max_pending
+        if global_excess > 0:
+            raise AdmissionRejected(
+                "Server is at capacity",
+                retry_after=self._drain_seconds(global_excess, self.max_concurrent),
+            )
+
+        self._pending += calls
+        self._session_pending[session_id] = session_pending + calls
+        return Ticket(self, session_id, calls)
+
+    def _unreserve(self, session_id: str, calls: int) -> None:
+        self._pending -= calls
+        remaining = self._session_pending.get(session_id, 0) - calls
+        if remaining > 0:
+            self._session_pending[session_id] = remaining
+        else:
+            self._session_pending.pop(session_id, None)
+
+    def _drain_seconds(self, calls: int, parallelism: int) -> int:
+        """Rough seconds until ``calls`` pending calls have completed."""
+        return max(1, math.ceil(calls / max(1, parallelism) * self._call_seconds))
+
+    # -- scheduling ----------------------------------------------------------
+
+    @asynccontextmanager
+    async def slot(self, session_id: str) -> AsyncIterator[None]:
+        """Hold one of the server's LLM call slots for the duration of a call."""
+        await self._acquire(session_id)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self._call_seconds += _LATENCY_SMOOTHING * (elapsed - self._call_seconds)
+            self._release(session_id)
+
+    def _tag(self, session_id: str) -> float:
+        start = max(self._virtual_time, self._last_tag.get(session_id, 0.0))
+        tag = start + 1.0 / self._weight(session_id)
+        self._last_tag[session_id] = tag
+        return tag
+
+    def _has_capacity(self, session_id: str) -> bool:
+        return (
+            self._running < self.max_concurrent
+            and self._session_running.get(session_id, 0) < self.max_per_session
+        )
+
+    def _start(self, session_id: str, tag: float) -> None:
+        self._running += 1
+        self._session_running[session_id] = self._session_running.get(session_id, 0) + 1
+        self._virtual_time = max(self._virtual_time, tag)
+
+    async def _acquire(self, session_id: str) -> None:
+        tag = self._tag(session_id)
+        if self._has_capacity(session_id) and not self._waiting:
+            self._start(session_id, tag)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (tag, future)
+        self._waiting.setdefault(session_id, deque()).append(entry)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled: hand the slot back
+                self._release(session_id)
+            else:
+                queue = self._waiting.get(session_id)
+                if queue is not None and entry in queue:
+                    queue.remove(entry)
+                    if not queue:
+                        del self._waiting[session_id]
+            raise
+
+    def _release(self, session_id: str) -> None:
+        self._running -= 1
+        remaining = self._session_running.get(session_id, 0) - 1
+        if remaining > 0:
+            self._session_running[session_id] = remaining
+        else:
+            self._session_running.pop(session_id, None)
+            # An idle session's tag no longer affects scheduling once virtual time passes it
+            if session_id not in self._waiting and (
+                self._last_tag.get(session_id, 0.0) <= self._virtual_time
+            ):
+                self._last_tag.pop(session_id, None)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free slots to the waiting calls with the lowest tags."""
+        while self._running < self.max_concurrent:
+            best = None
+            for session_id, queue in self._waiting.items():
+                if self._session_running.get(session_id, 0) >= self.max_per_session:
+                    continue
+                if best is None or queue[0][0] < self._waiting[best][0][0]:
+                    best = session_id
+            if best is None:
+                return
+
+            queue = self._waiting[best]
+            tag, future = queue.popleft()
+            if not queue:
+                del self._waiting[best]
+            if future.cancelled():
+                continue
+            self._start(best, tag)
+            future.set_result(None)
+
+    def stats(self) -> dict:
+        """Current load, for monitoring."""
+        return {
+            "running": self._running,
+            "waiting": sum(len(q) for q in self._waiting.values()),
+            "pending": self._pending,
+            "sessions": len(self._session_pending),
+            "avg_call_seconds": round(self._call_seconds, 2),
+        }
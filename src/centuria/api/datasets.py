@@ -0,0 +1,243 @@
+"""In-memory cache for the JSON datasets served by the API.
+
+Each dataset is loaded once and kept as pre-serialised bytes with gzip (and,
+when the optional ``brotli`` package is installed, brotli) variants and a
+strong ETag per variant. The source is re-read only when its version - file
+mtimes and sizes - changes, so repeat page loads cost a stat call and either a
+memory copy or a ``304 Not Modified``.
+
+List datasets can also be served as field projections (``fields=``) in pages
+(``limit``/``cursor``). Projections are computed once per field set and each
+page is serialised once, so narrow views stay as cheap as the full document.
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # optional: gzip is always available
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+# Serialised variants kept per dataset (e.g. one per projection)
+MAX_ENTITIES_PER_DATASET = 64
+
+
+@dataclass(frozen=True)
+class Entity:
+    """A serialised JSON body with its precompressed variants."""
+
+    body: bytes
+    etag: str  # quoted strong ETag of the identity encoding
+    gzip: bytes | None
+    br: bytes | None
+
+    @classmethod
+    def from_data(cls, data: Any) -> "Entity":
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        compress = len(body) >= MIN_COMPRESS_BYTES
+        return cls(
+            body=body,
+            etag=f'"{digest}"',
+            gzip=gzip.compress(body, compresslevel=6, mtime=0) if compress else None,
+            br=brotli.compress(body, quality=9) if compress and brotli else None,
+        )
+
+    def variant(self, accept_encoding: str) -> tuple[bytes, str | None, str]:
+        """Pick (body, content-encoding, etag) for an Accept-Encoding header."""
+        accepted = {
+            token.split(";")[0].strip().lower() for token in accept_encoding.split(",")
+        }
+        if self.br is not None and "br" in accepted:
+            return self.br, "br", self.etag[:-1] + '-br"'
+        if self.gzip is not None and "gzip" in accepted:
+            return self.gzip, "gzip", self.etag[:-1] + '-gz"'
+        return self.body, None, self.etag
+
+    def matches(self, if_none_match: str) -> bool:
+        """Whether an If-None-Match header names any variant of this entity."""
+        if if_none_match.strip() == "*":
+            return True
+        base = self.etag[1:-1]
+        for tag in if_none_match.split(","):
+            tag = tag.strip().removeprefix("W/").strip('"')
+            if tag in (base, f"{base}-gz", f"{base}-br"):
+                return True
+        return False
+
+
+class Dataset:
+    """A JSON-compatible value loaded once and rebuilt when its source changes."""
+
+    def __init__(self, load: Callable[[], Any], version: Callable[[], Hashable]):
+        self._load = load
+        self._version = version
+        self._loaded_version: Hashable = None
+        self._data: Any = None
+        self._entities: OrderedDict[Hashable, Entity] = OrderedDict()
+        self._derived: dict[Hashable, Any] = {}
+
+    def data(self) -> Any:
+        """The current value, reloading it if the source version changed."""
+        version = self._version()
+        if self._data is None or version != self._loaded_version:
+            self._data = self._load()
+            self._loaded_version = version
+            self._entities.clear()
+            self._derived.clear()
+        return self._data
+
+    def derived(self, key: Hashable, build: Callable[[Any], Any]) -> Any:
+        """A value computed from the data (e.g. a projection), memoised until reload."""
+        data = self.data()
+        if key not in self._derived:
+            self._derived[key] = build(data)
+        return self._derived[key]
+
+    def entity(self, key: Hashable = None, build: Callable[[Any], Any] | None = None) -> Entity:
+        """Serialised form of ``build(data)`` (or the data itself), memoised per key."""
+        data = self.data()
+        entity = self._entities.get(key)
+        if entity is None:
+            entity = Entity.from_data(build(data) if build else data)
+            self._entities[key] = entity
+            if len(self._entities) > MAX_ENTITIES_PER_DATASET:
+                self._entities.popitem(last=False)
+        else:
+            self._entities.move_to_end(key)
+        return entity
+
+
+class InvalidPageError(ValueError):
+    """Unknown projection field or malformed cursor."""
+
+
+def encode_cursor(offset: int) -> str:
+    """Opaque cursor for the item at ``offset``."""
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> int:
+    """Offset encoded by encode_cursor (0 when there is no cursor)."""
+    if not cursor:
+        return 0
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, offset = raw.split(":", 1)
+        if prefix != "o" or int(offset) < 0:
+            raise ValueError
+        return int(offset)
+    except ValueError:
+        raise InvalidPageError(f"Invalid cursor: {cursor}") from None
+
+
+def parse_fields(fields: str | None) -> tuple[str, ...] | None:
+    """Parse a comma-separated ``fields=`` value (None means every field)."""
+    if not fields:
+        return None
+    return tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+
+
+def page_entity(
+    dataset: Dataset,
+    list_key: str,
+    fields: tuple[str, ...] | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> Entity:
+    """Serve ``dataset[list_key]`` projected to ``fields`` and sliced into a page.
+
+    Other top-level keys of the dataset are kept. Paged responses carry a
+    ``next_cursor`` (null on the last page).
+
+    Raises:
+        InvalidPageError: If a field is unknown or the cursor is malformed
+    """
+    if fields is None and limit is None and cursor is None:
+        return dataset.entity()
+
+    offset = decode_cursor(cursor)
+    if fields is not None:
+        known = dataset.derived(
+            ("fields", list_key), lambda d: {k for item in d[list_key] for k in item}
+        )
+        unknown = [f for f in fields if f not in known]
+        if unknown:
+            raise InvalidPageError(f"Unknown fields: {', '.join(unknown)}")
+
+    def build(data: dict) -> dict:
+        items = dataset.derived(
+            ("projection", list_key, fields),
+            lambda d: d[list_key] if fields is None else [
+                {f: item[f] for f in fields if f in item} for item in d[list_key]
+            ],
+        )
+        end = len(items) if limit is None else offset + limit
+        body = {k: v for k, v in data.items() if k != list_key}
+        body[list_key] = items[offset:end]
+        body["next_cursor"] = encode_cursor(end) if end < len(items) else None
+        return body
+
+    return dataset.entity(("page", list_key, fields, offset, limit), build)
+
+
+def file_version(path: Path) -> Hashable:
+    """Version of a single file: (mtime_ns, size), or None if it is missing."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def directory_version(path: Path) -> Hashable:
+    """Version of a directory's visible files, so edits, additions and removals all count."""
+    try:
+        return tuple(
+            (f.name, f.stat().st_mtime_ns, f.stat().st_size)
+            for f in sorted(path.iterdir())
+            if f.is_file() and not f.name.startswith(".")
+        )
+    except FileNotFoundError:
+        return None
+
+
+def json_file_dataset(path: Path) -> Dataset:
+    """Dataset backed by a JSON file."""
+
+    def load() -> Any:
+        with open(path) as f:
+            return json.load(f)
+
+    return Dataset(load, lambda: file_version(path))
+
+
+def cached_response(request: Request, entity: Entity) -> Response:
+    """Serve an entity with ETag revalidation and the best accepted encoding."""
+    body, encoding, etag = entity.variant(request.headers.get("accept-encoding", ""))
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",  # always revalidate; unchanged data costs a 304
+        "Vary": "Accept-Encoding",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and entity.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,432 @@
+"""Background survey jobs.
+
+Surveys submitted as jobs run on an in-process worker pool instead of inside
+the HTTP request, so they survive proxy timeouts and closed browser tabs.
+Job state and every completed response are written to a local SQLite file as
+they arrive.
+
+Every uvicorn worker process runs its own ``JobManager`` on the shared file.
+A worker runs a job only after claiming it (an atomic queued -> running
+update), and keeps a heartbeat on it while it runs, so each job runs once.
+Jobs left queued, or running under a worker that stopped heartbeating (a
+crash), are picked up by the next worker that polls and resume from the
+personas that have not answered yet. Resuming needs the session's API keys,
+so it only works across restarts with a persistent session store
+(``SESSION_BACKEND=sqlite``); otherwise the job fails with a clear reason.
+
+A persona whose call fails is recorded with an ``error`` in place of its
+answer, and the job goes on without it.
+
+Given the server's ``AdmissionController``, a job's calls share the server's
+LLM call slots with interactive requests and count against its session's
+limits: a running job reserves as many pending calls as it keeps in flight.
+"""
+
+import asyncio
+import json
+import os
+import secrets
+import sqlite3
+import time
+from collections.abc import Callable
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+
+from centuria.api.admission import AdmissionController, AdmissionRejected, Ticket
+from centuria.config import (
+    SURVEY_JOB_CONCURRENCY,
+    SURVEY_JOB_LEASE,
+    SURVEY_JOB_POLL_INTERVAL,
+    SURVEY_JOB_WORKERS,
+)
+from centuria.llm import call_gate
+from centuria.models import Persona, Question
+from centuria.survey import stream_question
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATUSES = {COMPLETED, FAILED, CANCELLED}
+
+MISSING_KEYS_ERROR = (
+    "No API keys for this job's session: it expired, or the server restarted and"
+    " sessions are kept in memory (set SESSION_BACKEND=sqlite to keep them)."
+    " Submit the job again."
+)
+
+
+@dataclass
+class Job:
+    """A survey job and its progress."""
+
+    id: str
+    status: str
+    session_id: str | None
+    request: dict  # SurveyRequest payload: {"question": {...}, "personas": [...]}
+    total: int
+    completed: int
+    total_cost: float
+    error: str | None
+    created_at: float
+    updated_at: float
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    session_id TEXT,
+    request TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    total_cost REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    owner TEXT,
+    heartbeat REAL
+);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id TEXT NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    persona_id TEXT NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status);
+"""
+
+# Columns added since the first schema, for job files created before them
+_ADDED_COLUMNS = {"owner": "TEXT", "heartbeat": "REAL"}
+
+
+class JobStore:
+    """SQLite-backed persistence for jobs and their partial results."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for name, kind in _ADDED_COLUMNS.items():
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def create(self, request: dict, session_id: str | None) -> Job:
+        """Insert a new queued job."""
+        now = time.time()
+        job_id = secrets.token_urlsafe(16)
+        self._conn.execute(
+            "INSERT INTO jobs (id, status, session_id, request, total, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, QUEUED, session_id, json.dumps(request), len(request["personas"]), now, now),
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Job | None:
+        row = self._conn.execute(
+            "SELECT *, (SELECT COUNT(*) FROM job_results WHERE job_id = jobs.id) AS completed"
+            " FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return Job(
+            id=row["id"],
+            status=row["status"],
+            session_id=row["session_id"],
+            request=json.loads(row["request"]),
+            total=row["total"],
+            completed=row["completed"],
+            total_cost=row["total_cost"],
+            error=row["error"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+
+    def claim(self, job_id: str, owner: str, lease: float = SURVEY_JOB_LEASE) -> bool:
+        """Mark a job running under ``owner``, if it is queued or its runner died.
+
+        Atomic across processes: of several workers claiming one job, exactly
+        one gets True.
+        """
+        now = time.time()
+        cursor = self._conn.execute(
+            "UPDATE jobs SET status = ?, owner = ?, heartbeat = ?, updated_at = ?"
+            " WHERE id = ? AND (status = ? OR (status = ? AND COALESCE(heartbeat, 0) < ?))",
+            (RUNNING, owner, now, now, job_id, QUEUED, RUNNING, now - lease),
+        )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, job_id: str, owner: str) -> bool:
+        """Renew ``owner``'s claim; False if the job was cancelled or taken over."""
+        cursor = self._conn.execute(
+            "UPDATE jobs SET heartbeat = ? WHERE id = ? AND owner = ? AND status = ?",
+            (time.time(), job_id, owner, RUNNING),
+        )
+        return cursor.rowcount == 1
+
+    def release(self, job_id: str, owner: str) -> None:
+        """Put a job ``owner`` is running back in the queue (on shutdown)."""
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, owner = NULL, heartbeat = NULL, updated_at = ?"
+            " WHERE id = ? AND owner = ? AND status = ?",
+            (QUEUED, time.time(), job_id, owner, RUNNING),
+        )
+
+    def finish(self, job_id: str, owner: str, status: str, error: str | None = None) -> bool:
+        """End a job ``owner`` is running. A cancelled job stays cancelled."""
+        cursor = self._conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ?"
+            " WHERE id = ? AND owner = ? AND status = ?",
+            (status, error, time.time(), job_id, owner, RUNNING),
+        )
+        return cursor.rowcount == 1
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; False if it had already finished."""
+        cursor = self._conn.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+            (CANCELLED, time.time(), job_id, QUEUED, RUNNING),
+        )
+        return cursor.rowcount == 1
+
+    def add_result(self, job_id: str, result: dict, owner: str | None = None) -> bool:
+        """Record one persona's response and add its cost to the job total.
+
+        With ``owner``, the result is only recorded (and True returned) while
+        that worker still runs the job, so nothing is added after a cancel.
+        """
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            if owner is not None:
+                running = self._conn.execute(
+                    "SELECT 1 FROM jobs WHERE id = ? AND owner = ? AND status = ?",
+                    (job_id, owner, RUNNING),
+                ).fetchone()
+                if running is None:
+                    return False
+            self._conn.execute(
+                "INSERT INTO job_results (job_id, seq, persona_id, result) VALUES"
+                " (?, (SELECT COUNT(*) FROM job_results WHERE job_id = ?), ?, ?)",
+                (job_id, job_id, result["persona_id"], json.dumps(result)),
+            )
+            self._conn.execute(
+                "UPDATE jobs SET total_cost = total_cost + ?, updated_at = ? WHERE id = ?",
+                (result.get("cost", 0.0), time.time(), job_id),
+            )
+        return True
+
+    def results(self, job_id: str) -> list[dict]:
+        """Responses (and failures, with an ``error``) recorded so far, in completion order."""
+        rows = self._conn.execute(
+            "SELECT result FROM job_results WHERE job_id = ? ORDER BY seq", (job_id,)
+        ).fetchall()
+        return [json.loads(row["result"]) for row in rows]
+
+    def claimable(self, lease: float = SURVEY_JOB_LEASE) -> list[str]:
+        """IDs of queued jobs and of running jobs whose runner died, oldest first."""
+        rows = self._conn.execute(
+            "SELECT id FROM jobs WHERE status = ? OR (status = ? AND COALESCE(heartbeat, 0) < ?)"
+            " ORDER BY created_at",
+            (QUEUED, RUNNING, time.time() - lease),
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+
+class JobManager:
+    """Runs queued survey jobs on a pool of asyncio workers.
+
+    Several managers (one per worker process) can share one ``JobStore``;
+    jobs are claimed before they run, so each runs in one place only.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        get_api_keys: Callable[[str | None], dict[str, str]],
+        workers: int = SURVEY_JOB_WORKERS,
+        concurrency: int = SURVEY_JOB_CONCURRENCY,
+        poll_interval: float = SURVEY_JOB_POLL_INTERVAL,
+        lease: float = SURVEY_JOB_LEASE,
+        admission: AdmissionController | None = None,
+    ):
+        self.store = store
+        self.get_api_keys = get_api_keys
+        self.admission = admission
+        self.num_workers = workers
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease = lease
+        # Identifies this manager's claims in the shared job table
+        self.owner = f"{os.getpid()}-{secrets.token_hex(4)}"
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._queued: set[str] = set()
+        self._tasks: list[asyncio.Task] = []
+        self._running: dict[str, asyncio.Task] = {}
+        self._cancelled: set[str] = set()
+
+    async def start(self) -> None:
+        """Start the workers, queueing jobs left unfinished by a previous run."""
+        self._enqueue_claimable()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.num_workers)]
+        self._tasks.append(asyncio.create_task(self._poll()))
+
+    async def stop(self) -> None:
+        """Stop the workers. Running jobs go back to queued for the next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, request: dict, session_id: str | None) -> Job:
+        """Persist a new survey job and queue it."""
+        job = self.store.create(request, session_id)
+        self._enqueue(job.id)
+        return job
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Cancel a queued or running job. Finished jobs are left unchanged.
+
+        A job running in another worker process stops at that worker's next
+        poll, and records no more results in the meantime.
+        """
+        if self.store.cancel(job_id):
+            task = self._running.get(job_id)
+            if task is not None:
+                self._cancelled.add(job_id)
+                task.cancel()
+        return self.store.get(job_id)
+
+    def _enqueue(self, job_id: str) -> None:
+        if job_id not in self._queued:
+            self._queued.add(job_id)
+            self._queue.put_nowait(job_id)
+
+    def _enqueue_claimable(self) -> None:
+        for job_id in self.store.claimable(self.lease):
+            if job_id not in self._running:
+                self._enqueue(job_id)
+
+    async def _poll(self) -> None:
+        """Heartbeat running jobs and pick up jobs queued by other processes."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            for job_id, task in list(self._running.items()):
+                if not self.store.heartbeat(job_id, self.owner):
+                    # Cancelled through another worker process
+                    self._cancelled.add(job_id)
+                    task.cancel()
+            self._enqueue_claimable()
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._queued.discard(job_id)
+            try:
+                if not self.store.claim(job_id, self.owner, self.lease):
+                    # Cancelled, or claimed by another worker
+                    continue
+                task = asyncio.create_task(self._run(self.store.get(job_id)))
+                self._running[job_id] = task
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    if asyncio.current_task().cancelling():
+                        # Shutdown rather than a user cancel: resume on next start
+                        if job_id not in self._cancelled:
+                            self.store.release(job_id, self.owner)
+                        raise
+                finally:
+                    self._running.pop(job_id, None)
+                    self._cancelled.discard(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        api_keys = self.get_api_keys(job.session_id)
+        if not any(api_keys.values()):
+            self.store.finish(job.id, self.owner, FAILED, MISSING_KEYS_ERROR)
+            return
+
+        q = job.request["question"]
+        question = Question(
+            id=q["question_id"],
+            text=q["question_text"],
+            question_type="single_select",
+            options=q["options"],
+        )
+
+        # Resume: skip personas that already answered before a restart
+        answered = {r["persona_id"] for r in self.store.results(job.id)}
+        personas = [
+            Persona(id=p["id"], name=p["name"], context=p["context"])
+            for p in job.request["personas"]
+            if p["id"] not in answered
+        ]
+
+        if not personas:
+            self.store.finish(job.id, self.owner, COMPLETED)
+            return
+        ticket = await self._admit(job.session_id, min(self.concurrency, len(personas)))
+        concurrency = ticket.calls if ticket else self.concurrency
+        try:
+            with ticket or nullcontext(), call_gate(ticket.gate if ticket else None):
+                async for persona, result in stream_question(
+                    personas,
+                    question,
+                    model=q.get("model"),
+                    api_keys=api_keys,
+                    concurrency=concurrency,
+                    return_exceptions=True,
+                ):
+                    if isinstance(result, Exception):
+                        # One persona's call failed (rate limit, bad reply...): the rest go on
+                        entry = {
+                            "persona_id": persona.id,
+                            "persona_name": persona.name,
+                            "error": str(result),
+                            "cost": 0.0,
+                        }
+                    else:
+                        entry = {
+                            "persona_id": persona.id,
+                            "persona_name": persona.name,
+                            "response": result.response,
+                            "justification": result.justification,
+                            "cost": result.cost,
+                        }
+                    recorded = self.store.add_result(job.id, entry, owner=self.owner)
+                    if not recorded:
+                        # Cancelled elsewhere; leaving the loop cancels the pending calls
+                        return
+        except Exception as e:
+            self.store.finish(job.id, self.owner, FAILED, str(e))
+            return
+
+        self.store.finish(job.id, self.owner, COMPLETED)
+
+    async def _admit(self, session_id: str | None, calls: int) -> Ticket | None:
+        """Reserve the job's in-flight calls, waiting while the session or server is full.
+
+        A job never needs more than the limits allow: it keeps fewer calls in
+        flight instead.
+        """
+        if self.admission is None:
+            return None
+        calls = min(calls, self.admission.max_session_pending, self.admission.max_pending)
+        while True:
+            try:
+                return self.admission.admit(session_id or "anonymous", calls)
+            except AdmissionRejected:
+                await asyncio.sleep(self.poll_interval)
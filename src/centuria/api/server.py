@@ -1,32 +1,69 @@
 """Simple FastAPI server for Centuria experiments."""
 
 import asyncio
-import base64
+import hashlib
 import json
+import math
 import os
-import secrets
-from contextlib import asynccontextmanager
+import re
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
 from pathlib import Path
 
 from dotenv import load_dotenv
-from fastapi import Cookie, FastAPI, Response
+from fastapi import Cookie, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-from google import genai
-from PIL import Image
-
+from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
+
+from centuria.api.admission import AdmissionController, AdmissionRejected, Ticket
+from centuria.api.datasets import (
+    Dataset,
+    InvalidPageError,
+    cached_response,
+    directory_version,
+    file_version,
+    json_file_dataset,
+    page_entity,
+    parse_fields,
+)
+from centuria.api.jobs import JobManager, JobStore
+from centuria.api.sessions import create_session_store
 from centuria.config import (
+    CLASSIFY_BATCH_SIZE,
     DEFAULT_MODEL,
+    DISCONNECT_POLL_INTERVAL,
+    GENERATE_PERSONA_DEADLINE,
+    GENERATE_PERSONAS_DEADLINE,
+    IMAGE_GENERATION_MODEL,
+    MAX_PAGE_SIZE,
+    MAX_PERSONA_BATCH,
     OCCUPATION_CATEGORIES,
+    OCCUPATION_CLASSIFIER_MIN_CONFIDENCE,
+    PERSONA_BATCH_CONCURRENCY,
+    SURVEY_RUN_DEADLINE,
+    SURVEY_STREAM_TALLY_INTERVAL,
     get_available_models,
     get_cors_origins,
     match_occupation_category,
 )
-from centuria.llm.client import complete
+from centuria.data.bundle import PersonaBundle, index_path
+from centuria.data.populations import (
+    POPULATIONS,
+    UnknownPersonaError,
+    UnknownPopulationError,
+    persona_store,
+)
+from centuria.llm import DeadlineExceeded, call_gate, complete, deadline
 from centuria.models import Persona, Question, Survey
-from centuria.survey import ask_question, estimate_survey_cost
+from centuria.persona.occupations import default_classifier
+from centuria.store import InvalidFilterError
+from centuria.survey import ask_question, estimate_survey_cost, stream_question
 from centuria.utils import parse_json_response
 
 # =============================================================================
@@ -71,6 +108,48 @@ def format_classify_prompt(occupation: str, brief: str) -> str:
         categories=categories_list,
     )
 
+
+OCCUPATION_CLASSIFY_BATCH_PROMPT = """Classify each person's occupation into exactly one category.
+
+People:
+{people}
+
+Categories:
+{categories}
+
+Return ONLY a JSON array of {count} category names, one per person, in the same order."""
+
+
+def format_classify_batch_prompt(people: list[tuple[str, str]]) -> str:
+    """Format a packed classification prompt for (occupation, brief) pairs."""
+    categories_list = "\n".join(f"- {cat}" for cat in OCCUPATION_CATEGORIES)
+    people_list = "\n".join(
+        f"{i}. {occupation}: {brief}" for i, (occupation, brief) in enumerate(people, 1)
+    )
+    return OCCUPATION_CLASSIFY_BATCH_PROMPT.format(
+        people=people_list,
+        categories=categories_list,
+        count=len(people),
+    )
+
+
+# Classifies occupations without an LLM call when it is confident enough; LLM
+# answers are fed back so repeats such as "Nurse" never cost another call
+_occupation_classifier = default_classifier()
+
+
+def classify_occupation_locally(occupation: str) -> str | None:
+    """The category for an occupation, or None if it needs the LLM."""
+    match = _occupation_classifier.classify(occupation)
+    if match.confidence >= OCCUPATION_CLASSIFIER_MIN_CONFIDENCE:
+        return match.category
+    return None
+
+
+def remember_occupation(occupation: str, category: str) -> None:
+    _occupation_classifier.learn(occupation, category)
+
+
 # Load .env from project root
 _project_root = Path(__file__).parent.parent.parent.parent
 load_dotenv(_project_root / ".env")
@@ -78,22 +157,25 @@ load_dotenv(_project_root / ".env")
 # =============================================================================
 # Session-based API Key Storage
 # =============================================================================
-# Store API keys per-session to prevent key leakage between users
-_session_keys: dict[str, dict[str, str]] = {}
+# Store API keys per-session to prevent key leakage between users. Sessions
+# expire after SESSION_TTL; set SESSION_BACKEND=sqlite to share them between
+# uvicorn workers (see centuria.api.sessions)
+_sessions_db_path = Path(
+    os.getenv("SESSION_DB_PATH", _project_root / ".cache" / "sessions.sqlite3")
+)
+_sessions = create_session_store(_sessions_db_path)
 
 
 def get_or_create_session(session_id: str | None) -> str:
     """Get existing session or create a new one."""
-    if session_id and session_id in _session_keys:
+    if session_id and _sessions.touch(session_id):
         return session_id
-    new_session = secrets.token_urlsafe(32)
-    _session_keys[new_session] = {}
-    return new_session
+    return _sessions.create()
 
 
 def get_session_keys(session_id: str | None) -> dict[str, str]:
     """Get API keys for a session (no fallback to env vars for user isolation)."""
-    session_keys = _session_keys.get(session_id, {}) if session_id else {}
+    session_keys = _sessions.get_keys(session_id) if session_id else {}
     return {
         "openai": session_keys.get("openai", ""),
         "anthropic": session_keys.get("anthropic", ""),
@@ -103,27 +185,79 @@ def get_session_keys(session_id: str | None) -> dict[str, str]:
 
 def set_session_key(session_id: str, provider: str, key: str) -> None:
     """Set an API key for a session."""
-    if session_id not in _session_keys:
-        _session_keys[session_id] = {}
-    _session_keys[session_id][provider] = key
+    _sessions.set_key(session_id, provider, key)
+
+
+# Server-wide and per-session limits on LLM calls; see centuria.api.admission
+_admission = AdmissionController()
+
+
+def admit(session_id: str | None, calls: int) -> Ticket:
+    """Reserve capacity for a request that will make ``calls`` LLM calls.
+
+    Raises:
+        HTTPException: 429 with Retry-After when saturated, 413 if too large
+    """
+    try:
+        return _admission.admit(session_id or "anonymous", calls)
+    except AdmissionRejected as e:
+        headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=headers) from e
+
+
+@contextmanager
+def admitted(session_id: str | None, calls: int) -> Iterator[Ticket]:
+    """Admit a request, scheduling every complete() call made inside the block.
+
+    Calls in tasks created inside the block wait for a fairly scheduled slot
+    too. The reservation is released when the block exits.
+    """
+    with admit(session_id, calls) as ticket, call_gate(ticket.gate):
+        yield ticket
+
+
+async def run_cancellable(request: Request, coro, timeout: float | None = None):
+    """Run a coroutine on behalf of an HTTP request.
+
+    The work (and every LLM call it has gathered) is cancelled as soon as the
+    client disconnects, so nobody pays for answers that will never be read.
+    ``timeout`` sets a total budget shared by all complete() calls inside.
+    """
+    with deadline(timeout):
+        task = asyncio.ensure_future(coro)
+    try:
+        while not task.done():
+            await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if not task.done() and await request.is_disconnected():
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client disconnected")
+        return task.result()
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
+    finally:
+        task.cancel()
 
 
 class GeneratedPersona(BaseModel):
-    """A generated persona with location and classifications."""
+    """A generated persona with location and classifications.
+
+    Also the response model for ``PERSONA_GENERATION_PROMPT``; fields the LLM
+    may leave out have defaults.
+    """
 
     name: str
     age: int
-    gender: str
-    occupation: str
-    occupation_category: str
-    education: str
-    political_leaning: str
+    gender: str = "Unknown"
+    occupation: str = "Unknown"
+    occupation_category: str = "Other"
+    education: str = "Unknown"
+    political_leaning: str = "Unknown"
     location: str
-    country: str
-    continent: str
+    country: str = "Unknown"
+    continent: str = "Unknown"
     latitude: float
     longitude: float
-    brief: str
+    brief: str = ""
 
 
 class GenerateRequest(BaseModel):
@@ -132,9 +266,25 @@ class GenerateRequest(BaseModel):
     model: str = DEFAULT_MODEL
 
 
+# =============================================================================
+# Background Survey Jobs
+# =============================================================================
+# Persisted locally so queued and running jobs resume after a restart
+_jobs_db_path = Path(os.getenv("JOBS_DB_PATH", _project_root / ".cache" / "jobs.sqlite3"))
+_job_manager: JobManager | None = None
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    yield
+    global _job_manager
+    store = JobStore(_jobs_db_path)
+    _job_manager = JobManager(store, get_api_keys=get_session_keys, admission=_admission)
+    await _job_manager.start()
+    try:
+        yield
+    finally:
+        await _job_manager.stop()
+        store.close()
 
 
 app = FastAPI(title="Centuria API", lifespan=lifespan)
@@ -166,8 +316,11 @@ async def root():
             "/api/health",
             "/api/models",
             "/api/generate-persona",
+            "/api/generate-personas",
             "/api/survey/run",
+            "/api/survey/run/stream",
             "/api/survey/estimate",
+            "/api/jobs/survey",
         ]
     }
 
@@ -281,44 +434,222 @@ async def get_occupation_categories():
     return {"categories": OCCUPATION_CATEGORIES}
 
 
+# Calls one generation can make: complete(response_model=...) retries once on a malformed reply
+_GENERATE_CALLS = 2
+
+
 @app.post("/api/generate-persona", response_model=GeneratedPersona)
-async def generate_persona(
+async def generate_persona_endpoint(
+    http_request: Request,
     request: GenerateRequest = None,
     centuria_session: str | None = Cookie(default=None),
 ):
     """Generate a random persona using a naive LLM prompt, then classify."""
     model = request.model if request else DEFAULT_MODEL
     api_keys = get_session_keys(centuria_session)
+    # One generation, one call to classify
+    with admitted(centuria_session, calls=_GENERATE_CALLS + 1):
+        return await run_cancellable(
+            http_request, generate_persona(model, api_keys), timeout=GENERATE_PERSONA_DEADLINE
+        )
+
+
+async def generate_persona(model: str, api_keys: dict[str, str]) -> GeneratedPersona:
+    """Generate a random persona, then classify its occupation."""
 
     # Step 1: Generate the base persona
+    persona = await generate_unclassified_persona(model, api_keys)
+
+    # Step 2: Classify occupation (no call needed if it has been seen before)
+    category = classify_occupation_locally(persona.occupation)
+    if category is None:
+        classify_result = await complete(
+            prompt=format_classify_prompt(occupation=persona.occupation, brief=persona.brief),
+            model=model,
+            api_keys=api_keys,
+        )
+        category = match_occupation_category(classify_result.content.strip())
+        remember_occupation(persona.occupation, category)
+
+    persona.occupation_category = category
+    return persona
+
+
+async def generate_unclassified_persona(model: str, api_keys: dict[str, str]) -> GeneratedPersona:
+    """Generate a random persona; its occupation_category is left as "Other"."""
     result = await complete(
         prompt=PERSONA_GENERATION_PROMPT,
         model=model,
         api_keys=api_keys,
+        response_model=GeneratedPersona,
     )
-    persona_data = parse_json_response(result.content)
-
-    # Step 2: Classify occupation
-    classify_result = await complete(
-        prompt=format_classify_prompt(
-            occupation=persona_data.get("occupation", "Unknown"),
-            brief=persona_data.get("brief", ""),
-        ),
-        model=model,
-        api_keys=api_keys,
-    )
-    category = match_occupation_category(classify_result.content.strip())
+    persona = result.parsed
+    persona.occupation_category = "Other"
+    return persona
 
-    persona_data["occupation_category"] = category
 
-    # Ensure all required fields have defaults
-    persona_data.setdefault("gender", "Unknown")
-    persona_data.setdefault("education", "Unknown")
-    persona_data.setdefault("political_leaning", "Unknown")
-    persona_data.setdefault("country", "Unknown")
-    persona_data.setdefault("continent", "Unknown")
+async def classify_occupations(
+    personas: list[GeneratedPersona], model: str, api_keys: dict[str, str]
+) -> list[str]:
+    """Classify several personas' occupations with one packed LLM call.
 
-    return GeneratedPersona(**persona_data)
+    Answers that are missing or unparseable fall back to "Other".
+    """
+    result = await complete(
+        prompt=format_classify_batch_prompt([(p.occupation, p.brief) for p in personas]),
+        model=model,
+        api_keys=api_keys,
+    )
+    try:
+        labels = parse_json_response(result.content)
+    except json.JSONDecodeError:
+        labels = []
+    if not isinstance(labels, list):
+        labels = []
+
+    categories = []
+    for i, persona in enumerate(personas):
+        if i < len(labels) and isinstance(labels[i], str):
+            category = match_occupation_category(labels[i].strip())
+            remember_occupation(persona.occupation, category)
+        else:
+            category = "Other"
+        categories.append(category)
+    return categories
+
+
+class PersonaBatchFailure(BaseModel):
+    """One persona in a batch that could not be generated."""
+
+    detail: str
+
+
+class PersonaBatchSummary(BaseModel):
+    """Final event of a batch generation stream."""
+
+    requested: int
+    generated: int
+    failed: int
+    detail: str | None = None
+
+
+async def generate_personas(
+    n: int,
+    model: str,
+    api_keys: dict[str, str],
+    concurrency: int = PERSONA_BATCH_CONCURRENCY,
+    classify_batch_size: int = CLASSIFY_BATCH_SIZE,
+) -> AsyncIterator[GeneratedPersona | PersonaBatchFailure]:
+    """Generate ``n`` personas, yielding each as soon as it is classified.
+
+    At most ``concurrency`` generation calls run at once. Occupations seen
+    before are classified locally; the rest are classified
+    ``classify_batch_size`` at a time in one packed call, sent as soon as a
+    batch fills (or generation finishes), while generation continues.
+    Personas arrive in completion order. Work still pending when the consumer
+    stops iterating is cancelled.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def generate() -> GeneratedPersona:
+        async with semaphore:
+            return await generate_unclassified_persona(model, api_keys)
+
+    generating = {asyncio.ensure_future(generate()) for _ in range(n)}
+    classifying: dict[asyncio.Future, list[GeneratedPersona]] = {}
+    unclassified: list[GeneratedPersona] = []
+    try:
+        while generating or classifying:
+            done, _ = await asyncio.wait(
+                generating | classifying.keys(), return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task in generating:
+                    generating.discard(task)
+                    try:
+                        persona = task.result()
+                    except DeadlineExceeded:
+                        raise
+                    except Exception as e:
+                        yield PersonaBatchFailure(detail=str(e))
+                        continue
+                    category = classify_occupation_locally(persona.occupation)
+                    if category is None:
+                        unclassified.append(persona)
+                    else:
+                        persona.occupation_category = category
+                        yield persona
+                else:
+                    personas = classifying.pop(task)
+                    try:
+                        categories = task.result()
+                    except DeadlineExceeded:
+                        raise
+                    except Exception:
+                        # The personas themselves are fine; keep them unclassified
+                        categories = ["Other"] * len(personas)
+                    for persona, category in zip(personas, categories):
+                        persona.occupation_category = category
+                        yield persona
+
+            # Send full batches, and whatever is left once generation is done
+            while len(unclassified) >= classify_batch_size or (unclassified and not generating):
+                batch = unclassified[:classify_batch_size]
+                del unclassified[:classify_batch_size]
+                future = asyncio.ensure_future(classify_occupations(batch, model, api_keys))
+                classifying[future] = batch
+    finally:
+        for task in generating | classifying.keys():
+            task.cancel()
+
+
+@app.post("/api/generate-personas")
+async def generate_personas_endpoint(
+    request: GenerateRequest = None,
+    n: int = Query(default=10, ge=1, le=MAX_PERSONA_BATCH, description="Personas to generate"),
+    centuria_session: str | None = Cookie(default=None),
+):
+    """Generate ``n`` random personas, streaming each as a server-sent event.
+
+    Emits a ``persona`` event per classified persona in completion order, a
+    ``failed`` event for each generation that could not be parsed, and a
+    final ``summary`` event. If the batch passes GENERATE_PERSONAS_DEADLINE an
+    ``error`` event replaces the summary. Pending calls are cancelled when
+    the client disconnects.
+    """
+    model = request.model if request else DEFAULT_MODEL
+    api_keys = get_session_keys(centuria_session)
+    # One generation per persona, plus at most one packed classification per batch
+    ticket = admit(centuria_session, calls=_GENERATE_CALLS * n + math.ceil(n / CLASSIFY_BATCH_SIZE))
+
+    async def events():
+        generated = failed = 0
+        try:
+            with deadline(GENERATE_PERSONAS_DEADLINE), call_gate(ticket.gate):
+                async for item in generate_personas(n, model, api_keys):
+                    if isinstance(item, GeneratedPersona):
+                        generated += 1
+                        yield _sse("persona", item)
+                    else:
+                        failed += 1
+                        yield _sse("failed", item)
+        except DeadlineExceeded as e:
+            summary = PersonaBatchSummary(
+                requested=n, generated=generated, failed=failed, detail=str(e)
+            )
+            yield _sse("error", summary)
+            return
+        finally:
+            ticket.release()
+
+        yield _sse("summary", PersonaBatchSummary(requested=n, generated=generated, failed=failed))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(ticket.release),
+    )
 
 
 # ============================================================================
@@ -344,20 +675,59 @@ class PersonaData(BaseModel):
 
 
 class SurveyRequest(BaseModel):
-    """Request for running a survey on multiple personas."""
+    """Request for running a survey on multiple personas.
+
+    Either send full ``personas``, or reference a server-side population with
+    ``population_id`` and optional ``persona_ids`` or demographic ``filters``
+    (see centuria.data.query); omit both for everyone.
+    """
 
     question: SurveyQuestionRequest
-    personas: list[PersonaData]
+    personas: list[PersonaData] = []
+    population_id: str | None = None
+    persona_ids: list[str] | None = None
+    filters: dict | None = None
 
 
 class SurveyEstimateRequest(BaseModel):
-    """Request for estimating survey cost."""
+    """Request for estimating survey cost.
+
+    The sample persona is either sent in full or referenced by
+    ``population_id`` and ``sample_persona_id``; a full persona wins.
+    """
 
     question: SurveyQuestionRequest
-    sample_persona: PersonaData
+    sample_persona: PersonaData | None = None
+    population_id: str | None = None
+    sample_persona_id: str | None = None
     num_personas: int
 
 
+def resolve_personas(
+    personas: list[PersonaData],
+    population_id: str | None,
+    persona_ids: list[str] | None,
+    filters: dict | None = None,
+) -> list[Persona]:
+    """Build survey personas from inline data or a server-side population."""
+    if population_id is None:
+        return [Persona(id=p.id, name=p.name, context=p.context) for p in personas]
+    try:
+        if filters:
+            matching = persona_store.query_ids(population_id, filters)
+            if persona_ids is not None:
+                wanted = set(persona_ids)
+                matching = [pid for pid in matching if pid in wanted]
+            persona_ids = matching
+        return persona_store.get_personas(population_id, persona_ids)
+    except InvalidFilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UnknownPopulationError:
+        raise HTTPException(status_code=404, detail=f"Unknown population: {population_id}")
+    except UnknownPersonaError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown persona IDs: {e.args[0]}")
+
+
 class SurveyResponse(BaseModel):
     """Response for a single persona."""
 
@@ -375,6 +745,36 @@ class SurveyResultsResponse(BaseModel):
     total_cost: float
 
 
+class SurveyTally(BaseModel):
+    """Running vote counts and cost while a survey streams."""
+
+    completed: int
+    total: int
+    tallies: dict[str, int]
+    total_cost: float
+    failed: int = 0
+
+
+class SurveyFailure(BaseModel):
+    """One persona in a streamed survey whose call failed."""
+
+    persona_id: str
+    persona_name: str
+    detail: str
+
+
+class SurveySummary(SurveyTally):
+    """Final event of a streamed survey."""
+
+    responses: list[SurveyResponse]
+
+
+class SurveyStreamError(SurveyTally):
+    """Final event of a streamed survey that could not finish."""
+
+    detail: str
+
+
 class EstimateResponse(BaseModel):
     """Cost estimate response."""
 
@@ -388,11 +788,15 @@ class EstimateResponse(BaseModel):
 @app.post("/api/survey/estimate", response_model=EstimateResponse)
 async def estimate_survey(request: SurveyEstimateRequest):
     """Estimate the cost of running a survey before executing it."""
-    persona = Persona(
-        id=request.sample_persona.id,
-        name=request.sample_persona.name,
-        context=request.sample_persona.context,
-    )
+    if request.sample_persona is not None:
+        (persona,) = resolve_personas([request.sample_persona], None, None)
+    elif request.population_id is not None and request.sample_persona_id is not None:
+        (persona,) = resolve_personas([], request.population_id, [request.sample_persona_id])
+    else:
+        raise HTTPException(
+            status_code=422,
+            detail="sample_persona, or population_id with sample_persona_id, required",
+        )
 
     question = Question(
         id=request.question.question_id,
@@ -421,10 +825,15 @@ async def estimate_survey(request: SurveyEstimateRequest):
 
 @app.post("/api/survey/run", response_model=SurveyResultsResponse)
 async def run_survey_endpoint(
+    http_request: Request,
     request: SurveyRequest,
     centuria_session: str | None = Cookie(default=None),
 ):
-    """Run a survey on multiple personas concurrently."""
+    """Run a survey on multiple personas concurrently.
+
+    Pending LLM calls are cancelled if the client disconnects, and the whole
+    run must finish within SURVEY_RUN_DEADLINE seconds.
+    """
     question = Question(
         id=request.question.question_id,
         text=request.question.question_text,
@@ -432,74 +841,393 @@ async def run_survey_endpoint(
         options=request.question.options,
     )
     api_keys = get_session_keys(centuria_session)
+    personas = resolve_personas(
+        request.personas, request.population_id, request.persona_ids, request.filters
+    )
 
-    async def survey_persona(p: PersonaData) -> SurveyResponse:
-        persona = Persona(id=p.id, name=p.name, context=p.context)
+    async def survey_persona(persona: Persona) -> SurveyResponse:
         result = await ask_question(
             persona, question, model=request.question.model, api_keys=api_keys
         )
         return SurveyResponse(
-            persona_id=p.id,
-            persona_name=p.name,
+            persona_id=persona.id,
+            persona_name=persona.name,
             response=result.response,
             justification=result.justification,
             cost=result.cost,
         )
 
-    # Run all surveys concurrently
-    tasks = [survey_persona(p) for p in request.personas]
-    responses = await asyncio.gather(*tasks)
+    async def survey_all() -> list[SurveyResponse]:
+        # Run all surveys concurrently
+        return await asyncio.gather(*[survey_persona(p) for p in personas])
+
+    with admitted(centuria_session, calls=len(personas)):
+        responses = await run_cancellable(http_request, survey_all(), timeout=SURVEY_RUN_DEADLINE)
 
     total_cost = sum(r.cost for r in responses)
 
     return SurveyResultsResponse(responses=list(responses), total_cost=total_cost)
 
 
+def _sse(event: str, data: BaseModel) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {data.model_dump_json()}\n\n"
+
+
+@app.post("/api/survey/run/stream")
+async def run_survey_stream_endpoint(
+    request: SurveyRequest,
+    centuria_session: str | None = Cookie(default=None),
+):
+    """Run a survey, streaming each response as a server-sent event.
+
+    Emits a ``response`` event per persona as its call completes, a ``failed``
+    event per persona whose call failed, a ``tally`` event at most every
+    ``SURVEY_STREAM_TALLY_INTERVAL`` seconds, and a final ``summary`` event
+    with every response and the overall tallies. If the run passes
+    SURVEY_RUN_DEADLINE, or fails as a whole, an ``error`` event replaces the
+    summary. Pending calls are cancelled when the client disconnects.
+
+    Admission is decided before the stream starts, so saturation is still a 429.
+    """
+    question = Question(
+        id=request.question.question_id,
+        text=request.question.question_text,
+        question_type="single_select",
+        options=request.question.options,
+    )
+    api_keys = get_session_keys(centuria_session)
+    personas = resolve_personas(
+        request.personas, request.population_id, request.persona_ids, request.filters
+    )
+
+    # Reserved here so saturation is a 429, but held for the life of the stream
+    ticket = admit(centuria_session, calls=len(personas))
+
+    async def events():
+        responses: list[SurveyResponse] = []
+        tallies: Counter[str] = Counter()
+        total_cost = 0.0
+        failed = 0
+        last_tally = time.monotonic()
+
+        def tally() -> SurveyTally:
+            return SurveyTally(
+                completed=len(responses),
+                total=len(personas),
+                tallies=dict(tallies.most_common()),
+                total_cost=total_cost,
+                failed=failed,
+            )
+
+        try:
+            with deadline(SURVEY_RUN_DEADLINE), call_gate(ticket.gate):
+                async for persona, result in stream_question(
+                    personas,
+                    question,
+                    model=request.question.model,
+                    api_keys=api_keys,
+                    return_exceptions=True,
+                ):
+                    if isinstance(result, DeadlineExceeded):
+                        raise result
+                    if isinstance(result, Exception):
+                        # One persona's call failed (rate limit, bad reply...): the rest go on
+                        failed += 1
+                        yield _sse(
+                            "failed",
+                            SurveyFailure(
+                                persona_id=persona.id, persona_name=persona.name, detail=str(result)
+                            ),
+                        )
+                        continue
+                    response = SurveyResponse(
+                        persona_id=persona.id,
+                        persona_name=persona.name,
+                        response=result.response,
+                        justification=result.justification,
+                        cost=result.cost,
+                    )
+                    responses.append(response)
+                    tallies[response.response] += 1
+                    total_cost += response.cost
+                    yield _sse("response", response)
+
+                    if time.monotonic() - last_tally >= SURVEY_STREAM_TALLY_INTERVAL:
+                        last_tally = time.monotonic()
+                        yield _sse("tally", tally())
+        except Exception as e:
+            yield _sse("error", SurveyStreamError(detail=str(e), **tally().model_dump()))
+            return
+        finally:
+            ticket.release()
+
+        yield _sse("summary", SurveySummary(**tally().model_dump(), responses=responses))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also release if the stream is never started
+        background=BackgroundTask(ticket.release),
+    )
+
+
+class SurveyJobResponse(BaseModel):
+    """Status and partial results of a background survey job."""
+
+    job_id: str
+    status: str
+    completed: int
+    total: int
+    total_cost: float
+    error: str | None = None
+    responses: list[SurveyResponse] = []
+    failures: list[SurveyFailure] = []
+
+
+def _get_session_job(job_id: str, session_id: str | None):
+    """Look up a job, hiding jobs that belong to other sessions."""
+    job = _job_manager.store.get(job_id)
+    if job is None or job.session_id != session_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def _job_response(job, include_responses: bool = True) -> SurveyJobResponse:
+    results = _job_manager.store.results(job.id) if include_responses else []
+    return SurveyJobResponse(
+        job_id=job.id,
+        status=job.status,
+        completed=job.completed,
+        total=job.total,
+        total_cost=job.total_cost,
+        error=job.error,
+        responses=[r for r in results if "error" not in r],
+        failures=[
+            SurveyFailure(
+                persona_id=r["persona_id"], persona_name=r["persona_name"], detail=r["error"]
+            )
+            for r in results
+            if "error" in r
+        ],
+    )
+
+
+@app.post("/api/jobs/survey", response_model=SurveyJobResponse, status_code=202)
+async def submit_survey_job(
+    request: SurveyRequest,
+    centuria_session: str | None = Cookie(default=None),
+):
+    """Queue a survey to run in the background. Poll GET /api/jobs/{job_id} for progress."""
+    # Resolve population references now so the job is unaffected by later data changes
+    personas = resolve_personas(
+        request.personas, request.population_id, request.persona_ids, request.filters
+    )
+    payload = {
+        "question": request.question.model_dump(),
+        "personas": [p.model_dump() for p in personas],
+    }
+    job = _job_manager.submit(payload, session_id=centuria_session)
+    return _job_response(job, include_responses=False)
+
+
+@app.get("/api/jobs/{job_id}", response_model=SurveyJobResponse)
+async def get_survey_job(
+    job_id: str,
+    centuria_session: str | None = Cookie(default=None),
+):
+    """Return job status, the responses collected so far and the cost so far."""
+    return _job_response(_get_session_job(job_id, centuria_session))
+
+
+@app.delete("/api/jobs/{job_id}", response_model=SurveyJobResponse)
+async def cancel_survey_job(
+    job_id: str,
+    centuria_session: str | None = Cookie(default=None),
+):
+    """Cancel a queued or running job, keeping any responses already collected."""
+    _get_session_job(job_id, centuria_session)
+    return _job_response(_job_manager.cancel(job_id))
+
+
+# Datasets are loaded once and served as cached bytes; see centuria.api.datasets
+_dalston_dir = _project_root / "data" / "synthetic" / "dalston_clt"
+_dalston_personas = Dataset(
+    load=lambda: {"population_id": "dalston-clt", "personas": persona_store.records("dalston-clt")},
+    version=lambda: file_version(POPULATIONS["dalston-clt"]),
+)
+_dalston_households = json_file_dataset(_dalston_dir / "neighbourhood.json")
+# Keyed by (source, persona_id): a bundle packed later must not be shadowed
+# by the folder dataset cached before it existed, or the other way round
+_persona_files: dict[tuple[str, str], Dataset] = {}
+_dalston_bundle = _dalston_dir / "personas.bundle"
+
+
+def _load_bundle_index() -> dict | None:
+    path = index_path(_dalston_bundle)
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+# Offset index of the packed persona files, if the population has been packed
+_dalston_bundle_index = Dataset(
+    _load_bundle_index, lambda: file_version(index_path(_dalston_bundle))
+)
+
+
+class PersonaQueryRequest(BaseModel):
+    """Demographic query over a server-side population.
+
+    ``filters`` maps a field to a value, a list of values, or a
+    ``{"min": ..., "max": ...}`` range. ``group_by`` with one field returns
+    counts per value; with two fields it returns a crosstab.
+    """
+
+    filters: dict = {}
+    fields: list[str] | None = None
+    group_by: list[str] = []
+    limit: int | None = Field(default=None, ge=0)
+
+
+@app.post("/api/personas/{population_id}/query")
+async def query_population(population_id: str, request: PersonaQueryRequest):
+    """Filter and aggregate a population's personas using its bitmap indexes."""
+    if len(request.group_by) > 2:
+        raise HTTPException(status_code=400, detail="group_by takes at most two fields")
+    try:
+        index = persona_store.index(population_id)
+        matches = index.query(request.filters)
+        result: dict = {
+            "population_id": population_id,
+            "count": len(matches),
+            "persona_ids": [r["id"] for r in matches[: request.limit]],
+        }
+        if request.fields is not None:
+            result["personas"] = [
+                {f: r[f] for f in request.fields if f in r} for r in matches[: request.limit]
+            ]
+        if len(request.group_by) == 1:
+            result["counts"] = index.count_by(request.group_by[0], request.filters)
+        elif len(request.group_by) == 2:
+            result["crosstab"] = index.crosstab(*request.group_by, request.filters)
+    except UnknownPopulationError:
+        raise HTTPException(status_code=404, detail=f"Unknown population: {population_id}")
+    except InvalidFilterError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return result
+
+
+def _bundle_files_dataset(persona_id: str, bundle_path: Path) -> Dataset:
+    def load() -> dict:
+        with PersonaBundle(bundle_path) as bundle:
+            files = [
+                {"name": name, "content": bundle.text(persona_id, name)}
+                for name in bundle.filenames(persona_id)
+            ]
+        return {"persona_id": persona_id, "files": files}
+
+    return Dataset(load, lambda: (file_version(bundle_path), file_version(index_path(bundle_path))))
+
+
+def _persona_files_dataset(persona_id: str, persona_dir: Path) -> Dataset:
+    def load() -> dict:
+        files = []
+        for file_path in sorted(persona_dir.iterdir()):
+            if file_path.is_file() and not file_path.name.startswith("."):
+                files.append({"name": file_path.name, "content": file_path.read_text()})
+        return {"persona_id": persona_id, "files": files}
+
+    return Dataset(load, lambda: directory_version(persona_dir))
+
+
+def _paged_response(
+    request: Request,
+    dataset: Dataset,
+    list_key: str,
+    fields: str | None,
+    limit: int | None,
+    cursor: str | None,
+) -> Response:
+    """Serve a list dataset with optional field projection and cursor pagination."""
+    try:
+        entity = page_entity(dataset, list_key, parse_fields(fields), limit, cursor)
+    except InvalidPageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return cached_response(request, entity)
+
+
+# Shared query parameters for list endpoints
+_FIELDS_QUERY = Query(default=None, description="Comma-separated fields to include per item")
+_LIMIT_QUERY = Query(default=None, ge=1, le=MAX_PAGE_SIZE, description="Page size")
+_CURSOR_QUERY = Query(default=None, description="next_cursor from the previous page")
+
+
 @app.get("/api/personas/dalston-clt")
-async def get_dalston_personas():
-    """Load the Dalston CLT personas for the Testing space before it happens experiment."""
-    personas_file = _project_root / "data" / "synthetic" / "dalston_clt" / "personas_for_survey.json"
+async def get_dalston_personas(
+    request: Request,
+    fields: str | None = _FIELDS_QUERY,
+    limit: int | None = _LIMIT_QUERY,
+    cursor: str | None = _CURSOR_QUERY,
+):
+    """Load the Dalston CLT personas for the Testing space before it happens experiment.
 
-    if not personas_file.exists():
+    Use e.g. ``fields=id,name,age,occupation,address`` to skip the full contexts.
+    """
+    if not POPULATIONS["dalston-clt"].exists():
         return {"error": "Personas file not found", "personas": []}
 
-    with open(personas_file) as f:
-        personas_data = json.load(f)
-
-    return {"personas": personas_data}
+    return _paged_response(request, _dalston_personas, "personas", fields, limit, cursor)
 
 
 @app.get("/api/households/dalston-clt")
-async def get_dalston_households():
+async def get_dalston_households(
+    request: Request,
+    fields: str | None = _FIELDS_QUERY,
+    limit: int | None = _LIMIT_QUERY,
+    cursor: str | None = _CURSOR_QUERY,
+):
     """Load the Dalston CLT neighbourhood with households."""
-    neighbourhood_file = _project_root / "data" / "synthetic" / "dalston_clt" / "neighbourhood.json"
-
-    if not neighbourhood_file.exists():
+    if not (_dalston_dir / "neighbourhood.json").exists():
         return {"error": "Neighbourhood file not found", "households": []}
 
-    with open(neighbourhood_file) as f:
-        data = json.load(f)
-
-    return data
+    return _paged_response(request, _dalston_households, "households", fields, limit, cursor)
 
 
 @app.get("/api/persona-files/{persona_id}")
-async def get_persona_files(persona_id: str):
-    """Get the synthetic files for a specific persona."""
-    persona_dir = _project_root / "data" / "synthetic" / "dalston_clt" / "personas" / persona_id
-
-    if not persona_dir.exists():
+async def get_persona_files(
+    request: Request,
+    persona_id: str,
+    fields: str | None = _FIELDS_QUERY,
+    limit: int | None = _LIMIT_QUERY,
+    cursor: str | None = _CURSOR_QUERY,
+):
+    """Get the synthetic files for a specific persona.
+
+    Served from the packed ``personas.bundle`` when one exists, otherwise from
+    the per-persona folders.
+    """
+    if _dalston_bundle_index.data() is not None:
+        if persona_id not in _dalston_bundle_index.data()["personas"]:
+            return {"error": "Persona not found", "files": []}
+        dataset = _persona_files.get(("bundle", persona_id))
+        if dataset is None:
+            dataset = _bundle_files_dataset(persona_id, _dalston_bundle)
+            _persona_files["bundle", persona_id] = dataset
+        return _paged_response(request, dataset, "files", fields, limit, cursor)
+
+    personas_dir = _dalston_dir / "personas"
+    persona_dir = personas_dir / persona_id
+
+    # Reject IDs like ".." that would escape the personas directory
+    if persona_dir.parent != personas_dir or not persona_dir.is_dir():
         return {"error": "Persona not found", "files": []}
 
-    files = []
-    for file_path in sorted(persona_dir.iterdir()):
-        if file_path.is_file() and not file_path.name.startswith('.'):
-            files.append({
-                "name": file_path.name,
-                "content": file_path.read_text()
-            })
-
-    return {"persona_id": persona_id, "files": files}
+    dataset = _persona_files.get(("folder", persona_id))
+    if dataset is None:
+        dataset = _persona_files["folder", persona_id] = _persona_files_dataset(
+            persona_id, persona_dir
+        )
+    return _paged_response(request, dataset, "files", fields, limit, cursor)
 
 
 # ============================================================================
@@ -515,25 +1243,86 @@ class ImageGenerationRequest(BaseModel):
 
 
 class ImageGenerationResponse(BaseModel):
-    """Response containing the generated image."""
+    """Response pointing at the generated image."""
 
-    image_base64: str
+    image_url: str
     prompt_used: str
 
 
+# Generated images are stored by content hash and served from /api/images/
+_image_cache_dir = Path(os.getenv("IMAGE_CACHE_DIR", _project_root / ".cache" / "images"))
+
+
+def _plot_image_path() -> Path:
+    # Check build directory first (for deployed app), then static (for local dev)
+    path = _project_root / "web" / "build" / "images" / "plot_1.png"
+    if not path.exists():
+        path = _project_root / "web" / "static" / "images" / "plot_1.png"
+    return path
+
+
+def _load_plot_image() -> dict | None:
+    path = _plot_image_path()
+    if not path.exists():
+        return None
+    data = path.read_bytes()
+    return {"bytes": data, "sha256": hashlib.sha256(data).hexdigest()}
+
+
+# The source plot image, read once and re-read only if the file changes
+_plot_image = Dataset(_load_plot_image, lambda: file_version(_plot_image_path()))
+
+
+@lru_cache(maxsize=32)
+def _genai_client(api_key: str):
+    """Gemini client per API key, reused across requests."""
+    # Imported here so the Gemini SDK only loads when images are generated
+    from google import genai
+
+    return genai.Client(api_key=api_key)
+
+
+def _image_id(prompt: str, source_sha256: str) -> str:
+    """Content hash identifying an image by everything that determines it."""
+    key = json.dumps([IMAGE_GENERATION_MODEL, source_sha256, prompt])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+async def _generate_design_image(api_key: str, prompt: str, source: bytes) -> bytes | None:
+    """Ask Gemini to redraw the plot image; returns PNG bytes or None."""
+    from google.genai import types
+
+    response = await _genai_client(api_key).aio.models.generate_content(
+        model=IMAGE_GENERATION_MODEL,
+        contents=[prompt, types.Part.from_bytes(data=source, mime_type="image/png")],
+    )
+    for part in response.parts or []:
+        if part.inline_data is not None:
+            return part.inline_data.data
+    return None
+
+
+def _save_image(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
 @app.post("/api/generate-image")
 async def generate_image(
     request: ImageGenerationRequest,
     centuria_session: str | None = Cookie(default=None),
 ):
-    """Generate an image of the design using Google Gemini."""
-    # Load the original plot image
-    # Check build directory first (for deployed app), then static (for local dev)
-    plot_image_path = _project_root / "web" / "build" / "images" / "plot_1.png"
-    if not plot_image_path.exists():
-        plot_image_path = _project_root / "web" / "static" / "images" / "plot_1.png"
-    if not plot_image_path.exists():
-        return {"error": f"Plot image not found at {plot_image_path}"}
+    """Generate an image of the design using Google Gemini.
+
+    Images are cached by a hash of the model, source image and prompt (which
+    includes the winning option and design choices), so repeating a design
+    costs nothing. The response carries a URL rather than the image itself.
+    """
+    plot_image = _plot_image.data()
+    if plot_image is None:
+        return {"error": f"Plot image not found at {_plot_image_path()}"}
 
     # Build a detailed prompt from the survey results
     design_description = "\n".join([f"- {d['question']}: {d['answer']}" for d in request.design_choices])
@@ -545,41 +1334,46 @@ Design specifications from community vote:
 
 Important: This is a small 0.3-acre urban plot. Keep the exact same size, proportions, and boundaries as shown. Do not expand or enlarge the space. Keep the same camera angle and perspective. Keep the Victorian brick walls and terraced houses visible around the edges. Make it look like a professional architectural rendering of the completed space, appropriately scaled to fit this compact urban plot. Show the space as newly built and in use with a few people. British overcast weather lighting."""
 
-    try:
-        # Get Gemini API key from session
-        api_keys = get_session_keys(centuria_session)
-        gemini_key = api_keys.get("gemini")
-        if not gemini_key:
-            return {"error": "Gemini API key not configured"}
-
-        # Initialize Gemini client with session key
-        client = genai.Client(api_key=gemini_key)
-
-        # Load the source image
-        source_image = Image.open(plot_image_path)
-
-        # Generate content with image and prompt
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-image",
-            contents=[prompt, source_image],
-        )
+    image_id = _image_id(prompt, plot_image["sha256"])
+    image_path = _image_cache_dir / f"{image_id}.png"
+    result = ImageGenerationResponse(image_url=f"/api/images/{image_id}.png", prompt_used=prompt)
+    if image_path.exists():
+        return result
 
-        # Extract the generated image from response
-        generated_image = None
-        for part in response.parts:
-            if part.inline_data is not None:
-                # Get the raw image data and convert to base64
-                image_bytes = part.inline_data.data
-                generated_image = base64.standard_b64encode(image_bytes).decode("utf-8")
-                break
-
-        if not generated_image:
-            return {"error": "No image generated in response"}
-
-    except Exception as e:
-        return {"error": f"Image generation failed: {str(e)}"}
-
-    return {"image_base64": generated_image, "prompt_used": prompt}
+    # Get Gemini API key from session
+    api_keys = get_session_keys(centuria_session)
+    gemini_key = api_keys.get("gemini")
+    if not gemini_key:
+        return {"error": "Gemini API key not configured"}
+
+    # Counts as one LLM call against the session's and server's limits
+    with admit(centuria_session, calls=1) as ticket:
+        try:
+            async with ticket.gate():
+                image_bytes = await _generate_design_image(gemini_key, prompt, plot_image["bytes"])
+        except Exception as e:
+            return {"error": f"Image generation failed: {str(e)}"}
+
+    if not image_bytes:
+        return {"error": "No image generated in response"}
+
+    await asyncio.to_thread(_save_image, image_path, image_bytes)
+    return result
+
+
+@app.get("/api/images/{image_id}.png")
+async def get_generated_image(image_id: str):
+    """Serve a generated image. Content-addressed, so cacheable forever."""
+    if not re.fullmatch(r"[0-9a-f]{64}", image_id):
+        raise HTTPException(status_code=404, detail="Image not found")
+    path = _image_cache_dir / f"{image_id}.png"
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(
+        path,
+        media_type="image/png",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
 
 
 # ============================================================================
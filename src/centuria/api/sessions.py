@@ -0,0 +1,211 @@
+"""Session storage for per-visitor API keys.
+
+Each browser gets an opaque session ID cookie; the keys a visitor enters are
+stored against it so they never leak between users. Sessions expire after
+``SESSION_TTL`` seconds without use.
+
+Two backends:
+
+- ``MemorySessionStore``: an LRU dict in the current process, capped at
+  ``SESSION_MAX_ENTRIES``. Fast, but each uvicorn worker has its own.
+- ``SQLiteSessionStore``: a local SQLite file (WAL mode) that every worker
+  process on the machine shares, so a session created by one worker is seen
+  by the others and survives restarts.
+
+Pick one with the ``SESSION_BACKEND`` environment variable.
+"""
+
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+from centuria.config import SESSION_MAX_ENTRIES, SESSION_TTL, get_session_backend
+
+
+def new_session_id() -> str:
+    return secrets.token_urlsafe(32)
+
+
+class SessionStore(ABC):
+    """Maps session IDs to the API keys set in that session."""
+
+    @abstractmethod
+    def create(self) -> str:
+        """Start an empty session and return its ID."""
+
+    @abstractmethod
+    def touch(self, session_id: str) -> bool:
+        """Whether the session exists; extends its lifetime if so."""
+
+    @abstractmethod
+    def get_keys(self, session_id: str) -> dict[str, str]:
+        """Keys set in the session ({} if it does not exist or has expired)."""
+
+    @abstractmethod
+    def set_key(self, session_id: str, provider: str, key: str) -> None:
+        """Store a provider's key, creating the session if needed."""
+
+    def close(self) -> None:
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """In-process sessions with sliding TTL and least-recently-used eviction."""
+
+    def __init__(
+        self,
+        ttl: float = SESSION_TTL,
+        max_entries: int = SESSION_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        # session ID -> (expires_at, keys); most recently used last
+        self._sessions: OrderedDict[str, tuple[float, dict[str, str]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _get(self, session_id: str) -> dict[str, str] | None:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        now = self._clock()
+        if entry[0] <= now:
+            del self._sessions[session_id]
+            return None
+        self._sessions[session_id] = (now + self.ttl, entry[1])
+        self._sessions.move_to_end(session_id)
+        return entry[1]
+
+    def _put(self, session_id: str, keys: dict[str, str]) -> None:
+        now = self._clock()
+        self._sessions[session_id] = (now + self.ttl, keys)
+        self._sessions.move_to_end(session_id)
+
+        # Oldest entries are at the front: drop expired ones, then any overflow
+        while self._sessions:
+            oldest_id, (expires_at, _) = next(iter(self._sessions.items()))
+            if expires_at > now and len(self._sessions) <= self.max_entries:
+                break
+            del self._sessions[oldest_id]
+
+    def create(self) -> str:
+        session_id = new_session_id()
+        self._put(session_id, {})
+        return session_id
+
+    def touch(self, session_id: str) -> bool:
+        return self._get(session_id) is not None
+
+    def get_keys(self, session_id: str) -> dict[str, str]:
+        return dict(self._get(session_id) or {})
+
+    def set_key(self, session_id: str, provider: str, key: str) -> None:
+        keys = self._get(session_id)
+        self._put(session_id, {**(keys or {}), provider: key})
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    keys TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_expires ON sessions(expires_at);
+"""
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a local SQLite file shared by every worker process.
+
+    The file holds API keys, so it is created readable by the owner only.
+    Expired sessions are purged whenever a new one is created.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl: float = SESSION_TTL,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._clock = clock
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        os.chmod(self.path, 0o600)
+        # Requests and background jobs may call in from different threads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, isolation_level=None, timeout=10, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def create(self) -> str:
+        session_id = new_session_id()
+        now = self._clock()
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "INSERT INTO sessions (id, keys, expires_at) VALUES (?, '{}', ?)",
+                (session_id, now + self.ttl),
+            )
+        return session_id
+
+    def touch(self, session_id: str) -> bool:
+        now = self._clock()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE sessions SET expires_at = ? WHERE id = ? AND expires_at > ?",
+                (now + self.ttl, session_id, now),
+            )
+        return cursor.rowcount > 0
+
+    def get_keys(self, session_id: str) -> dict[str, str]:
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "UPDATE sessions SET expires_at = ? WHERE id = ? AND expires_at > ?"
+                " RETURNING keys",
+                (now + self.ttl, session_id, now),
+            ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def set_key(self, session_id: str, provider: str, key: str) -> None:
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (id, keys, expires_at) VALUES (?, json_object(?, ?), ?)"
+                " ON CONFLICT (id) DO UPDATE SET"
+                " keys = CASE WHEN expires_at > ? THEN json_set(keys, '$.' || ?, ?)"
+                " ELSE json_object(?, ?) END,"
+                " expires_at = excluded.expires_at",
+                (session_id, provider, key, now + self.ttl, now, provider, key, provider, key),
+            )
+
+
+def create_session_store(db_path: str | Path) -> SessionStore:
+    """The session store selected by ``SESSION_BACKEND`` ("memory" or "sqlite").
+
+    Raises:
+        ValueError: If the backend name is not recognised
+    """
+    backend = get_session_backend()
+    if backend == "memory":
+        return MemorySessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore(db_path)
+    raise ValueError(f"Unknown SESSION_BACKEND: {backend!r} (expected 'memory' or 'sqlite')")
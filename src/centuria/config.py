@@ -183,6 +183,11 @@ OCCUPATION_CATEGORIES = [
 ]
 
 
+# Local classifications below this confidence are sent to the LLM instead
+# (see centuria.persona.occupations)
+OCCUPATION_CLASSIFIER_MIN_CONFIDENCE = 0.6
+
+
 def match_occupation_category(category: str) -> str:
     """Match a category string to a known category, with fuzzy fallback."""
     if category in OCCUPATION_CATEGORIES:
@@ -212,6 +217,167 @@ def get_cors_origins() -> list[str]:
     return DEFAULT_CORS_ORIGINS
 
 
+# =============================================================================
+# Request Deadlines
+# =============================================================================
+
+# Total seconds an endpoint may spend on LLM calls before giving up (504)
+SURVEY_RUN_DEADLINE = 180.0
+GENERATE_PERSONA_DEADLINE = 60.0
+GENERATE_PERSONAS_DEADLINE = 180.0
+
+# Seconds between checks for a disconnected client during long requests
+DISCONNECT_POLL_INTERVAL = 0.5
+
+
+# =============================================================================
+# Dataset Pagination
+# =============================================================================
+
+# Largest page a persona/household listing endpoint will return
+MAX_PAGE_SIZE = 1000
+
+
+# =============================================================================
+# Survey Streaming
+# =============================================================================
+
+# Minimum seconds between running-tally events on /api/survey/run/stream
+SURVEY_STREAM_TALLY_INTERVAL = 1.0
+
+
+# =============================================================================
+# Batch Persona Generation
+# =============================================================================
+
+# Most personas one /api/generate-personas request may ask for
+MAX_PERSONA_BATCH = 100
+
+# Generation calls in flight per batch request
+PERSONA_BATCH_CONCURRENCY = 8
+
+# Occupations classified together in one packed LLM call
+CLASSIFY_BATCH_SIZE = 10
+
+
+# =============================================================================
+# Background Survey Jobs
+# =============================================================================
+
+# Number of survey jobs run at the same time by the in-process worker pool
+SURVEY_JOB_WORKERS = 2
+
+# Maximum LLM calls in flight per survey job
+SURVEY_JOB_CONCURRENCY = 20
+
+# Seconds between a running job's heartbeats, and between checks of the job
+# table for jobs queued or cancelled by other worker processes
+SURVEY_JOB_POLL_INTERVAL = 5.0
+
+# A running job whose heartbeat is older than this many seconds has lost its
+# worker process (it crashed or was killed) and is picked up by another
+SURVEY_JOB_LEASE = 60.0
+
+
+# =============================================================================
+# Image Generation
+# =============================================================================
+
+# Gemini model used to render the winning design onto the plot photo
+IMAGE_GENERATION_MODEL = "gemini-2.5-flash-image"
+
+
+# =============================================================================
+# Admission Control
+# =============================================================================
+
+# LLM calls in flight across the whole server
+MAX_CONCURRENT_LLM_CALLS = 64
+
+# LLM calls in flight for any one session
+MAX_SESSION_LLM_CALLS = 16
+
+# Admitted-but-unfinished LLM calls (queued or running) before new requests get 429
+MAX_PENDING_LLM_CALLS = 2000
+
+# Same limit per session; a single request larger than this is rejected with 413
+MAX_SESSION_PENDING_LLM_CALLS = 500
+
+
+# =============================================================================
+# Sessions
+# =============================================================================
+
+# Seconds of inactivity after which a session (and its API keys) is forgotten
+SESSION_TTL = 24 * 60 * 60
+
+# Most sessions the in-process backend keeps; least recently used go first
+SESSION_MAX_ENTRIES = 10_000
+
+# Session backend: "memory" (per process) or "sqlite" (shared by all workers)
+DEFAULT_SESSION_BACKEND = "memory"
+
+
+def get_session_backend() -> str:
+    """Get the session backend from environment or use the default."""
+    return os.getenv("SESSION_BACKEND", DEFAULT_SESSION_BACKEND).strip().lower()
+
+
+# =============================================================================
+# Profile Extraction
+# =============================================================================
+
+# Files longer than this many tokens (with their === name === header) are
+# split into chunks, extracted separately and merged (map-reduce), instead of
+# overflowing one prompt
+EXTRACTION_CHUNK_TOKENS = 12_000
+
+# Chunks of one file extracted at the same time
+EXTRACTION_CHUNK_CONCURRENCY = 4
+
+# Personal data folders processed at the same time by process_personal_folders
+FOLDER_CONCURRENCY = 8
+
+# Size of the whole context-statement prompt; the raw personal data gets
+# whatever the template and profile leave, shared between files by priority
+CONTEXT_PROMPT_TOKENS = 4000
+
+# PDFs are extracted in worker processes, in page ranges of this size
+PDF_PAGES_PER_TASK = 20
+PDF_WORKERS = min(4, os.cpu_count() or 1)
+
+# Profiles, context statements and PDF text are cached here, keyed on content hashes
+DEFAULT_CACHE_DIR = ".cache/llm"
+
+
+def is_cache_enabled() -> bool:
+    """Whether ENABLE_CACHE (default true) allows caching LLM results on disk."""
+    return os.getenv("ENABLE_CACHE", "true").strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_cache_dir() -> str:
+    """Get the cache directory from environment or use the default."""
+    return os.getenv("CACHE_DIR", DEFAULT_CACHE_DIR)
+
+
+def is_fused_extraction_enabled() -> bool:
+    """Whether FUSED_EXTRACTION (default false) builds profile and context in one LLM call."""
+    return os.getenv("FUSED_EXTRACTION", "false").strip().lower() in ("1", "true", "yes", "on")
+
+
+# =============================================================================
+# Persona Cards
+# =============================================================================
+
+# Token budgets tried, smallest first, when compressing a context statement
+# into a persona card
+CARD_TOKEN_BUDGETS = (120, 200, 300)
+
+# Share of probe questions a card must answer the same way as the full
+# context to replace it
+CARD_MIN_AGREEMENT = 0.9
+
+
 # =============================================================================
 # Age Thresholds for File Type Selection
 # =============================================================================
@@ -1,20 +1,47 @@
 """Data loading utilities."""
 
-from centuria.data.loaders import load_files, load_text
+from centuria.data.loaders import (
+    TextCache,
+    aload_files,
+    aload_text,
+    get_text_cache,
+    load_files,
+    load_text,
+)
 from centuria.data.extractors import (
     ExtractedProfile,
+    ExtractionCache,
+    get_extraction_cache,
+    extract_profile_from_file,
     extract_profile_from_files,
     extract_profile_from_text,
+    extract_profile_and_context,
+    merge_profiles,
     build_context_statement,
     process_personal_folder,
+    FolderResult,
+    discover_personal_folders,
+    process_personal_folders,
 )
 
 __all__ = [
     "load_text",
     "load_files",
+    "aload_text",
+    "aload_files",
+    "TextCache",
+    "get_text_cache",
     "ExtractedProfile",
+    "ExtractionCache",
+    "get_extraction_cache",
+    "extract_profile_from_file",
     "extract_profile_from_files",
     "extract_profile_from_text",
+    "extract_profile_and_context",
+    "merge_profiles",
     "build_context_statement",
     "process_personal_folder",
+    "FolderResult",
+    "discover_personal_folders",
+    "process_personal_folders",
 ]
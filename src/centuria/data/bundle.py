@@ -0,0 +1,273 @@
+"""Packed persona bundles.
+
+A synthetic population is normally one directory per persona holding a few
+small text files and an ``identity.json``. Loading it means hundreds of tiny
+file opens. A bundle packs every document into one data file, with a JSON
+offset index beside it (``<name>.bundle`` and ``<name>.bundle.idx``):
+
+    data:  MAGIC | token | doc | doc | doc ...
+    index: {"version": 1, "token": <hex>, "size": <data bytes>,
+            "personas": {<persona_id>: {"files": {<filename>: [offset, length]},
+                                         "context": [offset, length] | null}}}
+
+Readers memory-map the data file and hand out ``memoryview`` slices, so a
+document is only paged in (and never copied) when it is read. The random
+token ties an index to the data file it was written with, so a reader never
+pairs a fresh index with stale data or the reverse.
+"""
+
+import json
+import mmap
+import os
+import secrets
+import tempfile
+from pathlib import Path
+
+MAGIC = b"CNTBNDL1"
+TOKEN_BYTES = 16
+INDEX_VERSION = 1
+
+# Files read as persona data (matches process_personal_folder)
+TEXT_EXTENSIONS = {".txt", ".md"}
+
+
+class BundleError(ValueError):
+    """The bundle is missing, malformed, or its index does not match its data."""
+
+
+def index_path(path: str | Path) -> Path:
+    """Path of the offset index for a bundle data file."""
+    path = Path(path)
+    return path.with_name(path.name + ".idx")
+
+
+class BundleWriter:
+    """Write persona documents to a bundle; the index is written on close.
+
+    A new bundle is written to a temporary file and renamed into place on
+    ``close``; with ``append=True`` documents are appended to the existing
+    data file, which readers that already mapped it are unaffected by. If the
+    ``with`` block raises, the bundle on disk is left as it was.
+    """
+
+    def __init__(self, path: str | Path, append: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._personas: dict[str, dict] = {}
+        self._tmp: str | None = None
+
+        if append and self.path.exists():
+            with PersonaBundle(self.path) as existing:
+                self._personas = json.loads(json.dumps(existing.index["personas"]))
+                self._token = existing.index["token"]
+            self._file = open(self.path, "ab")
+        else:
+            fd, self._tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+            self._file = os.fdopen(fd, "wb")
+            self._token = secrets.token_hex(TOKEN_BYTES)
+            self._file.write(MAGIC + bytes.fromhex(self._token))
+        self._offset = self._start = self._file.tell()
+
+    def __enter__(self) -> "BundleWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _append(self, data: str | bytes) -> list[int]:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._file.write(data)
+        entry = [self._offset, len(data)]
+        self._offset += len(data)
+        return entry
+
+    def _persona(self, persona_id: str) -> dict:
+        return self._personas.setdefault(persona_id, {"files": {}, "context": None})
+
+    def add_file(self, persona_id: str, name: str, data: str | bytes) -> None:
+        """Add (or replace) one of a persona's files."""
+        self._persona(persona_id)["files"][name] = self._append(data)
+
+    def add_context(self, persona_id: str, context: str) -> None:
+        """Add (or replace) a persona's context statement."""
+        self._persona(persona_id)["context"] = self._append(context)
+
+    def abort(self) -> None:
+        """Discard everything written, leaving any existing bundle untouched."""
+        if self._file.closed:
+            return
+        if self._tmp is None:
+            # Appending: cut the file back to where this writer started
+            self._file.truncate(self._start)
+        self._file.close()
+        if self._tmp is not None:
+            os.unlink(self._tmp)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        if self._tmp is not None:
+            os.replace(self._tmp, self.path)
+
+        index = {
+            "version": INDEX_VERSION,
+            "token": self._token,
+            "size": self._offset,
+            "personas": self._personas,
+        }
+        target = index_path(self.path)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, target)
+
+
+class PersonaBundle:
+    """Read-only, memory-mapped view of a bundle.
+
+    Documents are returned as ``memoryview`` slices of the mapping; release
+    them (or convert to ``bytes``/``str``) before calling ``close``.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        try:
+            with open(index_path(self.path), encoding="utf-8") as f:
+                self.index = json.load(f)
+        except FileNotFoundError:
+            raise BundleError(f"No index for bundle: {self.path}") from None
+        if self.index.get("version") != INDEX_VERSION:
+            raise BundleError(f"Unsupported bundle version: {self.index.get('version')}")
+
+        self._file = open(self.path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self.index["size"]:
+            self._file.close()
+            raise BundleError(f"Bundle data is shorter than its index: {self.path}")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        header = self._mmap[: len(MAGIC) + TOKEN_BYTES]
+        if header[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise BundleError(f"Not a persona bundle: {self.path}")
+        if header[len(MAGIC) :].hex() != self.index["token"]:
+            self.close()
+            raise BundleError(f"Bundle index does not match its data: {self.path}")
+
+    def __enter__(self) -> "PersonaBundle":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def _entry(self, persona_id: str) -> dict:
+        try:
+            return self.index["personas"][persona_id]
+        except KeyError:
+            raise KeyError(persona_id) from None
+
+    def _slice(self, entry: list[int]) -> memoryview:
+        offset, length = entry
+        return self._view[offset : offset + length]
+
+    def _decode(self, entry: list[int]) -> str:
+        with self._slice(entry) as view:
+            return str(view, "utf-8")
+
+    def __contains__(self, persona_id: str) -> bool:
+        return persona_id in self.index["personas"]
+
+    def persona_ids(self) -> list[str]:
+        return list(self.index["personas"])
+
+    def filenames(self, persona_id: str) -> list[str]:
+        return sorted(self._entry(persona_id)["files"])
+
+    def document(self, persona_id: str, name: str) -> memoryview:
+        """Zero-copy view of one of a persona's files.
+
+        Raises:
+            KeyError: If the persona or file is not in the bundle
+        """
+        return self._slice(self._entry(persona_id)["files"][name])
+
+    def text(self, persona_id: str, name: str) -> str:
+        return self._decode(self._entry(persona_id)["files"][name])
+
+    def files(self, persona_id: str) -> dict[str, memoryview]:
+        """All of a persona's files as {filename: view}, sorted by name."""
+        entries = self._entry(persona_id)["files"]
+        return {name: self._slice(entries[name]) for name in sorted(entries)}
+
+    def identity(self, persona_id: str) -> dict | None:
+        """The persona's ``identity.json``, if it has one."""
+        entry = self._entry(persona_id)["files"].get("identity.json")
+        return None if entry is None else json.loads(self._decode(entry))
+
+    def context(self, persona_id: str) -> str | None:
+        entry = self._entry(persona_id)["context"]
+        return None if entry is None else self._decode(entry)
+
+    def load_text(self, persona_id: str) -> str:
+        """A persona's text files combined, as ``load_files`` does for a folder."""
+        entries = self._entry(persona_id)["files"]
+        return "\n\n".join(
+            self._decode(entries[name])
+            for name in sorted(entries)
+            if Path(name).suffix.lower() in TEXT_EXTENSIONS
+        )
+
+
+def pack_directory(
+    personas_dir: str | Path,
+    bundle_path: str | Path,
+    contexts: dict[str, str] | None = None,
+) -> int:
+    """Pack ``personas_dir/<persona_id>/*`` (and optional contexts) into a bundle.
+
+    Returns:
+        Number of personas packed
+    """
+    personas_dir = Path(personas_dir)
+    folders = sorted(d for d in personas_dir.iterdir() if d.is_dir())
+    with BundleWriter(bundle_path) as writer:
+        for folder in folders:
+            for path in sorted(folder.iterdir()):
+                if path.is_file() and not path.name.startswith("."):
+                    writer.add_file(folder.name, path.name, path.read_bytes())
+            if contexts and folder.name in contexts:
+                writer.add_context(folder.name, contexts[folder.name])
+    return len(folders)
+
+
+def unpack_bundle(bundle_path: str | Path, personas_dir: str | Path) -> dict[str, str]:
+    """Write a bundle back out as ``personas_dir/<persona_id>/*``.
+
+    Returns:
+        The bundle's context statements by persona ID (e.g. for context_cache.json)
+    """
+    personas_dir = Path(personas_dir)
+    contexts = {}
+    with PersonaBundle(bundle_path) as bundle:
+        for persona_id in bundle.persona_ids():
+            folder = personas_dir / persona_id
+            folder.mkdir(parents=True, exist_ok=True)
+            for name in bundle.filenames(persona_id):
+                with bundle.document(persona_id, name) as view:
+                    (folder / name).write_bytes(view)
+            context = bundle.context(persona_id)
+            if context is not None:
+                contexts[persona_id] = context
+    return contexts
@@ -0,0 +1,226 @@
+"""A/B comparison of two-call and fused profile extraction.
+
+Runs both extraction paths over synthetic persona folders and reports, for
+each, how well the profile matches the folder's ``identity.json`` (the ground
+truth the files were generated from; it is never shown to the LLM, which only
+reads .txt/.md/.pdf files), how the context statement follows the writing
+rules, and what the path cost.
+
+Usage::
+
+    python -m centuria.data.compare_extraction data/synthetic/dalston_clt/personas
+    python -m centuria.data.compare_extraction data/synthetic/dalston_clt/personas 20 ab.json
+"""
+
+import asyncio
+import json
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from statistics import mean
+
+from centuria.data.extractors import (
+    CONTEXT_STATEMENT_GUIDELINES,
+    ExtractedProfile,
+    ExtractionCache,
+    discover_personal_folders,
+    process_personal_folder,
+)
+from centuria.llm import track_usage
+
+# Paths compared, as the ``fused`` argument of process_personal_folder
+PATHS = {"two_call": False, "fused": True}
+
+# The quoted phrases under BANNED PHRASES in the context statement guidelines
+BANNED_PHRASES = tuple(
+    re.findall(
+        r'"([^"]+)"',
+        CONTEXT_STATEMENT_GUIDELINES.split("BANNED PHRASES")[1].split("GOOD NEUTRAL")[0],
+    )
+)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _words(text: str | None) -> set[str]:
+    return set(_WORD.findall((text or "").lower()))
+
+
+def _overlap(expected: str, actual: str | None) -> float:
+    """Share of the expected words that appear in the actual value."""
+    expected_words = _words(expected)
+    return len(expected_words & _words(actual)) / len(expected_words) if expected_words else 0.0
+
+
+def _age_in_range(age: int, age_range: str | None) -> float:
+    bounds = [int(n) for n in re.findall(r"\d+", age_range or "")]
+    if not bounds:
+        return 0.0
+    return 1.0 if min(bounds) - 1 <= age <= max(bounds) + 1 else 0.0
+
+
+def profile_accuracy(profile: ExtractedProfile, identity: dict) -> dict[str, float]:
+    """Per-field agreement (0-1) between an extracted profile and the true identity."""
+    return {
+        "name": _overlap(identity["name"], profile.name),
+        "age": _age_in_range(identity["age"], profile.age_range),
+        "occupation": _overlap(identity["occupation"], profile.current_role),
+        "industry": _overlap(identity["industry"], profile.industry),
+        "education": _overlap(identity["education"], profile.education_level),
+        "political_lean": _overlap(identity["political_lean"], profile.political_lean),
+    }
+
+
+def statement_checks(context: str, identity: dict) -> dict[str, float]:
+    """Length, banned phrases and grounding of a context statement."""
+    lowered = context.lower()
+    return {
+        "words": len(context.split()),
+        "banned_phrases": sum(
+            # Whole words only: "data-driven" is not "driven"
+            len(re.findall(rf"(?<![\w-]){re.escape(phrase)}(?![\w-])", lowered))
+            for phrase in BANNED_PHRASES
+        ),
+        "mentions_occupation": _overlap(identity["occupation"], context),
+    }
+
+
+@dataclass
+class PathResult:
+    """One extraction path's output and cost for one folder."""
+
+    seconds: float = 0.0
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    accuracy: dict[str, float] = field(default_factory=dict)
+    statement: dict[str, float] = field(default_factory=dict)
+    context: str = ""
+    error: str | None = None
+
+
+@dataclass
+class FolderComparison:
+    folder: str
+    paths: dict[str, PathResult]
+
+    @property
+    def statement_similarity(self) -> float:
+        """Word-set Jaccard similarity of the two context statements."""
+        a, b = (_words(result.context) for result in self.paths.values())
+        return len(a & b) / len(a | b) if a | b else 0.0
+
+
+async def _run_path(folder: Path, fused: bool, identity: dict) -> PathResult:
+    # A disabled cache, so both paths really call the LLM
+    cache = ExtractionCache(enabled=False)
+    started = time.monotonic()
+    with track_usage() as usage:
+        try:
+            profile, context = await process_personal_folder(str(folder), cache=cache, fused=fused)
+        except Exception as e:
+            return PathResult(error=f"{type(e).__name__}: {e}")
+    return PathResult(
+        seconds=time.monotonic() - started,
+        calls=usage.calls,
+        prompt_tokens=usage.prompt_tokens,
+        completion_tokens=usage.completion_tokens,
+        cost=usage.cost,
+        accuracy=profile_accuracy(profile, identity),
+        statement=statement_checks(context, identity),
+        context=context,
+    )
+
+
+async def compare_folder(folder: str | Path) -> FolderComparison:
+    """Run both paths, one after the other, on one synthetic persona folder."""
+    folder = Path(folder)
+    identity = json.loads((folder / "identity.json").read_text())
+    paths = {}
+    for name, fused in PATHS.items():
+        paths[name] = await _run_path(folder, fused, identity)
+    return FolderComparison(folder.name, paths)
+
+
+async def compare_extraction(
+    root: str | Path, limit: int | None = None, concurrency: int = 4
+) -> list[FolderComparison]:
+    """Compare both paths on the synthetic persona folders under ``root``.
+
+    Only folders with an ``identity.json`` are used; ``limit`` takes the first
+    N in name order.
+    """
+    folders = [f for f in discover_personal_folders(root) if (f / "identity.json").exists()]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def compare(folder: Path) -> FolderComparison:
+        async with semaphore:
+            return await compare_folder(folder)
+
+    return list(await asyncio.gather(*(compare(f) for f in folders[:limit])))
+
+
+def summarize(comparisons: list[FolderComparison]) -> dict:
+    """Mean cost, accuracy and statement checks per path, over the folders both completed."""
+    done = [c for c in comparisons if all(r.error is None for r in c.paths.values())]
+    summary: dict = {"folders": len(comparisons), "compared": len(done)}
+    if not done:
+        return summary
+    for name in PATHS:
+        results = [c.paths[name] for c in done]
+        summary[name] = {
+            "seconds": mean(r.seconds for r in results),
+            "calls": mean(r.calls for r in results),
+            "prompt_tokens": mean(r.prompt_tokens for r in results),
+            "completion_tokens": mean(r.completion_tokens for r in results),
+            "cost": mean(r.cost for r in results),
+            **{f"accuracy.{k}": mean(r.accuracy[k] for r in results) for k in results[0].accuracy},
+            **{
+                f"statement.{k}": mean(r.statement[k] for r in results)
+                for k in results[0].statement
+            },
+        }
+    summary["statement_similarity"] = mean(c.statement_similarity for c in done)
+    return summary
+
+
+def _print_summary(summary: dict) -> None:
+    print(f"Compared {summary['compared']} of {summary['folders']} folders")
+    if not summary["compared"]:
+        return
+    print(f"{'':30} {'two_call':>10} {'fused':>10}")
+    for metric in summary["two_call"]:
+        row = [summary[name][metric] for name in PATHS]
+        print(f"{metric:30} {row[0]:10.3f} {row[1]:10.3f}")
+    print(f"{'statement_similarity':30} {summary['statement_similarity']:10.3f}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if not 1 <= len(argv) <= 3:
+        print(__doc__.split("Usage::")[1].strip("\n"))
+        raise SystemExit(2)
+
+    root = argv[0]
+    limit = int(argv[1]) if len(argv) > 1 else None
+    comparisons = asyncio.run(compare_extraction(root, limit=limit))
+    summary = summarize(comparisons)
+    _print_summary(summary)
+
+    if len(argv) > 2:
+        report = {
+            "summary": summary,
+            "folders": [
+                {"folder": c.folder, **{name: asdict(r) for name, r in c.paths.items()}}
+                for c in comparisons
+            ],
+        }
+        Path(argv[2]).write_text(json.dumps(report, indent=2))
+        print(f"Report written to {argv[2]}")
+
+
+if __name__ == "__main__":
+    main()
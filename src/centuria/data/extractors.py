@@ -1,31 +1,50 @@
-"""Extract structured information from personal data files using LLM."""
+"""Extract structured information from personal data files using LLM.
 
+Each file is extracted into a partial profile, and the partials are merged
+into one. In fused mode (``FUSED_EXTRACTION``) a folder that fits in one
+prompt gets its profile and context statement from a single call instead.
+
+Partial profiles and context statements are cached on disk (see
+``ExtractionCache``), so re-processing a folder costs LLM calls only for the
+files that changed.
+"""
+
+import asyncio
+import hashlib
 import json
+import os
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
 from pathlib import Path
 
 from pydantic import BaseModel, field_validator
-
-from centuria.data import load_text
-from centuria.llm import complete
-from centuria.utils import parse_json_response
+from pydantic.json_schema import SkipJsonSchema
+
+from centuria.config import (
+    CONTEXT_PROMPT_TOKENS,
+    DEFAULT_MODEL,
+    EXTRACTION_CHUNK_CONCURRENCY,
+    EXTRACTION_CHUNK_TOKENS,
+    FOLDER_CONCURRENCY,
+    get_cache_dir,
+    is_cache_enabled,
+    is_fused_extraction_enabled,
+)
+from centuria.data.loaders import aload_text
+from centuria.llm import StructuredOutputError, complete
+from centuria.llm.tokens import chunk_text, count_tokens, fit_sections
+from centuria.store import PopulationStore
+
+# File types read from a personal data folder
+PERSONAL_FILE_EXTENSIONS = {".pdf", ".txt", ".md"}
 
 # =============================================================================
 # Extraction Prompts
 # =============================================================================
 
-# Maximum characters of raw context to include in prompts
-RAW_CONTEXT_CHAR_LIMIT = 8000
-
-PROFILE_EXTRACTION_PROMPT = """Analyze the following personal data and extract a structured profile.
-
-<personal_data>
-{content}
-</personal_data>
-
-Based on this data, extract the following information. For each field, provide your best inference based on the available evidence. If something cannot be reasonably inferred, leave it as null.
-
-Return a JSON object with these fields:
-{{
+# Profile fields, as the JSON object the LLM should return (braces doubled for str.format)
+PROFILE_FIELDS = """{{
     "name": "string or null",
     "location": "string or null (city/country)",
     "age_range": "string or null (e.g., '30-35')",
@@ -44,23 +63,10 @@ Return a JSON object with these fields:
     "communication_style": "string or null (e.g., 'direct', 'diplomatic', 'analytical')",
     "work_style": "string or null (e.g., 'collaborative', 'independent', 'mixed')",
     "risk_tolerance": "string or null (e.g., 'risk-averse', 'moderate', 'risk-seeking')"
-}}
-
-Return ONLY the JSON object, no other text."""
+}}"""
 
-CONTEXT_STATEMENT_PROMPT = """You are creating a factual persona context statement for use in LLM role-playing.
-
-Based on the following structured profile and raw personal data, write a clear, objective context statement.
-
-<structured_profile>
-{profile_json}
-</structured_profile>
-
-<raw_data>
-{raw_context}
-</raw_data>
-
-Write a context statement (300-500 words) that:
+# How to write a context statement, shared by the two-call and fused prompts
+CONTEXT_STATEMENT_GUIDELINES = """Write a context statement (300-500 words) that:
 1. States factual information about this person's work, education, and background
 2. Lists their intellectual interests and media consumption without editorializing
 3. Notes any genuinely unusual or contradictory elements (e.g., if their media diet spans opposing political viewpoints, state this plainly)
@@ -94,9 +100,72 @@ Include mundane and unflattering details where relevant:
 - Things they don't do (doesn't read, doesn't travel, doesn't cook)
 - Ordinary entertainment (TV, social media scrolling, gaming)
 
-The context statement should be written in third person, factual, and suitable for use as system prompt context.
+The context statement should be written in third person, factual, and suitable for use as system prompt context."""
+
+PROFILE_EXTRACTION_PROMPT = (
+    """Analyze the following personal data and extract a structured profile.
+
+<personal_data>
+{content}
+</personal_data>
+
+Based on this data, extract the following information. For each field, provide your best inference based on the available evidence. If something cannot be reasonably inferred, leave it as null.
+
+Return a JSON object with these fields:
+"""
+    + PROFILE_FIELDS
+    + """
+
+Return ONLY the JSON object, no other text."""
+)
+
+CONTEXT_STATEMENT_PROMPT = (
+    """You are creating a factual persona context statement for use in LLM role-playing.
+
+Based on the following structured profile and raw personal data, write a clear, objective context statement.
+
+<structured_profile>
+{profile_json}
+</structured_profile>
+
+<raw_data>
+{raw_context}
+</raw_data>
+
+"""
+    + CONTEXT_STATEMENT_GUIDELINES
+    + """
 
 Write the context statement now:"""
+)
+
+# Fused mode: the profile and the context statement from one call
+FUSED_EXTRACTION_PROMPT = (
+    """You are creating a factual persona context statement for use in LLM role-playing.
+
+<personal_data>
+{content}
+</personal_data>
+
+First extract a structured profile from this data. For each field, provide your best inference
+based on the available evidence. If something cannot be reasonably inferred, leave it as null.
+The profile fields are:
+"""
+    + PROFILE_FIELDS
+    + """
+
+Then, based on the profile and the personal data, write a clear, objective context statement.
+
+"""
+    + CONTEXT_STATEMENT_GUIDELINES
+    + """
+
+Return ONLY a JSON object of this form, no other text:
+{{
+    "profile": {{...the profile fields...}},
+    "context_statement": "the context statement"
+}}"""
+)
 
 
 class ExtractedProfile(BaseModel):
@@ -130,8 +199,8 @@ class ExtractedProfile(BaseModel):
     work_style: str | None = None
     risk_tolerance: str | None = None
 
-    # Raw context for LLM prompting
-    raw_context: str = ""
+    # Raw context for LLM prompting (filled in by us, so not in the LLM's schema)
+    raw_context: SkipJsonSchema[str] = ""
 
     @field_validator(
         "key_skills",
@@ -148,52 +217,382 @@ class ExtractedProfile(BaseModel):
         return v if v is not None else []
 
 
+class FusedExtraction(BaseModel):
+    """Reply to ``FUSED_EXTRACTION_PROMPT``."""
+
+    profile: ExtractedProfile
+    context_statement: str
+
+
+_LIST_FIELDS = [
+    name for name, field in ExtractedProfile.model_fields.items() if field.annotation == list[str]
+]
+_SCALAR_FIELDS = [
+    name
+    for name in ExtractedProfile.model_fields
+    if name not in _LIST_FIELDS and name != "raw_context"
+]
+
+
+def merge_profiles(profiles: list[ExtractedProfile]) -> ExtractedProfile:
+    """Combine partial profiles (e.g. one per file) into one, deterministically.
+
+    List fields are unioned in order, dropping case-insensitive duplicates.
+    Each scalar field takes its most common non-null value; ties go to the
+    earliest profile. Raw contexts are joined in order.
+    """
+    merged: dict = {}
+    for name in _LIST_FIELDS:
+        seen = set()
+        values = []
+        for profile in profiles:
+            for value in getattr(profile, name):
+                key = value.strip().lower()
+                if key and key not in seen:
+                    seen.add(key)
+                    values.append(value.strip())
+        merged[name] = values
+
+    for name in _SCALAR_FIELDS:
+        votes: Counter = Counter()
+        first: dict = {}
+        for profile in profiles:
+            value = getattr(profile, name)
+            if value is None:
+                continue
+            key = value.strip().lower() if isinstance(value, str) else value
+            votes[key] += 1
+            first.setdefault(key, value)
+        if votes:
+            # Counter.most_common is stable, so ties keep first-seen order
+            merged[name] = first[votes.most_common(1)[0][0]]
+
+    merged["raw_context"] = "\n\n".join(p.raw_context for p in profiles if p.raw_context)
+    return ExtractedProfile(**merged)
+
+
+# =============================================================================
+# Extraction Cache
+# =============================================================================
+
+
+def _sha256(*parts: str | bytes) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8") if isinstance(part, str) else part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _model() -> str:
+    # The model complete() will use when none is given
+    return os.getenv("DEFAULT_MODEL", DEFAULT_MODEL)
+
+
+def _file_priority(filename: str) -> int:
+    # Imported here: centuria.persona imports this module
+    from centuria.persona.file_types import get_file_priority
+
+    return get_file_priority(filename)
+
+
+def file_hash(path: str | Path) -> str:
+    """Content hash of one input file, including its name (which the prompt shows)."""
+    path = Path(path)
+    return _sha256(path.name, path.read_bytes())
+
+
+class ExtractionCache:
+    """On-disk cache of extracted profiles and context statements.
+
+    Profiles are keyed on the sorted content hashes of their input files,
+    context statements on the hash of the profile they were built from. Both
+    keys include a hash of the prompt and the model, so editing either
+    invalidates the affected entries automatically.
+
+    A disabled cache (``enabled=False``) never stores or returns anything.
+    """
+
+    def __init__(self, directory: str | Path | None = None, enabled: bool = True):
+        self.directory = Path(directory or get_cache_dir()) / "extraction"
+        self.enabled = enabled
+        self._cache = None
+        self._stats: Counter[str] = Counter()
+
+    def _store(self):
+        if self._cache is None:
+            import diskcache
+
+            self._cache = diskcache.Cache(str(self.directory))
+        return self._cache
+
+    def close(self) -> None:
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+
+    @staticmethod
+    def profile_key(file_hashes: list[str]) -> str:
+        prompt_version = _sha256(
+            PROFILE_EXTRACTION_PROMPT, str(EXTRACTION_CHUNK_TOKENS), _model()
+        )
+        return "profile:" + _sha256(prompt_version, *sorted(file_hashes))
+
+    @staticmethod
+    def fused_key(file_hashes: list[str]) -> str:
+        prompt_version = _sha256(FUSED_EXTRACTION_PROMPT, str(EXTRACTION_CHUNK_TOKENS), _model())
+        return "fused:" + _sha256(prompt_version, *sorted(file_hashes))
+
+    @staticmethod
+    def context_key(profile: ExtractedProfile) -> str:
+        prompt_version = _sha256(CONTEXT_STATEMENT_PROMPT, str(CONTEXT_PROMPT_TOKENS), _model())
+        return "context:" + _sha256(prompt_version, profile.model_dump_json())
+
+    def _get(self, kind: str, key: str) -> str | None:
+        value = self._store().get(key) if self.enabled else None
+        self._stats[f"{kind}_hits" if value is not None else f"{kind}_misses"] += 1
+        return value
+
+    def _set(self, key: str, value: str) -> None:
+        if self.enabled:
+            self._store().set(key, value)
+
+    def get_profile(self, file_hashes: list[str]) -> ExtractedProfile | None:
+        data = self._get("profile", self.profile_key(file_hashes))
+        return None if data is None else ExtractedProfile.model_validate_json(data)
+
+    def set_profile(self, file_hashes: list[str], profile: ExtractedProfile) -> None:
+        self._set(self.profile_key(file_hashes), profile.model_dump_json())
+
+    def get_context(self, profile: ExtractedProfile) -> str | None:
+        return self._get("context", self.context_key(profile))
+
+    def set_context(self, profile: ExtractedProfile, context: str) -> None:
+        self._set(self.context_key(profile), context)
+
+    def get_fused(self, file_hashes: list[str]) -> tuple[ExtractedProfile, str] | None:
+        data = self._get("fused", self.fused_key(file_hashes))
+        if data is None:
+            return None
+        data = json.loads(data)
+        return ExtractedProfile.model_validate(data["profile"]), data["context"]
+
+    def set_fused(self, file_hashes: list[str], profile: ExtractedProfile, context: str) -> None:
+        data = {"profile": profile.model_dump(), "context": context}
+        self._set(self.fused_key(file_hashes), json.dumps(data))
+
+    def invalidate(self, paths: list[str | Path]) -> bool:
+        """Drop the cached partial profiles for these input files.
+
+        If every file was cached, the context statement built from their
+        merged profile is dropped too, as is a fused result for exactly these
+        files. Returns whether anything was cached.
+        """
+        if not self.enabled:
+            return False
+        fused = self._store().pop(self.fused_key([file_hash(p) for p in paths]), default=None)
+        partials = []
+        for path in sorted(paths, key=lambda p: Path(p).name):
+            data = self._store().pop(self.profile_key([file_hash(path)]), default=None)
+            partials.append(None if data is None else ExtractedProfile.model_validate_json(data))
+        if partials and all(p is not None for p in partials):
+            self._store().delete(self.context_key(merge_profiles(partials)))
+        return fused is not None or any(p is not None for p in partials)
+
+    def clear(self) -> None:
+        """Drop every cached profile and context statement."""
+        if self.enabled:
+            self._store().clear()
+
+    def stats(self) -> dict:
+        """Hits and misses since this cache was created, plus entries on disk."""
+        return {
+            "profile_hits": self._stats["profile_hits"],
+            "profile_misses": self._stats["profile_misses"],
+            "context_hits": self._stats["context_hits"],
+            "context_misses": self._stats["context_misses"],
+            "fused_hits": self._stats["fused_hits"],
+            "fused_misses": self._stats["fused_misses"],
+            "entries": len(self._store()) if self.enabled else 0,
+        }
+
+
+_default_cache: ExtractionCache | None = None
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """The shared cache, configured by ENABLE_CACHE and CACHE_DIR."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ExtractionCache(enabled=is_cache_enabled())
+    return _default_cache
+
+
+# =============================================================================
+# Extraction
+# =============================================================================
+
+
 async def extract_profile_from_text(content: str) -> ExtractedProfile:
-    """Extract a structured profile from raw text content."""
+    """Extract a structured profile from raw text content.
+
+    Raises:
+        StructuredOutputError: If the reply is not a valid profile, even after a repair call
+    """
     prompt = PROFILE_EXTRACTION_PROMPT.format(content=content)
-    result = await complete(prompt)
+    result = await complete(prompt, response_model=ExtractedProfile)
 
-    try:
-        data = parse_json_response(result.content)
-        return ExtractedProfile(raw_context=content, **data)
-    except (json.JSONDecodeError, TypeError):
-        # If parsing fails, return profile with just raw context
-        return ExtractedProfile(raw_context=content)
+    profile = result.parsed
+    profile.raw_context = content
+    return profile
 
 
-async def extract_profile_from_files(paths: list[str]) -> ExtractedProfile:
-    """Extract a structured profile from multiple personal data files."""
-    # Load and tag each file
-    sections = []
-    for path in paths:
-        p = Path(path)
-        content = load_text(path)
-        filename = p.name
-        sections.append(f"=== {filename} ===\n{content}")
+async def extract_profile_from_file(
+    path: str | Path, cache: ExtractionCache | None = None
+) -> ExtractedProfile:
+    """Extract a partial profile from one personal data file.
 
-    combined = "\n\n".join(sections)
-    return await extract_profile_from_text(combined)
+    Files over ``EXTRACTION_CHUNK_TOKENS`` tokens are split at paragraph or
+    sentence boundaries; the chunks are extracted concurrently (at most
+    ``EXTRACTION_CHUNK_CONCURRENCY`` at a time) and merged.
 
+    Args:
+        cache: Where to look up and store the profile (default: the shared cache)
+    """
+    cache = cache or get_extraction_cache()
+    path = Path(path)
+    hashes = [await asyncio.to_thread(file_hash, path)]
+    cached = cache.get_profile(hashes)
+    if cached is not None:
+        return cached
+
+    content = await aload_text(str(path))
+    # Leave room for the longest header a chunk can get
+    header_tokens = count_tokens(f"=== {path.name} (part 999 of 999) ===\n", model=_model())
+    chunk_tokens = max(1, EXTRACTION_CHUNK_TOKENS - header_tokens)
+    chunks = chunk_text(content, chunk_tokens, model=_model())
+    if len(chunks) <= 1:
+        profile = await extract_profile_from_text(f"=== {path.name} ===\n{content}")
+    else:
+        semaphore = asyncio.Semaphore(EXTRACTION_CHUNK_CONCURRENCY)
+
+        async def extract_chunk(i: int, chunk: str) -> ExtractedProfile:
+            async with semaphore:
+                header = f"=== {path.name} (part {i} of {len(chunks)}) ==="
+                return await extract_profile_from_text(f"{header}\n{chunk}")
+
+        partials = await asyncio.gather(
+            *(extract_chunk(i, chunk) for i, chunk in enumerate(chunks, 1))
+        )
+        profile = merge_profiles(list(partials))
+        profile.raw_context = f"=== {path.name} ===\n{content}"
+
+    cache.set_profile(hashes, profile)
+    return profile
+
+
+async def extract_profile_from_files(
+    paths: list[str], cache: ExtractionCache | None = None
+) -> ExtractedProfile:
+    """Extract a structured profile from multiple personal data files.
+
+    Each file is loaded, extracted and cached on its own, concurrently, and the
+    partial profiles are merged with ``merge_profiles`` in filename order.
+    Adding or changing one file therefore costs one small call.
+
+    Args:
+        cache: Where to look up and store the profiles (default: the shared cache)
+    """
+    paths = sorted(paths, key=lambda p: Path(p).name)
+    partials = await asyncio.gather(*(extract_profile_from_file(p, cache=cache) for p in paths))
+    return merge_profiles(list(partials))
+
+
+async def build_context_statement(
+    profile: ExtractedProfile, cache: ExtractionCache | None = None
+) -> str:
+    """Build a rich context statement from an extracted profile.
+
+    Args:
+        cache: Where to look up and store the statement (default: the shared cache)
+    """
+    cache = cache or get_extraction_cache()
+    cached = cache.get_context(profile)
+    if cached is not None:
+        return cached
 
-async def build_context_statement(profile: ExtractedProfile) -> str:
-    """Build a rich context statement from an extracted profile."""
     # Convert profile to JSON, excluding raw_context for the structured view
     profile_dict = profile.model_dump(exclude={"raw_context"})
     profile_json = json.dumps(profile_dict, indent=2)
 
+    # The raw data gets exactly the tokens the rest of the prompt leaves
+    model = _model()
+    template = CONTEXT_STATEMENT_PROMPT.format(profile_json=profile_json, raw_context="")
+    budget = CONTEXT_PROMPT_TOKENS - count_tokens(template, model=model)
+    raw_context = fit_sections(profile.raw_context, budget, priority=_file_priority, model=model)
+
     prompt = CONTEXT_STATEMENT_PROMPT.format(
         profile_json=profile_json,
-        raw_context=profile.raw_context[:RAW_CONTEXT_CHAR_LIMIT],
+        raw_context=raw_context,
     )
 
     result = await complete(prompt)
-    return result.content.strip()
+    context = result.content.strip()
+    cache.set_context(profile, context)
+    return context
+
+
+async def extract_profile_and_context(
+    paths: list[str], cache: ExtractionCache | None = None
+) -> tuple[ExtractedProfile, str]:
+    """Extract a profile and write its context statement in one LLM call.
 
+    The fused counterpart of ``extract_profile_from_files`` followed by
+    ``build_context_statement``: one call, and the personal data is sent once
+    rather than twice. Data that does not fit in ``EXTRACTION_CHUNK_TOKENS``,
+    or a reply that is not a valid ``FusedExtraction``, falls back to the two
+    calls.
 
-async def process_personal_folder(folder_path: str) -> tuple[ExtractedProfile, str]:
+    Args:
+        cache: Where to look up and store the result (default: the shared cache)
+    """
+    cache = cache or get_extraction_cache()
+    paths = sorted(paths, key=lambda p: Path(p).name)
+    hashes = list(await asyncio.gather(*(asyncio.to_thread(file_hash, p) for p in paths)))
+    cached = cache.get_fused(hashes)
+    if cached is not None:
+        return cached
+
+    texts = await asyncio.gather(*(aload_text(str(p)) for p in paths))
+    content = "\n\n".join(f"=== {Path(p).name} ===\n{text}" for p, text in zip(paths, texts))
+    if count_tokens(content, model=_model()) <= EXTRACTION_CHUNK_TOKENS:
+        prompt = FUSED_EXTRACTION_PROMPT.format(content=content)
+        try:
+            result = await complete(prompt, response_model=FusedExtraction)
+        except StructuredOutputError:
+            pass
+        else:
+            profile, context = result.parsed.profile, result.parsed.context_statement.strip()
+            if context:
+                profile.raw_context = content
+                cache.set_fused(hashes, profile, context)
+                return profile, context
+
+    profile = await extract_profile_from_files(paths, cache=cache)
+    return profile, await build_context_statement(profile, cache=cache)
+
+
+async def process_personal_folder(
+    folder_path: str, cache: ExtractionCache | None = None, fused: bool | None = None
+) -> tuple[ExtractedProfile, str]:
     """
     Process all files in a personal data folder.
 
+    Unchanged folders are answered from the extraction cache.
+
+    Args:
+        fused: Build the profile and context in one call (default: FUSED_EXTRACTION)
+
     Returns:
         Tuple of (extracted_profile, context_statement)
     """
@@ -202,16 +601,117 @@ async def process_personal_folder(folder_path: str) -> tuple[ExtractedProfile, s
         raise ValueError(f"Not a directory: {folder_path}")
 
     # Find all processable files
-    valid_extensions = {".pdf", ".txt", ".md"}
     files = [
-        str(f) for f in folder.iterdir() if f.is_file() and f.suffix.lower() in valid_extensions
+        str(f)
+        for f in folder.iterdir()
+        if f.is_file() and f.suffix.lower() in PERSONAL_FILE_EXTENSIONS
     ]
 
     if not files:
         raise ValueError(f"No valid files found in {folder_path}")
 
+    if is_fused_extraction_enabled() if fused is None else fused:
+        return await extract_profile_and_context(files, cache=cache)
+
     # Extract profile and build context
-    profile = await extract_profile_from_files(files)
-    context_statement = await build_context_statement(profile)
+    profile = await extract_profile_from_files(files, cache=cache)
+    context_statement = await build_context_statement(profile, cache=cache)
 
     return profile, context_statement
+
+
+# =============================================================================
+# Batch Processing
+# =============================================================================
+
+
+@dataclass
+class FolderResult:
+    """Outcome of processing one personal data folder."""
+
+    folder: Path
+    profile: ExtractedProfile | None = None
+    context: str | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def discover_personal_folders(root: str | Path) -> list[Path]:
+    """The personal data folders under ``root``: its non-hidden subdirectories."""
+    root = Path(root)
+    if not root.is_dir():
+        raise ValueError(f"Not a directory: {root}")
+    return sorted(d for d in root.iterdir() if d.is_dir() and not d.name.startswith("."))
+
+
+def _persona_record(folder: Path, profile: ExtractedProfile) -> dict:
+    """A store record for a processed folder, with the profile's filterable fields."""
+    record = {
+        "id": folder.name,
+        "name": profile.name or folder.name,
+        "occupation": profile.current_role,
+        "industry": profile.industry,
+        "education": profile.education_level,
+        "political_lean": profile.political_lean,
+    }
+    record = {k: v for k, v in record.items() if v is not None}
+    record["profile"] = profile.model_dump(exclude={"raw_context"})
+    return record
+
+
+async def process_personal_folders(
+    root: str | Path,
+    store: PopulationStore | None = None,
+    concurrency: int = FOLDER_CONCURRENCY,
+    cache: ExtractionCache | None = None,
+    progress_callback: Callable[[int, int, FolderResult], None] | None = None,
+    fused: bool | None = None,
+) -> list[FolderResult]:
+    """
+    Process every personal data folder under ``root``.
+
+    At most ``concurrency`` folders are processed at a time, each through
+    ``process_personal_folder`` (so unchanged folders come from the cache).
+    A folder that fails is reported in its result rather than stopping the
+    batch.
+
+    Args:
+        root: Directory with one subdirectory per person
+        store: If given, each processed folder is written to it as soon as it
+            is done, as a persona (id = folder name) with its context statement
+        concurrency: Maximum folders in flight
+        cache: Where to look up and store extraction results (default: the shared cache)
+        progress_callback: Optional callback(current, total, result) after each folder
+        fused: Build each profile and context in one call (default: FUSED_EXTRACTION)
+
+    Returns:
+        One result per folder, in folder name order
+    """
+    folders = discover_personal_folders(root)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def process(folder: Path) -> FolderResult:
+        async with semaphore:
+            try:
+                profile, context = await process_personal_folder(
+                    str(folder), cache=cache, fused=fused
+                )
+            except Exception as e:
+                return FolderResult(folder, error=f"{type(e).__name__}: {e}")
+            return FolderResult(folder, profile=profile, context=context)
+
+    results: dict[Path, FolderResult] = {}
+    for done, next_result in enumerate(asyncio.as_completed([process(f) for f in folders]), 1):
+        result = await next_result
+        results[result.folder] = result
+        if store is not None and result.ok:
+            with store.transaction():
+                store.put_persona(_persona_record(result.folder, result.profile))
+                store.put_context(result.folder.name, result.context)
+        if progress_callback:
+            progress_callback(done, len(folders), result)
+
+    return [results[f] for f in folders]
@@ -1,17 +1,153 @@
-"""Data loading utilities."""
+"""Data loading utilities.
 
+PDF text extraction is CPU-bound, so it runs in a pool of worker processes:
+large documents are split into page ranges extracted in parallel. Extracted
+text is cached on disk, keyed on the file's content hash and mtime, so each
+PDF is parsed once.
+"""
+
+import asyncio
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from pypdf import PdfReader
+from centuria.config import PDF_PAGES_PER_TASK, PDF_WORKERS, get_cache_dir, is_cache_enabled
+
+
+class TextCache:
+    """On-disk cache of text extracted from PDFs.
+
+    A disabled cache (``enabled=False``) never stores or returns anything.
+    """
+
+    def __init__(self, directory: str | Path | None = None, enabled: bool = True):
+        self.directory = Path(directory or get_cache_dir()) / "text"
+        self.enabled = enabled
+        self._cache = None
+
+    def _store(self):
+        if self._cache is None:
+            import diskcache
+
+            self._cache = diskcache.Cache(str(self.directory))
+        return self._cache
+
+    def close(self) -> None:
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+
+    @staticmethod
+    def key(path: str | Path) -> str:
+        path = Path(path)
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        return f"pdf:{digest}:{path.stat().st_mtime_ns}"
+
+    def get(self, key: str) -> str | None:
+        return self._store().get(key) if self.enabled else None
+
+    def set(self, key: str, text: str) -> None:
+        if self.enabled:
+            self._store().set(key, text)
+
+    def clear(self) -> None:
+        if self.enabled:
+            self._store().clear()
+
+
+_default_cache: TextCache | None = None
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_text_cache() -> TextCache:
+    """The shared cache, configured by ENABLE_CACHE and CACHE_DIR."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TextCache(enabled=is_cache_enabled())
+    return _default_cache
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    return _pool
+
+
+def _extract_pages(path: str, start: int, stop: int) -> tuple[list[str], int]:
+    """Text of pages ``start:stop`` of a PDF, and its total page count.
+
+    Runs in a worker process.
+    """
+    from pypdf import PdfReader
 
+    reader = PdfReader(path)
+    pages = reader.pages[start:stop]
+    return [page.extract_text() or "" for page in pages], len(reader.pages)
 
-def load_text(path: str) -> str:
-    """Load text from a file (.txt, .md, or .pdf)."""
+
+def _page_ranges(page_count: int) -> list[tuple[int, int]]:
+    """Page ranges after the first, one per worker task."""
+    return [
+        (start, min(start + PDF_PAGES_PER_TASK, page_count))
+        for start in range(PDF_PAGES_PER_TASK, page_count, PDF_PAGES_PER_TASK)
+    ]
+
+
+def _load_pdf(path: Path, cache: TextCache) -> str:
+    key = cache.key(path)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    # The first range tells us the page count; only longer PDFs use the pool
+    pages, page_count = _extract_pages(str(path), 0, PDF_PAGES_PER_TASK)
+    ranges = _page_ranges(page_count)
+    if ranges:
+        starts, stops = zip(*ranges)
+        for more, _ in _get_pool().map(_extract_pages, [str(path)] * len(ranges), starts, stops):
+            pages.extend(more)
+
+    text = "\n".join(pages)
+    cache.set(key, text)
+    return text
+
+
+async def _aload_pdf(path: Path, cache: TextCache) -> str:
+    key = await asyncio.to_thread(cache.key, path)
+    cached = await asyncio.to_thread(cache.get, key)
+    if cached is not None:
+        return cached
+
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    pages, page_count = await loop.run_in_executor(
+        pool, _extract_pages, str(path), 0, PDF_PAGES_PER_TASK
+    )
+    rest = await asyncio.gather(
+        *(
+            loop.run_in_executor(pool, _extract_pages, str(path), start, stop)
+            for start, stop in _page_ranges(page_count)
+        )
+    )
+    for more, _ in rest:
+        pages.extend(more)
+
+    text = "\n".join(pages)
+    await asyncio.to_thread(cache.set, key, text)
+    return text
+
+
+def load_text(path: str, cache: TextCache | None = None) -> str:
+    """Load text from a file (.txt, .md, or .pdf).
+
+    Args:
+        cache: Where to look up and store PDF text (default: the shared cache)
+    """
     p = Path(path)
 
     if p.suffix.lower() == ".pdf":
-        reader = PdfReader(p)
-        return "\n".join(page.extract_text() or "" for page in reader.pages)
+        return _load_pdf(p, cache or get_text_cache())
 
     return p.read_text()
 
@@ -20,3 +156,19 @@ def load_files(paths: list[str]) -> str:
     """Load and combine text from multiple files."""
     texts = [load_text(p) for p in paths]
     return "\n\n".join(texts)
+
+
+async def aload_text(path: str, cache: TextCache | None = None) -> str:
+    """Async ``load_text``: reads in a thread, extracts PDFs in worker processes."""
+    p = Path(path)
+
+    if p.suffix.lower() == ".pdf":
+        return await _aload_pdf(p, cache or get_text_cache())
+
+    return await asyncio.to_thread(p.read_text)
+
+
+async def aload_files(paths: list[str]) -> str:
+    """Async ``load_files``: loads all the files concurrently."""
+    texts = await asyncio.gather(*(aload_text(p) for p in paths))
+    return "\n\n".join(texts)
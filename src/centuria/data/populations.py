@@ -0,0 +1,124 @@
+"""Server-side persona populations.
+
+A population is a named set of personas stored as a JSON list of records with
+at least ``id``, ``name`` and ``context``. Surveys can reference personas by
+population ID and persona ID instead of sending every context over the wire;
+the store keeps each population in memory and reloads it when its file changes.
+
+Populations may also register a demographics file (records without contexts);
+the store builds a bitmap ``PersonaIndex`` over it for subgroup queries.
+"""
+
+import json
+from pathlib import Path
+
+from centuria.data.query import Filters, PersonaIndex
+from centuria.models import Persona
+
+_project_root = Path(__file__).parent.parent.parent.parent
+_synthetic_dir = _project_root / "data" / "synthetic"
+
+# Population ID -> personas file
+POPULATIONS = {
+    "dalston-clt": _synthetic_dir / "dalston_clt" / "personas_for_survey.json",
+}
+
+# Population ID -> demographics file used for indexed queries
+DEMOGRAPHICS = {
+    "dalston-clt": _synthetic_dir / "dalston_clt" / "personas.json",
+}
+
+
+class UnknownPopulationError(KeyError):
+    """The population ID is not registered or its file is missing."""
+
+
+class UnknownPersonaError(KeyError):
+    """One or more persona IDs are not in the population."""
+
+
+class _Population:
+    def __init__(self, path: Path, mtime: float):
+        self.mtime = mtime
+        with open(path) as f:
+            self.records: list[dict] = json.load(f)
+        self.personas: dict[str, Persona] = {
+            r["id"]: Persona(id=r["id"], name=r["name"], context=r["context"])
+            for r in self.records
+        }
+
+
+class _Demographics:
+    def __init__(self, path: Path, mtime: float):
+        self.mtime = mtime
+        with open(path) as f:
+            self.index = PersonaIndex(json.load(f))
+
+
+class PersonaStore:
+    """In-memory cache of persona populations, invalidated on file mtime change."""
+
+    def __init__(
+        self,
+        sources: dict[str, Path] | None = None,
+        demographics: dict[str, Path] | None = None,
+    ):
+        self.sources = dict(POPULATIONS if sources is None else sources)
+        self.demographics = dict(DEMOGRAPHICS if demographics is None else demographics)
+        self._loaded: dict[str, _Population] = {}
+        self._indexes: dict[str, _Demographics] = {}
+
+    def _population(self, population_id: str) -> _Population:
+        path = self.sources.get(population_id)
+        if path is None or not path.exists():
+            raise UnknownPopulationError(population_id)
+
+        mtime = path.stat().st_mtime
+        cached = self._loaded.get(population_id)
+        if cached is None or cached.mtime != mtime:
+            cached = _Population(path, mtime)
+            self._loaded[population_id] = cached
+        return cached
+
+    def index(self, population_id: str) -> PersonaIndex:
+        """Bitmap index over the population's demographics (falls back to its records)."""
+        path = self.demographics.get(population_id) or self.sources.get(population_id)
+        if path is None or not path.exists():
+            raise UnknownPopulationError(population_id)
+
+        mtime = path.stat().st_mtime
+        cached = self._indexes.get(population_id)
+        if cached is None or cached.mtime != mtime:
+            cached = _Demographics(path, mtime)
+            self._indexes[population_id] = cached
+        return cached.index
+
+    def query_ids(self, population_id: str, filters: Filters | None = None) -> list[str]:
+        """IDs of personas matching demographic filters, in population order."""
+        return [r["id"] for r in self.index(population_id).query(filters)]
+
+    def records(self, population_id: str) -> list[dict]:
+        """Raw persona records for a population, in file order."""
+        return self._population(population_id).records
+
+    def get_personas(
+        self, population_id: str, persona_ids: list[str] | None = None
+    ) -> list[Persona]:
+        """Resolve persona IDs to Personas (all personas when persona_ids is None).
+
+        Raises:
+            UnknownPopulationError: If the population does not exist
+            UnknownPersonaError: If any persona ID is not in the population
+        """
+        personas = self._population(population_id).personas
+        if persona_ids is None:
+            return list(personas.values())
+
+        missing = [pid for pid in persona_ids if pid not in personas]
+        if missing:
+            raise UnknownPersonaError(missing)
+        return [personas[pid] for pid in persona_ids]
+
+
+# Shared store used by the API server
+persona_store = PersonaStore()
@@ -0,0 +1,176 @@
+"""Indexed demographic queries over persona populations.
+
+Every scalar column of a population (except free text such as names) gets a
+bitmap index: for each distinct value, a Python int whose bit ``i`` is set
+when record ``i`` has that value.
+Filters are then a handful of big-int AND/OR operations rather than a scan
+over every persona, and counts and crosstabs are popcounts of intersections.
+
+Filters map a field to a value, a list of values (any of), or a range::
+
+    {"tenure": "private_rented", "age": {"min": 25, "max": 40}}
+
+These are the filters ``centuria.store`` translates to SQL, parsed by the same
+``parse_filters``, and bad ones raise the same ``InvalidFilterError``.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from centuria.store import InvalidFilterError, parse_filters
+
+Filters = dict[str, Any]
+
+# Free-text fields: nearly every value is distinct, so a bitmap per value
+# would cost memory quadratic in the population size for no useful query
+FREE_TEXT_FIELDS = ("name", "personality_sketch", "address", "brief", "context")
+
+# Bit positions set in each byte value
+_BYTE_BITS = [tuple(i for i in range(8) if byte >> i & 1) for byte in range(256)]
+
+
+def _iter_bits(mask: int) -> Iterator[int]:
+    """Indices of the set bits of ``mask``, ascending.
+
+    Works a byte at a time, so it is linear in the size of the mask.
+    """
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    for offset, byte in enumerate(data):
+        if byte:
+            base = offset * 8
+            for bit in _BYTE_BITS[byte]:
+                yield base + bit
+
+
+def _key(value: Any) -> tuple[bool, Any]:
+    """Bitmap key of a value; ``True`` and ``1`` are equal in Python but not here."""
+    return isinstance(value, bool), value
+
+
+def _label(key: tuple[bool, Any]) -> Any:
+    """Result key of a bitmap key: booleans as their JSON spelling, apart from 1 and 0."""
+    is_bool, value = key
+    if is_bool:
+        return "true" if value else "false"
+    return value
+
+
+class PersonaIndex:
+    """Bitmap indexes over the scalar fields of a list of persona records."""
+
+    def __init__(self, records: list[dict], exclude: Iterable[str] = FREE_TEXT_FIELDS):
+        self.records = records
+        self.all = (1 << len(records)) - 1
+        self._bitmaps: dict[str, dict[tuple[bool, Any], int]] = {}
+        self._sorted_values: dict[str, list] = {}
+
+        excluded = set(exclude)
+        for i, record in enumerate(records):
+            bit = 1 << i
+            for field, value in record.items():
+                if field not in excluded and isinstance(value, (str, int, float, bool)):
+                    column = self._bitmaps.setdefault(field, {})
+                    key = _key(value)
+                    column[key] = column.get(key, 0) | bit
+
+        for field, column in self._bitmaps.items():
+            numeric = [v for is_bool, v in column if not is_bool and isinstance(v, (int, float))]
+            if numeric:
+                self._sorted_values[field] = sorted(numeric)
+
+    @property
+    def fields(self) -> list[str]:
+        """Fields that can be filtered and grouped on."""
+        return sorted(self._bitmaps)
+
+    def values(self, field: str) -> list:
+        """Distinct values of an indexed field."""
+        return [value for _, value in self._column(field)]
+
+    def _column(self, field: str) -> dict[tuple[bool, Any], int]:
+        try:
+            return self._bitmaps[field]
+        except KeyError:
+            raise InvalidFilterError(f"Unknown field: {field}") from None
+
+    def _match(self, field: str, kind: str, value: Any) -> int:
+        column = self._column(field)
+
+        if kind == "range":
+            values = self._sorted_values.get(field)
+            if values is None:
+                raise InvalidFilterError(f"Field {field} is not numeric")
+            low, high = value
+            lo = 0 if low is None else bisect_left(values, low)
+            hi = len(values) if high is None else bisect_right(values, high)
+            mask = 0
+            for number in values[lo:hi]:
+                mask |= column[False, number]
+            return mask
+
+        if kind == "any":
+            mask = 0
+            for item in value:
+                mask |= column.get(_key(item), 0)
+            return mask
+
+        return column.get(_key(value), 0)
+
+    def select(self, filters: Filters | None = None) -> int:
+        """Bitmap of records matching every filter.
+
+        Raises:
+            InvalidFilterError: If a filter names an unindexed field or is malformed
+        """
+        mask = self.all
+        for field, kind, value in parse_filters(filters):
+            mask &= self._match(field, kind, value)
+            if not mask:
+                break
+        return mask
+
+    def query(self, filters: Filters | None = None) -> list[dict]:
+        """Records matching the filters, in population order."""
+        return [self.records[i] for i in _iter_bits(self.select(filters))]
+
+    def count(self, filters: Filters | None = None) -> int:
+        return self.select(filters).bit_count()
+
+    def count_by(self, field: str, filters: Filters | None = None) -> dict[Any, int]:
+        """Number of matching records per value of ``field``, largest first.
+
+        Booleans are counted under ``"true"``/``"false"``, as in the crosstab.
+        """
+        mask = self.select(filters)
+        counts = {
+            _label(key): (bitmap & mask).bit_count() for key, bitmap in self._column(field).items()
+        }
+        return dict(sorted(((v, n) for v, n in counts.items() if n), key=lambda x: -x[1]))
+
+    def crosstab(
+        self, row_field: str, col_field: str, filters: Filters | None = None
+    ) -> dict[Any, dict[Any, int]]:
+        """Counts of matching records for every (row value, column value) pair.
+
+        Booleans are keyed ``"true"``/``"false"``, so they do not merge with 1 and 0.
+        """
+        mask = self.select(filters)
+        cols = self._column(col_field)
+        table = {}
+        for row_key, row_bitmap in self._column(row_field).items():
+            row_mask = row_bitmap & mask
+            if not row_mask:
+                continue
+            row = {}
+            for col_key, col_bitmap in cols.items():
+                n = (row_mask & col_bitmap).bit_count()
+                if n:
+                    row[_label(col_key)] = n
+            table[_label(row_key)] = row
+        return table
+
+
+def query_personas(records: list[dict], filters: Filters | None = None) -> list[dict]:
+    """One-off filter over persona records (builds a throwaway index)."""
+    return PersonaIndex(records).query(filters)
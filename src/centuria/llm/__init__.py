@@ -1,5 +1,41 @@
 """LLM utilities."""
 
-from centuria.llm.client import CompletionResult, CostEstimate, complete, estimate_cost
+from centuria.llm.client import (
+    CompletionResult,
+    CostEstimate,
+    DeadlineExceeded,
+    StructuredOutputError,
+    UsageTotals,
+    call_gate,
+    complete,
+    deadline,
+    estimate_cost,
+    track_usage,
+)
+from centuria.llm.tokens import (
+    Tokenizer,
+    chunk_text,
+    count_tokens,
+    fit_sections,
+    get_tokenizer,
+    truncate_at_sentence,
+)
 
-__all__ = ["CompletionResult", "CostEstimate", "complete", "estimate_cost"]
+__all__ = [
+    "CompletionResult",
+    "CostEstimate",
+    "DeadlineExceeded",
+    "StructuredOutputError",
+    "call_gate",
+    "complete",
+    "deadline",
+    "estimate_cost",
+    "track_usage",
+    "UsageTotals",
+    "Tokenizer",
+    "chunk_text",
+    "count_tokens",
+    "fit_sections",
+    "get_tokenizer",
+    "truncate_at_sentence",
+]
@@ -1,22 +1,119 @@
-"""LLM client using LiteLLM."""
+"""LLM client using LiteLLM.
 
+LiteLLM takes several seconds to import, so it is loaded on first use rather
+than when ``centuria`` is imported.
+
+``complete(response_model=...)`` returns validated pydantic output, using the
+provider's JSON-schema mode (tool calls for Anthropic, translated by LiteLLM)
+or JSON mode where the model supports one.
+"""
+
+import asyncio
+import json
 import os
+import time
 import warnings
+from collections.abc import Callable, Iterator
+from contextlib import AbstractAsyncContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
 from dataclasses import dataclass
+from functools import cache
 from pathlib import Path
 
-import litellm
-from dotenv import load_dotenv
+from pydantic import BaseModel, ValidationError
 
 from centuria.config import DEFAULT_MODEL
+from centuria.utils import extract_json_from_text
 
-# Load .env from project root (handles running from notebooks/)
 _project_root = Path(__file__).parent.parent.parent.parent
-load_dotenv(_project_root / ".env")
 
-# Suppress litellm noise
-litellm.suppress_debug_info = True
-warnings.filterwarnings("ignore", category=UserWarning, module="pydantic")
+
+@cache
+def _load_env() -> None:
+    """Load .env from project root (handles running from notebooks/)."""
+    from dotenv import load_dotenv
+
+    load_dotenv(_project_root / ".env")
+
+
+@cache
+def _litellm():
+    """Import and configure LiteLLM on first use."""
+    _load_env()
+    import litellm
+
+    # Suppress litellm noise
+    litellm.suppress_debug_info = True
+    warnings.filterwarnings("ignore", category=UserWarning, module="pydantic")
+    return litellm
+
+
+# Absolute time.monotonic() by which every complete() call in this context must finish
+_deadline: ContextVar[float | None] = ContextVar("centuria_llm_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """An LLM call was started after, or ran past, the active deadline."""
+
+
+@contextmanager
+def deadline(seconds: float | None) -> Iterator[None]:
+    """Give every complete() call made inside this block a shared time budget.
+
+    The budget propagates to tasks created inside the block (e.g. by
+    asyncio.gather). Nested deadlines can only shorten the budget.
+    """
+    if seconds is None:
+        yield
+        return
+
+    new_deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(new_deadline if current is None else min(current, new_deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def _remaining_time(timeout: float | None) -> float | None:
+    """Seconds left for a call, combining its own timeout with the active deadline."""
+    limit = _deadline.get()
+    remaining = None if limit is None else limit - time.monotonic()
+    if timeout is not None:
+        remaining = timeout if remaining is None else min(remaining, timeout)
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded("Deadline exceeded before LLM call started")
+    return remaining
+
+
+# Factory for an async context manager every complete() call in this context runs inside
+_call_gate: ContextVar[Callable[[], AbstractAsyncContextManager] | None] = ContextVar(
+    "centuria_llm_call_gate", default=None
+)
+
+
+@contextmanager
+def call_gate(gate: Callable[[], AbstractAsyncContextManager] | None) -> Iterator[None]:
+    """Run every complete() call made inside this block within ``gate()``.
+
+    Used for admission control: the gate can hold the call until a
+    concurrency slot is free. Like deadline(), it propagates to tasks created
+    inside the block.
+    """
+    token = _call_gate.set(gate)
+    try:
+        yield
+    finally:
+        _call_gate.reset(token)
+
+
+class StructuredOutputError(ValueError):
+    """The reply did not match the response model, even after a repair call."""
+
+    def __init__(self, message: str, content: str):
+        super().__init__(message)
+        self.content = content
 
 
 @dataclass
@@ -27,6 +124,42 @@ class CompletionResult:
     prompt_tokens: int
     completion_tokens: int
     cost: float  # USD
+    parsed: BaseModel | None = None  # Set when complete() is given a response_model
+
+
+@dataclass
+class UsageTotals:
+    """LLM usage added up by track_usage()."""
+
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0  # USD
+
+    def add(self, result: CompletionResult) -> None:
+        self.calls += 1
+        self.prompt_tokens += result.prompt_tokens
+        self.completion_tokens += result.completion_tokens
+        self.cost += result.cost or 0.0
+
+
+# Totals every complete() call in this context adds its usage to (one per nested block)
+_usage: ContextVar[tuple[UsageTotals, ...]] = ContextVar("centuria_llm_usage", default=())
+
+
+@contextmanager
+def track_usage() -> Iterator[UsageTotals]:
+    """Add up the usage of every complete() call made inside this block.
+
+    Like deadline(), it covers tasks created inside the block; nested blocks
+    each see their own calls, and the outer block sees them too.
+    """
+    totals = UsageTotals()
+    token = _usage.set((*_usage.get(), totals))
+    try:
+        yield totals
+    finally:
+        _usage.reset(token)
 
 
 @dataclass
@@ -56,6 +189,7 @@ def estimate_cost(
     Returns:
         CostEstimate with token counts and estimated cost
     """
+    litellm = _litellm()
     model = model or os.getenv("DEFAULT_MODEL", DEFAULT_MODEL)
 
     messages = []
@@ -84,11 +218,82 @@ def estimate_cost(
     )
 
 
+# Follow-up sent once when a reply does not validate against the response model
+REPAIR_PROMPT = """That reply does not match the required JSON schema:
+{error}
+
+Return the corrected JSON only, with no other text."""
+
+
+def _response_format(litellm, model: str, response_model: type[BaseModel]) -> dict | None:
+    """The strongest JSON mode ``model`` supports, or None for prompt-only JSON."""
+    try:
+        if litellm.supports_response_schema(model=model):
+            schema = response_model.model_json_schema()
+            return {
+                "type": "json_schema",
+                "json_schema": {"name": response_model.__name__, "schema": schema},
+            }
+        if "response_format" in (litellm.get_supported_openai_params(model=model) or []):
+            return {"type": "json_object"}
+    except Exception:
+        # Unknown model or provider: rely on the prompt
+        pass
+    return None
+
+
+def _validate(response_model: type[BaseModel], content: str) -> BaseModel:
+    """Validate a reply, looking past code fences or prose around the JSON if needed."""
+    try:
+        return response_model.model_validate_json(content)
+    except ValidationError:
+        data = extract_json_from_text(content)
+        if data is None:
+            raise
+        return response_model.model_validate(data)
+
+
+async def _acompletion(litellm, kwargs: dict, timeout: float | None) -> CompletionResult:
+    """One LLM call, within the active deadline and call gate."""
+    model = kwargs["model"]
+    remaining = _remaining_time(timeout)
+    if remaining is not None:
+        kwargs = {**kwargs, "timeout": remaining}
+
+    gate = _call_gate.get()
+    try:
+        async with asyncio.timeout(remaining), (gate() if gate else nullcontext()):
+            response = await litellm.acompletion(**kwargs)
+    except TimeoutError as e:
+        raise DeadlineExceeded(f"LLM call to {model} ran past its deadline") from e
+
+    # Calculate cost using litellm's built-in pricing
+    cost = litellm.completion_cost(completion_response=response)
+
+    message = response.choices[0].message
+    content = message.content
+    if content is None and getattr(message, "tool_calls", None):
+        # Tool-call mode: the JSON is the tool's arguments
+        content = message.tool_calls[0].function.arguments
+
+    result = CompletionResult(
+        content=content,
+        prompt_tokens=response.usage.prompt_tokens,
+        completion_tokens=response.usage.completion_tokens,
+        cost=cost,
+    )
+    for totals in _usage.get():
+        totals.add(result)
+    return result
+
+
 async def complete(
     prompt: str,
     system: str | None = None,
     model: str | None = None,
     api_keys: dict[str, str] | None = None,
+    timeout: float | None = None,
+    response_model: type[BaseModel] | None = None,
 ) -> CompletionResult:
     """
     Get a completion from an LLM.
@@ -99,12 +304,30 @@ async def complete(
         model: Model to use (defaults to DEFAULT_MODEL env var or gpt-4o)
         api_keys: Optional dict with provider keys (openai, anthropic, gemini)
                   to use instead of environment variables
+        timeout: Optional per-call limit in seconds, on top of any active deadline()
+        response_model: Optional pydantic model the reply must be JSON for. The
+                  validated object is returned in ``parsed``; a reply that does
+                  not validate gets one repair call
 
     Returns:
-        CompletionResult with content and usage stats
+        CompletionResult with content and usage stats (of both calls, if a
+        repair was needed)
+
+    Raises:
+        DeadlineExceeded: If the timeout or active deadline runs out
+        StructuredOutputError: If the reply still does not validate after the repair call
     """
+    litellm = _litellm()
     model = model or os.getenv("DEFAULT_MODEL", DEFAULT_MODEL)
 
+    response_format = None
+    if response_model is not None:
+        response_format = _response_format(litellm, model, response_model)
+        if response_format is None or response_format["type"] == "json_object":
+            # The model is not given the schema any other way
+            schema = json.dumps(response_model.model_json_schema())
+            prompt = f"{prompt}\n\nReturn JSON matching this JSON schema:\n{schema}"
+
     messages = []
     if system:
         messages.append({"role": "system", "content": system})
@@ -112,6 +335,8 @@ async def complete(
 
     # Build kwargs with optional API key override
     kwargs: dict = {"model": model, "messages": messages}
+    if response_format is not None:
+        kwargs["response_format"] = response_format
 
     if api_keys is not None:
         # When api_keys is provided, ALWAYS use it (no env var fallback)
@@ -123,14 +348,34 @@ async def complete(
         elif model.startswith("gemini"):
             kwargs["api_key"] = api_keys.get("gemini") or "no-key-configured"
 
-    response = await litellm.acompletion(**kwargs)
+    result = await _acompletion(litellm, kwargs, timeout)
+    if response_model is None:
+        return result
 
-    # Calculate cost using litellm's built-in pricing
-    cost = litellm.completion_cost(completion_response=response)
+    try:
+        result.parsed = _validate(response_model, result.content or "")
+        return result
+    except ValidationError as e:
+        error = e
 
-    return CompletionResult(
-        content=response.choices[0].message.content,
-        prompt_tokens=response.usage.prompt_tokens,
-        completion_tokens=response.usage.completion_tokens,
-        cost=cost,
+    # One repair round trip, showing the model its reply and what was wrong
+    repair_messages = [
+        *messages,
+        {"role": "assistant", "content": result.content or ""},
+        {"role": "user", "content": REPAIR_PROMPT.format(error=error)},
+    ]
+    repair = await _acompletion(litellm, {**kwargs, "messages": repair_messages}, timeout)
+    combined = CompletionResult(
+        content=repair.content,
+        prompt_tokens=result.prompt_tokens + repair.prompt_tokens,
+        completion_tokens=result.completion_tokens + repair.completion_tokens,
+        cost=(result.cost or 0.0) + (repair.cost or 0.0),
     )
+    try:
+        combined.parsed = _validate(response_model, repair.content or "")
+    except ValidationError as e:
+        raise StructuredOutputError(
+            f"Reply from {model} does not match {response_model.__name__}: {e}",
+            content=repair.content or "",
+        ) from e
+    return combined
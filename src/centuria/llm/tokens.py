@@ -0,0 +1,259 @@
+"""Token counting and token-aware text splitting.
+
+Counts use the target model's tiktoken encoding; models tiktoken does not know
+(Claude, Gemini, ...) are counted with ``cl100k_base`` as an approximation.
+If no encoding can be loaded (tiktoken downloads them on first use, so this
+happens offline) counts fall back to a conservative characters-per-token
+estimate.
+"""
+
+import math
+import os
+import re
+from collections.abc import Callable
+from functools import lru_cache
+
+from centuria.config import DEFAULT_MODEL
+
+# Used when no tiktoken encoding is available; English averages ~4 characters
+# per token, so this over-counts slightly
+APPROX_CHARS_PER_TOKEN = 3.5
+
+FALLBACK_ENCODING = "cl100k_base"
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+_LINE_BREAK = re.compile(r"\n")
+
+
+class Tokenizer:
+    """Counts and cuts text in a model's tokens."""
+
+    def __init__(self, encoding=None):
+        self.encoding = encoding
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from a real encoding rather than an estimate."""
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.encoding is None:
+            return math.ceil(len(text) / APPROX_CHARS_PER_TOKEN)
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """The longest prefix of ``text`` that fits in ``max_tokens``."""
+        if max_tokens <= 0:
+            return ""
+        if self.encoding is None:
+            return text[: int(max_tokens * APPROX_CHARS_PER_TOKEN)]
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        prefix = self.encoding.decode(tokens[:max_tokens])
+        # A multi-byte character cut in half decodes to U+FFFD; drop it
+        return prefix.rstrip("�")
+
+
+def _load_encoding(model: str):
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(model.split("/")[-1])
+    except KeyError:
+        return tiktoken.get_encoding(FALLBACK_ENCODING)
+
+
+@lru_cache(maxsize=32)
+def get_tokenizer(model: str | None = None) -> Tokenizer:
+    """The tokenizer for a model (default: DEFAULT_MODEL)."""
+    model = model or os.getenv("DEFAULT_MODEL", DEFAULT_MODEL)
+    try:
+        return Tokenizer(_load_encoding(model))
+    except Exception:
+        # No network to fetch the encoding, or tiktoken unusable: estimate
+        return Tokenizer(None)
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    """Number of tokens ``text`` costs with ``model``."""
+    return get_tokenizer(model).count(text)
+
+
+def _split_after(text: str, pattern: re.Pattern) -> list[str]:
+    """Split after each match, keeping the separators so pieces rejoin exactly."""
+    pieces, start = [], 0
+    for match in pattern.finditer(text):
+        pieces.append(text[start : match.end()])
+        start = match.end()
+    pieces.append(text[start:])
+    return [p for p in pieces if p]
+
+
+_BREAKS = (_PARAGRAPH_BREAK, _LINE_BREAK, _SENTENCE_BREAK)
+
+
+def _pieces(text: str, max_tokens: int, tokenizer: Tokenizer, level: int = 0) -> list[str]:
+    """Split text into pieces of at most ``max_tokens``, at the coarsest boundary possible."""
+    if tokenizer.count(text) <= max_tokens:
+        return [text]
+    if level == len(_BREAKS):
+        # One enormous sentence: cut at token boundaries
+        pieces = []
+        while text:
+            piece = tokenizer.truncate(text, max_tokens) or text[:1]
+            pieces.append(piece)
+            text = text[len(piece) :]
+        return pieces
+    pieces = []
+    for part in _split_after(text, _BREAKS[level]):
+        pieces.extend(_pieces(part, max_tokens, tokenizer, level + 1))
+    return pieces
+
+
+def chunk_text(text: str, max_tokens: int, model: str | None = None) -> list[str]:
+    """Split text into chunks of at most ``max_tokens`` tokens each.
+
+    Chunks break at paragraph, then line, then sentence boundaries, and only
+    mid-sentence when a single sentence is too long. Joining the chunks gives
+    back the original text.
+    """
+    if max_tokens < 1:
+        raise ValueError(f"max_tokens must be at least 1, got {max_tokens}")
+    tokenizer = get_tokenizer(model)
+    chunks: list[str] = []
+
+    def flush(chunk: str) -> None:
+        # Counts are nearly but not exactly additive across piece boundaries
+        while tokenizer.count(chunk) > max_tokens:
+            head = tokenizer.truncate(chunk, max_tokens) or chunk[:1]
+            chunks.append(head)
+            chunk = chunk[len(head) :]
+        if chunk:
+            chunks.append(chunk)
+
+    current, current_tokens = "", 0
+    for piece in _pieces(text, max_tokens, tokenizer):
+        tokens = tokenizer.count(piece)
+        if current and current_tokens + tokens > max_tokens:
+            flush(current)
+            current, current_tokens = "", 0
+        current += piece
+        current_tokens += tokens
+    flush(current)
+    return chunks
+
+
+# =============================================================================
+# Token Budgets
+# =============================================================================
+
+# Appended to a section that was cut short
+TRUNCATION_MARKER = "\n[...]"
+
+_SECTION_HEADER = re.compile(r"^=== (.+?) ===\n", re.MULTILINE)
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*(?=\s)|\n")
+
+
+def split_sections(text: str) -> list[tuple[str, str]]:
+    """Split ``=== name ===``-tagged text into (name, body) pairs.
+
+    Text before the first header becomes a section with an empty name.
+    """
+    sections = []
+    headers = list(_SECTION_HEADER.finditer(text))
+    preamble = text[: headers[0].start()] if headers else text
+    if preamble.strip():
+        sections.append(("", preamble.rstrip("\n")))
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        sections.append((header.group(1), text[header.end() : end].rstrip("\n")))
+    return sections
+
+
+def join_sections(sections: list[tuple[str, str]]) -> str:
+    """Inverse of ``split_sections``, as the extractors tag files."""
+    return "\n\n".join(f"=== {name} ===\n{body}" if name else body for name, body in sections)
+
+
+def truncate_at_sentence(text: str, max_tokens: int, model: str | None = None) -> str:
+    """Cut text to at most ``max_tokens``, ending at a sentence or line break.
+
+    Falls back to a word break, then a token break, when no sentence ends in
+    the allowed prefix. A truncated result ends with ``TRUNCATION_MARKER``
+    (counted in the budget).
+    """
+    tokenizer = get_tokenizer(model)
+    if tokenizer.count(text) <= max_tokens:
+        return text
+    prefix = tokenizer.truncate(text, max_tokens - tokenizer.count(TRUNCATION_MARKER))
+    if not prefix:
+        return ""
+    ends = [m.end() for m in _SENTENCE_END.finditer(prefix)]
+    if ends:
+        cut = ends[-1]
+    else:
+        cut = prefix.rfind(" ")
+        cut = cut if cut > 0 else len(prefix)
+    return prefix[:cut].rstrip() + TRUNCATION_MARKER
+
+
+def allocate_budget(sizes: list[int], weights: list[float], budget: int) -> list[int]:
+    """Share ``budget`` tokens between sections of the given sizes.
+
+    Weighted water-filling: every section gets a share of what is left in
+    proportion to its weight; sections smaller than their share are kept
+    whole and the rest is shared out again among the others.
+    """
+    allocation = [0] * len(sizes)
+    active = [i for i, size in enumerate(sizes) if size > 0]
+    remaining = max(0, budget)
+    while active:
+        total_weight = sum(weights[i] for i in active) or 1.0
+        fits = [i for i in active if sizes[i] <= remaining * weights[i] / total_weight]
+        if not fits:
+            for i in active:
+                allocation[i] = int(remaining * weights[i] / total_weight)
+            break
+        for i in fits:
+            allocation[i] = sizes[i]
+            remaining -= sizes[i]
+        active = [i for i in active if i not in fits]
+    return allocation
+
+
+def fit_sections(
+    text: str,
+    budget: int,
+    priority: Callable[[str], float] | None = None,
+    model: str | None = None,
+) -> str:
+    """Fit ``=== name ===``-tagged text into ``budget`` tokens.
+
+    Each section gets a share of the budget in proportion to
+    ``priority(name)`` (default: equal), is cut at a sentence boundary if it
+    is over its share, and sections that get nothing are dropped.
+    """
+    tokenizer = get_tokenizer(model)
+    if tokenizer.count(text) <= budget:
+        return text
+
+    sections = split_sections(text)
+    # Headers and the blank lines between sections are paid for first
+    overhead = [tokenizer.count(f"=== {name} ===\n\n\n") if name else 2 for name, _ in sections]
+    sizes = [tokenizer.count(body) for _, body in sections]
+    weights = [priority(name) if priority else 1.0 for name, _ in sections]
+    allocation = allocate_budget(sizes, weights, budget - sum(overhead))
+
+    fitted = []
+    for (name, body), size, tokens in zip(sections, sizes, allocation):
+        if tokens >= size:
+            fitted.append((name, body))
+        elif tokens > 0:
+            cut = truncate_at_sentence(body, tokens, model=model)
+            if cut:
+                fitted.append((name, cut))
+    return join_sections(fitted)
@@ -1,6 +1,22 @@
 """Persona generation."""
 
+from centuria.persona.cards import (
+    PROBE_QUESTIONS,
+    CardCandidate,
+    FidelityReport,
+    PersonaCard,
+    build_persona_card,
+    compress_persona,
+    match_option,
+    measure_fidelity,
+    strip_filler,
+)
 from centuria.persona.generator import create_persona, create_persona_from_files
+from centuria.persona.occupations import (
+    OccupationClassifier,
+    OccupationMatch,
+    default_classifier,
+)
 from centuria.persona.synthetic import (
     SyntheticPersonaSpec,
     SyntheticIdentity,
@@ -19,6 +35,9 @@ from centuria.persona.synthetic import (
 __all__ = [
     "create_persona",
     "create_persona_from_files",
+    "OccupationClassifier",
+    "OccupationMatch",
+    "default_classifier",
     "SyntheticPersonaSpec",
     "SyntheticIdentity",
     "FILE_TYPES",
@@ -31,4 +50,13 @@ __all__ = [
     "infer_file_types_for_identity",
     "estimate_persona_cost",
     "estimate_batch_cost",
+    "PROBE_QUESTIONS",
+    "CardCandidate",
+    "FidelityReport",
+    "PersonaCard",
+    "build_persona_card",
+    "compress_persona",
+    "match_option",
+    "measure_fidelity",
+    "strip_filler",
 ]
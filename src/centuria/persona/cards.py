@@ -0,0 +1,405 @@
+"""Compact persona cards.
+
+Context statements run to 300-500 words, and every survey question pays for
+them again. A persona card is the same persona compressed into a fixed token
+budget: sentences about missing information are dropped, then the rest is
+rewritten into dense phrases and cut to the budget.
+
+A card is only worth using if the persona answers the same way with it, so
+``compress_persona`` asks a set of probe questions with the full context and
+with cards of increasing size, and keeps the smallest card whose answers
+agree often enough.
+"""
+
+import asyncio
+import re
+from dataclasses import dataclass, field
+
+from centuria.config import CARD_MIN_AGREEMENT, CARD_TOKEN_BUDGETS
+from centuria.llm import complete
+from centuria.llm.tokens import count_tokens, truncate_at_sentence
+from centuria.models import Persona, Question
+from centuria.survey.executor import ask_question
+
+# =============================================================================
+# Filler Removal
+# =============================================================================
+
+# Phrases that mark a sentence (or clause) as being about what is not known
+_MISSING = re.compile(
+    r"\b(?:"
+    r"(?:is|are|was|were|has|have|remains?)\s+(?:not|never)\s+"
+    r"(?:been\s+)?(?:provided|specified|mentioned|stated|given|available|known|disclosed|"
+    r"detailed|clear|defined|indicated)"
+    r"|unspecified|undefined|unknown|unclear|undisclosed"
+    r"|no\s+(?:specific\s+|further\s+|additional\s+|explicit\s+)?"
+    r"(?:information|details|data|mention|indication)"
+    r"|lack\s+of\s+(?:specific\s+|explicit\s+)?(?:information|details|data)"
+    r")\b",
+    re.IGNORECASE,
+)
+# "Although X is not provided, <fact>." - the fact is kept
+_CONCESSIVE_OPENING = re.compile(
+    r"^(?:while|whilst|although|though|even though|despite)\b", re.IGNORECASE
+)
+# "<fact>, although X is not provided." - the fact is kept
+_CONCESSIVE_TAIL = re.compile(
+    r"[,;]\s*(?:while|whilst|although|though|but|however,?)\s", re.IGNORECASE
+)
+# A sentence and the whitespace after it. Sentences end at end punctuation
+# followed by a capital letter, so "£32.5k" and "e.g. the" are not split
+_SENTENCE = re.compile(r"(.+?(?:[.!?]+[\"')\]]*(?=\s+[\"'(\[]?[A-Z])|$))(\s*)", re.DOTALL)
+
+
+def _strip_sentence(sentence: str) -> str:
+    """A sentence without its clauses about missing information ("" if nothing is left)."""
+    match = _MISSING.search(sentence)
+    if not match:
+        return sentence
+    if _CONCESSIVE_OPENING.match(sentence):
+        comma = sentence.find(",", match.end())
+        rest = sentence[comma + 1 :].strip() if comma != -1 else ""
+        if rest and not _MISSING.search(rest):
+            return rest[0].upper() + rest[1:]
+        return ""
+    tail = _CONCESSIVE_TAIL.search(sentence)
+    if tail and tail.start() < match.start():
+        head = sentence[: tail.start()].strip()
+        if head and not _MISSING.search(head):
+            return head + "."
+    return ""
+
+
+def strip_filler(context: str) -> str:
+    """Drop sentences and clauses that only say some detail is missing.
+
+    "The individual has an undefined name and location." goes;
+    "Although her education is not specified, she worked as a GP." keeps
+    "She worked as a GP.". Paragraph breaks and the spacing between kept
+    sentences are kept; emptied paragraphs go.
+    """
+    paragraphs = []
+    for paragraph in re.split(r"\n\s*\n", context.strip()):
+        kept = []
+        for sentence, space in _SENTENCE.findall(paragraph.strip()):
+            sentence = _strip_sentence(sentence)
+            if sentence:
+                kept.append(sentence + space)
+        if kept:
+            paragraphs.append("".join(kept).rstrip())
+    return "\n\n".join(paragraphs)
+
+
+# =============================================================================
+# Card Prompt
+# =============================================================================
+
+CARD_PROMPT = """Rewrite this description of a person as a dense persona card of at most {words}
+words.
+
+<context>
+{context}
+</context>
+
+Rules:
+- Keep the concrete facts that shape their opinions: name, age, work, home and household, money,
+  daily routine, media, values, politics
+- Keep inferences short and hedged ("probably votes Labour")
+- Drop repetition, summaries and anything about missing information
+- Write terse phrases separated by semicolons, on short lines that start with a label (Work:,
+  Home:, Routine:, Media:, Views:)
+
+Return only the card."""
+
+# Tokens per English word, to turn a token budget into a word target
+_TOKENS_PER_WORD = 1.4
+
+
+async def build_persona_card(context: str, max_tokens: int, model: str | None = None) -> str:
+    """Compress a context statement into a card of at most ``max_tokens`` tokens.
+
+    Filler is stripped first; if that alone fits, no LLM call is made. The
+    rewrite is cut at a sentence boundary if the model overshoots.
+    """
+    card, _ = await _build_card(context, max_tokens, model)
+    return card
+
+
+async def _build_card(context: str, max_tokens: int, model: str | None) -> tuple[str, float]:
+    """build_persona_card, plus the cost of the rewrite call (0 if none was made)."""
+    stripped = strip_filler(context)
+    if count_tokens(stripped, model) <= max_tokens:
+        return stripped, 0.0
+    prompt = CARD_PROMPT.format(words=max(10, int(max_tokens / _TOKENS_PER_WORD)), context=stripped)
+    result = await complete(prompt, model=model)
+    return truncate_at_sentence(result.content.strip(), max_tokens, model=model), result.cost
+
+
+# =============================================================================
+# Fidelity Probes
+# =============================================================================
+
+_AGREEMENT = [
+    "Strongly agree",
+    "Agree",
+    "Neither agree nor disagree",
+    "Disagree",
+    "Strongly disagree",
+]
+
+# Single-select questions spread over the topics surveys ask about; the answer
+# a persona gives should depend on what the context says about them
+PROBE_QUESTIONS = [
+    Question(
+        id="probe_transport",
+        text="How do you usually get around day to day?",
+        question_type="single_select",
+        options=["Walking", "Cycling", "Bus or train", "Car", "Taxi or ride-hailing"],
+    ),
+    Question(
+        id="probe_vote",
+        text="If there were a general election tomorrow, who would you vote for?",
+        question_type="single_select",
+        options=[
+            "Labour",
+            "Conservative",
+            "Liberal Democrat",
+            "Green",
+            "Reform UK",
+            "Would not vote",
+        ],
+    ),
+    Question(
+        id="probe_housing",
+        text="New high-rise housing should be built in my neighbourhood.",
+        question_type="single_select",
+        options=_AGREEMENT,
+    ),
+    Question(
+        id="probe_finances",
+        text="How are you managing financially these days?",
+        question_type="single_select",
+        options=[
+            "Living comfortably",
+            "Doing alright",
+            "Just about getting by",
+            "Finding it difficult",
+        ],
+    ),
+    Question(
+        id="probe_work",
+        text="Which best describes your working life?",
+        question_type="single_select",
+        options=[
+            "Full-time employee",
+            "Part-time employee",
+            "Self-employed",
+            "Student",
+            "Retired",
+            "Not working",
+        ],
+    ),
+    Question(
+        id="probe_social_media",
+        text="How often do you use social media?",
+        question_type="single_select",
+        options=[
+            "Several times a day",
+            "About once a day",
+            "A few times a week",
+            "Rarely",
+            "Never",
+        ],
+    ),
+    Question(
+        id="probe_news",
+        text="Where do you get most of your news?",
+        question_type="single_select",
+        options=[
+            "TV",
+            "Newspapers",
+            "News websites or apps",
+            "Social media",
+            "Radio or podcasts",
+            "I don't follow the news",
+        ],
+    ),
+    Question(
+        id="probe_religion",
+        text="How often do you attend religious services?",
+        question_type="single_select",
+        options=["Weekly or more", "Monthly", "Only on special occasions", "Never"],
+    ),
+    Question(
+        id="probe_climate",
+        text="I would pay more for goods and services to help tackle climate change.",
+        question_type="single_select",
+        options=_AGREEMENT,
+    ),
+    Question(
+        id="probe_community",
+        text="Would you go to a local meeting about a planned development on your street?",
+        question_type="single_select",
+        options=["Definitely", "Probably", "Probably not", "Definitely not"],
+    ),
+]
+
+_NORMALIZE = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize(text: str) -> str:
+    return _NORMALIZE.sub(" ", text.lower()).strip()
+
+
+def match_option(choice: str, options: list[str] | None) -> str:
+    """The option a free-text choice names, or the normalized choice if none does.
+
+    Longer options are tried first, so "Strongly agree" is not read as "Agree".
+    """
+    normalized = _normalize(choice)
+    for option in sorted(options or [], key=len, reverse=True):
+        if _normalize(option) in normalized:
+            return option
+    return normalized
+
+
+@dataclass
+class FidelityReport:
+    """How a card's answers to the probe questions compare with the full context's."""
+
+    agreement: float
+    full_answers: dict[str, str]
+    card_answers: dict[str, str]
+    cost: float = 0.0
+
+    @property
+    def disagreements(self) -> list[str]:
+        """Ids of the questions answered differently."""
+        return [q for q, answer in self.full_answers.items() if self.card_answers.get(q) != answer]
+
+
+async def _answers(
+    persona: Persona, questions: list[Question], model: str | None
+) -> tuple[dict[str, str], float]:
+    responses = await asyncio.gather(
+        *(ask_question(persona, question, model=model) for question in questions)
+    )
+    answers = {
+        question.id: match_option(response.response, question.options)
+        for question, response in zip(questions, responses)
+    }
+    return answers, sum(response.cost for response in responses)
+
+
+async def measure_fidelity(
+    persona: Persona,
+    card: str,
+    questions: list[Question] | None = None,
+    model: str | None = None,
+    full_answers: dict[str, str] | None = None,
+) -> FidelityReport:
+    """Share of probe questions answered the same with ``card`` as with the full context.
+
+    Pass ``full_answers`` (from an earlier report) to compare several cards
+    against one set of full-context answers.
+    """
+    questions = questions or PROBE_QUESTIONS
+    cost = 0.0
+    if full_answers is None:
+        full_answers, cost = await _answers(persona, questions, model)
+    card_persona = persona.model_copy(update={"context": card})
+    card_answers, card_cost = await _answers(card_persona, questions, model)
+    same = sum(card_answers[q.id] == full_answers[q.id] for q in questions)
+    return FidelityReport(
+        agreement=same / len(questions),
+        full_answers=full_answers,
+        card_answers=card_answers,
+        cost=cost + card_cost,
+    )
+
+
+# =============================================================================
+# Card Selection
+# =============================================================================
+
+
+@dataclass
+class CardCandidate:
+    """One card tried by compress_persona."""
+
+    budget: int
+    card: str
+    tokens: int
+    agreement: float
+
+
+@dataclass
+class PersonaCard:
+    """The smallest card that kept fidelity, or the full context if none did."""
+
+    persona_id: str
+    card: str
+    tokens: int
+    full_tokens: int
+    agreement: float
+    budget: int | None  # None when no card was good enough
+    candidates: list[CardCandidate] = field(default_factory=list)
+    cost: float = 0.0
+
+    @property
+    def compression(self) -> float:
+        """Card tokens as a share of the full context's tokens."""
+        return self.tokens / self.full_tokens if self.full_tokens else 1.0
+
+
+async def compress_persona(
+    persona: Persona,
+    budgets: tuple[int, ...] = CARD_TOKEN_BUDGETS,
+    min_agreement: float = CARD_MIN_AGREEMENT,
+    questions: list[Question] | None = None,
+    model: str | None = None,
+) -> PersonaCard:
+    """Find the smallest card for ``persona`` that answers like the full context.
+
+    Budgets are tried smallest first and the search stops at the first card
+    with at least ``min_agreement``. Budgets the full context already fits are
+    skipped. Probe answers are sampled, so agreement between two runs of the
+    full context is itself below 1; keep ``min_agreement`` under that ceiling.
+    """
+    questions = questions or PROBE_QUESTIONS
+    full_tokens = count_tokens(persona.context, model)
+    candidates: list[CardCandidate] = []
+    full_answers = None
+    cost = 0.0
+    for budget in sorted(budgets):
+        if budget >= full_tokens:
+            break
+        card, card_cost = await _build_card(persona.context, budget, model)
+        report = await measure_fidelity(
+            persona, card, questions, model=model, full_answers=full_answers
+        )
+        full_answers = report.full_answers
+        cost += card_cost + report.cost
+        candidate = CardCandidate(budget, card, count_tokens(card, model), report.agreement)
+        candidates.append(candidate)
+        if report.agreement >= min_agreement:
+            return PersonaCard(
+                persona_id=persona.id,
+                card=card,
+                tokens=candidate.tokens,
+                full_tokens=full_tokens,
+                agreement=report.agreement,
+                budget=budget,
+                candidates=candidates,
+                cost=cost,
+            )
+    return PersonaCard(
+        persona_id=persona.id,
+        card=persona.context,
+        tokens=full_tokens,
+        full_tokens=full_tokens,
+        agreement=1.0,
+        budget=None,
+        candidates=candidates,
+        cost=cost,
+    )
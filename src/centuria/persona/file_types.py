@@ -4,7 +4,9 @@ Each file type represents a type of online data that could be legally acquired
 about a person. These are used to generate realistic synthetic data files.
 """
 
-# The {identity} placeholder in prompts will be replaced with formatted identity text
+# The {identity} placeholder in prompts will be replaced with formatted identity text.
+# "priority" (1-5) is how much a file says about its owner; when personal data
+# has to be cut to fit a prompt, higher-priority files keep more of their text.
 
 FILE_TYPES = {
     # ==========================================================================
@@ -13,6 +15,7 @@ FILE_TYPES = {
     "cv": {
         "filename": "cv.txt",
         "description": "CV/Resume",
+        "priority": 5,
         "prompt": """Generate a realistic CV/resume for this person as plain text.
 
 {identity}
@@ -30,6 +33,7 @@ Output only the CV text, no preamble."""
     "linkedin_summary": {
         "filename": "linkedin_summary.txt",
         "description": "LinkedIn about section",
+        "priority": 4,
         "prompt": """Generate a LinkedIn "About" section for this person.
 
 {identity}
@@ -45,6 +49,7 @@ Output only the summary text, no preamble."""
     "work_calendar": {
         "filename": "work_calendar.txt",
         "description": "Typical weekly work schedule",
+        "priority": 3,
         "prompt": """Generate a typical weekly calendar/schedule for this person.
 
 {identity}
@@ -63,6 +68,7 @@ Output only the schedule, no preamble."""
     "email_signature": {
         "filename": "email_signature.txt",
         "description": "Professional email signature",
+        "priority": 1,
         "prompt": """Generate an email signature for this person.
 
 {identity}
@@ -84,6 +90,7 @@ Output only the signature, no preamble."""
     "twitter_bio": {
         "filename": "twitter_bio.txt",
         "description": "Twitter/X profile bio and interests",
+        "priority": 2,
         "prompt": """Generate a Twitter/X profile for this person.
 
 {identity}
@@ -100,6 +107,7 @@ Output as plain text with labeled sections, no preamble."""
     "instagram_bio": {
         "filename": "instagram_bio.txt",
         "description": "Instagram profile and content themes",
+        "priority": 2,
         "prompt": """Generate an Instagram profile for this person.
 
 {identity}
@@ -117,6 +125,7 @@ Output as plain text with labeled sections, no preamble."""
     "facebook_about": {
         "filename": "facebook_about.txt",
         "description": "Facebook profile information",
+        "priority": 3,
         "prompt": """Generate Facebook profile information for this person.
 
 {identity}
@@ -136,6 +145,7 @@ Output as plain text with labeled sections, no preamble."""
     "reddit_profile": {
         "filename": "reddit_profile.txt",
         "description": "Reddit activity and subreddits",
+        "priority": 3,
         "prompt": """Generate a Reddit profile summary for this person.
 
 {identity}
@@ -154,6 +164,7 @@ Output as plain text with labeled sections, no preamble."""
     "tiktok_profile": {
         "filename": "tiktok_profile.txt",
         "description": "TikTok usage and interests",
+        "priority": 2,
         "prompt": """Generate TikTok usage profile for this person.
 
 {identity}
@@ -172,6 +183,7 @@ Output as plain text with labeled sections, no preamble."""
     "nextdoor_activity": {
         "filename": "nextdoor_activity.txt",
         "description": "Neighbourhood social network activity",
+        "priority": 3,
         "prompt": """Generate Nextdoor activity profile for this person.
 
 {identity}
@@ -193,6 +205,7 @@ Output as plain text with labeled sections, no preamble."""
     "reading_list": {
         "filename": "recent_reads.txt",
         "description": "Recent books read",
+        "priority": 4,
         "prompt": """Generate a list of 5-8 books this person has recently read.
 
 {identity}
@@ -213,6 +226,7 @@ Output only the list, no preamble."""
     "subscriptions": {
         "filename": "subscriptions.txt",
         "description": "Media subscriptions (publications, podcasts)",
+        "priority": 3,
         "prompt": """Generate a list of media subscriptions for this person.
 
 {identity}
@@ -233,6 +247,7 @@ Output only the list, no preamble."""
     "spotify_favorites": {
         "filename": "spotify_favorites.txt",
         "description": "Music streaming favorites",
+        "priority": 2,
         "prompt": """Generate a Spotify/music streaming favorites list for this person.
 
 {identity}
@@ -250,6 +265,7 @@ Output only the list, no preamble."""
     "netflix_history": {
         "filename": "netflix_history.txt",
         "description": "Recently watched shows and movies",
+        "priority": 2,
         "prompt": """Generate a Netflix/streaming watch history for this person.
 
 {identity}
@@ -267,6 +283,7 @@ Output as plain text list with brief notes, no preamble."""
     "youtube_subscriptions": {
         "filename": "youtube_subscriptions.txt",
         "description": "YouTube channel subscriptions",
+        "priority": 3,
         "prompt": """Generate YouTube subscription list for this person.
 
 {identity}
@@ -286,6 +303,7 @@ Output only the list, no preamble."""
     "podcast_subscriptions": {
         "filename": "podcast_subscriptions.txt",
         "description": "Podcast subscriptions",
+        "priority": 3,
         "prompt": """Generate a podcast subscription list for this person.
 
 {identity}
@@ -308,6 +326,7 @@ Output only the list, no preamble."""
     "amazon_wishlist": {
         "filename": "amazon_wishlist.txt",
         "description": "Amazon wishlist items",
+        "priority": 2,
         "prompt": """Generate an Amazon wishlist for this person.
 
 {identity}
@@ -326,6 +345,7 @@ Output only the list, no preamble."""
     "shopping_history": {
         "filename": "shopping_history.txt",
         "description": "Recent online purchases",
+        "priority": 2,
         "prompt": """Generate recent online shopping history for this person.
 
 {identity}
@@ -344,6 +364,7 @@ Output only the list, no preamble."""
     "grocery_list": {
         "filename": "grocery_list.txt",
         "description": "Typical grocery shopping list",
+        "priority": 1,
         "prompt": """Generate a typical weekly grocery list for this person.
 
 {identity}
@@ -362,6 +383,7 @@ Output only the list, no preamble."""
     "loyalty_programs": {
         "filename": "loyalty_programs.txt",
         "description": "Store loyalty cards and memberships",
+        "priority": 1,
         "prompt": """Generate loyalty program memberships for this person.
 
 {identity}
@@ -386,6 +408,7 @@ Output only the list, no preamble."""
     "google_reviews": {
         "filename": "google_reviews.txt",
         "description": "Google Maps local reviews",
+        "priority": 2,
         "prompt": """Generate Google Maps reviews this person has written.
 
 {identity}
@@ -404,6 +427,7 @@ No preamble."""
     "product_reviews": {
         "filename": "product_reviews.txt",
         "description": "Product reviews written",
+        "priority": 2,
         "prompt": """Generate product reviews this person has written on various sites.
 
 {identity}
@@ -421,6 +445,7 @@ No preamble."""
     "yelp_reviews": {
         "filename": "yelp_reviews.txt",
         "description": "Restaurant and business reviews",
+        "priority": 2,
         "prompt": """Generate Yelp-style reviews this person has written.
 
 {identity}
@@ -442,6 +467,7 @@ No preamble."""
     "notes_snippet": {
         "filename": "notes.txt",
         "description": "Personal notes or journal snippets",
+        "priority": 4,
         "prompt": """Generate a few personal notes or journal snippets for this person.
 
 {identity}
@@ -462,6 +488,7 @@ Output only the notes, no preamble."""
     "bookmarks": {
         "filename": "bookmarks.txt",
         "description": "Saved articles and links",
+        "priority": 3,
         "prompt": """Generate a list of saved bookmarks/articles for this person.
 
 {identity}
@@ -484,6 +511,7 @@ Output only the list, no preamble."""
     "text_messages": {
         "filename": "text_messages.txt",
         "description": "Sample text message conversations",
+        "priority": 4,
         "prompt": """Generate sample text message snippets for this person.
 
 {identity}
@@ -502,6 +530,7 @@ No preamble."""
     "voicemail_greeting": {
         "filename": "voicemail_greeting.txt",
         "description": "Voicemail greeting message",
+        "priority": 1,
         "prompt": """Generate a voicemail greeting for this person.
 
 {identity}
@@ -521,6 +550,7 @@ Output only the greeting text, no preamble."""
     "fitness_tracker": {
         "filename": "fitness_tracker.txt",
         "description": "Fitness app/tracker summary",
+        "priority": 2,
         "prompt": """Generate fitness tracker data summary for this person.
 
 {identity}
@@ -539,6 +569,7 @@ Output as a summary with relevant metrics, no preamble."""
     "health_goals": {
         "filename": "health_goals.txt",
         "description": "Health and wellness goals",
+        "priority": 3,
         "prompt": """Generate health/wellness goals or notes for this person.
 
 {identity}
@@ -560,6 +591,7 @@ Output as informal notes/goals, no preamble."""
     "travel_history": {
         "filename": "travel_history.txt",
         "description": "Recent trips and travel style",
+        "priority": 2,
         "prompt": """Generate travel history for this person.
 
 {identity}
@@ -578,6 +610,7 @@ Output as a summary with trip details, no preamble."""
     "location_history": {
         "filename": "location_history.txt",
         "description": "Frequent locations and routines",
+        "priority": 3,
         "prompt": """Generate a location history pattern for this person.
 
 {identity}
@@ -599,6 +632,7 @@ Output as a weekly pattern summary, no preamble."""
     "bank_categories": {
         "filename": "bank_categories.txt",
         "description": "Spending category breakdown",
+        "priority": 3,
         "prompt": """Generate a monthly spending breakdown for this person.
 
 {identity}
@@ -620,6 +654,7 @@ Output only the breakdown, no preamble."""
     "charity_donations": {
         "filename": "charity_donations.txt",
         "description": "Charitable giving history",
+        "priority": 3,
         "prompt": """Generate charitable donation history for this person.
 
 {identity}
@@ -641,6 +676,7 @@ Output as a summary of giving patterns, no preamble."""
     "home_description": {
         "filename": "home_description.txt",
         "description": "Home and living situation",
+        "priority": 2,
         "prompt": """Generate a description of this person's home/living situation.
 
 {identity}
@@ -659,6 +695,7 @@ Output as a descriptive paragraph, no preamble."""
     "pet_profile": {
         "filename": "pet_profile.txt",
         "description": "Pet ownership details",
+        "priority": 1,
         "prompt": """Generate pet information for this person (if they have pets).
 
 {identity}
@@ -677,6 +714,7 @@ Output as a pet profile or explanation, no preamble."""
     "vehicle_info": {
         "filename": "vehicle_info.txt",
         "description": "Car/vehicle ownership",
+        "priority": 1,
         "prompt": """Generate vehicle information for this person.
 
 {identity}
@@ -695,6 +733,7 @@ Output as a vehicle profile, no preamble."""
     "recipe_collection": {
         "filename": "recipe_collection.txt",
         "description": "Saved recipes and cooking habits",
+        "priority": 1,
         "prompt": """Generate a saved recipe collection for this person.
 
 {identity}
@@ -716,6 +755,7 @@ Output only the collection, no preamble."""
     "dating_profile": {
         "filename": "dating_profile.txt",
         "description": "Dating app profile (if single)",
+        "priority": 4,
         "prompt": """Generate a dating app profile for this person (if applicable).
 
 {identity}
@@ -738,6 +778,7 @@ Output as a profile or explanation, no preamble."""
     "forum_posts": {
         "filename": "forum_posts.txt",
         "description": "Forum/community participation",
+        "priority": 4,
         "prompt": """Generate forum or online community participation for this person.
 
 {identity}
@@ -755,6 +796,7 @@ Output as a summary with sample posts, no preamble."""
     "event_attendance": {
         "filename": "event_attendance.txt",
         "description": "Events and activities attended",
+        "priority": 2,
         "prompt": """Generate recent event attendance for this person.
 
 {identity}
@@ -774,6 +816,19 @@ Output as a list with dates and brief descriptions, no preamble."""
 }
 
 
+# Priority of files that are not a known file type (e.g. real documents)
+DEFAULT_FILE_PRIORITY = 3
+
+_PRIORITY_BY_FILENAME = {
+    config["filename"]: config["priority"] for config in FILE_TYPES.values()
+}
+
+
+def get_file_priority(filename: str) -> int:
+    """Priority of a personal data file, by its filename."""
+    return _PRIORITY_BY_FILENAME.get(filename, DEFAULT_FILE_PRIORITY)
+
+
 def get_file_type(file_type: str) -> dict:
     """Get a file type configuration by key."""
     if file_type not in FILE_TYPES:
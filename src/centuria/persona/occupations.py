@@ -0,0 +1,417 @@
+"""Local occupation classification.
+
+Maps free-text occupations ("part-time receptionist", "Senior Software
+Engineer") to one of ``OCCUPATION_CATEGORIES`` without an LLM call, with a
+confidence score so callers can fall back to the LLM for the hard cases.
+
+Two signals are combined:
+
+1. A keyword/alias index: whole-word phrases such as "nurse" or "software"
+   that point at one category. Life-stage words ("retired", "student",
+   "unemployed") win over the job they qualify.
+2. A character n-gram model: TF-IDF weighted 3- and 4-grams of labelled
+   example occupations, matched by cosine similarity to the nearest example.
+   This catches spelling variants and unseen compounds ("physiotherapist"
+   near "physical therapist").
+"""
+
+import math
+import re
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from centuria.config import OCCUPATION_CATEGORIES
+
+# Phrases that identify a category wherever they appear as whole words
+OCCUPATION_ALIASES: dict[str, list[str]] = {
+    "Physician/Doctor": [
+        "doctor", "physician", "gp", "general practitioner", "surgeon", "paediatrician",
+        "pediatrician", "anaesthetist", "anesthesiologist", "cardiologist", "radiologist",
+        "dermatologist", "oncologist", "psychiatrist", "junior doctor", "consultant surgeon",
+    ],
+    "Nurse/Nursing": [
+        "nurse", "nursing", "midwife", "health visitor", "care assistant", "healthcare assistant",
+    ],
+    "Mental Health": [
+        "therapist", "psychotherapist", "psychologist", "counsellor", "counselor",
+        "mental health",
+    ],
+    "Allied Health": [
+        "physiotherapist", "physical therapist", "occupational therapist", "pharmacist",
+        "paramedic", "dentist", "dental", "optometrist", "radiographer", "dietitian",
+        "speech therapist", "chiropractor", "audiologist", "pharmacy", "veterinarian",
+        "vet", "veterinary", "hygienist",
+    ],
+    "K-12 Education": [
+        "teacher", "teaching assistant", "headteacher", "head teacher", "school teacher",
+        "primary school", "secondary school", "kindergarten", "nursery teacher", "tutor",
+        "principal",
+    ],
+    "Higher Education": [
+        "professor", "lecturer", "university administrator", "dean", "teaching fellow",
+    ],
+    "Training/Coaching": [
+        "coach", "personal trainer", "fitness instructor", "instructor", "trainer",
+        "yoga teacher",
+    ],
+    "Software/Engineering": [
+        "software", "developer", "programmer", "engineer", "web developer", "devops",
+        "frontend", "backend", "full stack", "mechanical engineer", "civil engineer",
+    ],
+    "IT/Systems": [
+        "it support", "it technician", "sysadmin", "systems administrator", "network",
+        "helpdesk", "help desk", "it manager", "cybersecurity", "security analyst",
+    ],
+    "Data/Analytics": [
+        "data scientist", "data analyst", "data engineer", "statistician", "analytics",
+        "business analyst", "machine learning",
+    ],
+    "Finance/Banking": [
+        "banker", "bank", "financial", "finance", "investment", "trader", "actuary",
+        "underwriter", "loan officer", "fund manager",
+    ],
+    "Accounting": ["accountant", "accounting", "bookkeeper", "auditor", "tax advisor", "payroll"],
+    "Management/Executive": [
+        "manager", "director", "executive", "ceo", "cfo", "coo", "chief", "founder",
+        "business owner", "entrepreneur", "managing director", "head of", "supervisor",
+    ],
+    "Marketing/Advertising": [
+        "marketing", "advertising", "brand", "copywriter", "seo", "social media manager",
+        "public relations", "pr officer",
+    ],
+    "Human Resources": ["human resources", "hr", "recruiter", "recruitment", "talent acquisition"],
+    "Consulting": ["consultant", "consulting", "advisor", "adviser"],
+    "Construction": [
+        "builder", "bricklayer", "carpenter", "joiner", "construction", "roofer", "plasterer",
+        "labourer", "laborer", "scaffolder", "site manager", "architect", "surveyor",
+    ],
+    "Electrical/Plumbing": [
+        "electrician", "plumber", "plumbing", "electrical", "gas engineer", "heating engineer",
+        "hvac", "lineman",
+    ],
+    "Automotive/Mechanical": [
+        "mechanic", "auto", "automotive", "welder", "machinist", "technician", "fitter",
+    ],
+    "Visual Arts/Design": [
+        "designer", "artist", "illustrator", "painter", "graphic", "photographer",
+        "sculptor", "animator", "interior designer", "ux",
+    ],
+    "Performing Arts": [
+        "actor", "actress", "musician", "singer", "dancer", "composer", "performer",
+        "comedian", "theatre", "theater",
+    ],
+    "Writing/Journalism": [
+        "writer", "journalist", "author", "editor", "reporter", "novelist", "poet",
+        "columnist",
+    ],
+    "Media/Entertainment": [
+        "producer", "filmmaker", "film", "broadcaster", "presenter", "podcaster",
+        "youtuber", "influencer", "content creator", "video editor",
+    ],
+    "Food Service/Hospitality": [
+        "chef", "cook", "barista", "bartender", "waiter", "waitress", "server", "cafe",
+        "restaurant", "hotel", "baker", "kitchen", "catering", "sous chef", "pub",
+    ],
+    "Retail/Sales": [
+        "sales", "cashier", "shop assistant", "retail", "store", "salesperson",
+        "sales assistant", "shopkeeper", "merchandiser",
+    ],
+    "Personal Services": [
+        "hairdresser", "barber", "cleaner", "domestic cleaner", "nanny", "childminder",
+        "beautician", "seamstress", "tailor", "dog walker", "housekeeper", "caregiver",
+        "carer", "massage therapist",
+    ],
+    "Customer Service": [
+        "customer service", "call centre", "call center", "receptionist", "customer support",
+        "administrator", "office administrator", "administrative assistant", "secretary",
+        "office assistant", "clerk",
+    ],
+    "Government/Civil Service": [
+        "civil servant", "civil service", "council", "government", "policy officer",
+        "diplomat", "postal worker", "postman", "mail carrier", "politician",
+    ],
+    "Military/Defense": [
+        "soldier", "army", "navy", "air force", "military", "royal marine", "officer cadet",
+        "veteran",
+    ],
+    "Law Enforcement": [
+        "police", "police officer", "detective", "sheriff", "prison officer",
+        "corrections officer", "security guard", "firefighter",
+    ],
+    "Legal/Law": [
+        "lawyer", "solicitor", "barrister", "attorney", "paralegal", "judge", "legal",
+    ],
+    "Research/Academia": [
+        "researcher", "research", "scientist", "postdoc", "phd", "academic", "historian",
+        "economist", "physicist", "chemist", "biologist",
+    ],
+    "Laboratory/Technical": [
+        "lab technician", "laboratory", "lab assistant", "technologist", "quality control",
+    ],
+    "Environmental/Conservation": [
+        "environmental", "conservation", "ecologist", "park ranger", "forester",
+        "sustainability", "environmental engineer",
+    ],
+    "Agriculture/Farming": [
+        "farmer", "farm", "agricultural", "agriculture", "rancher", "gardener",
+        "horticulturist", "fisherman", "vineyard",
+    ],
+    "Transportation/Logistics": [
+        "driver", "bus driver", "delivery driver", "courier", "bike courier", "pilot",
+        "logistics", "warehouse", "truck", "lorry", "taxi", "dispatcher", "train",
+    ],
+    "Manufacturing/Production": [
+        "factory", "assembly", "manufacturing", "production", "operator", "machine operator",
+    ],
+    "Real Estate": ["estate agent", "real estate", "realtor", "property manager", "letting agent"],
+    "Non-profit/Social Work": [
+        "social worker", "charity", "non-profit", "nonprofit", "community organiser",
+        "community organizer", "youth worker", "volunteer coordinator", "caseworker",
+    ],
+    "Religious/Ministry": [
+        "pastor", "priest", "vicar", "minister", "imam", "rabbi", "chaplain", "clergy",
+        "missionary",
+    ],
+    "Student": ["student", "undergraduate", "pupil"],
+    "Retired": ["retired", "retiree", "pensioner"],
+    "Homemaker": ["homemaker", "stay-at-home", "stay at home", "housewife", "househusband"],
+    "Unemployed": ["unemployed", "jobseeker", "job seeker", "between jobs", "out of work"],
+}
+
+# Generic role words that yield to any more specific keyword ("sales manager")
+WEAK_ALIASES = {"manager", "director", "executive", "supervisor", "head of", "engineer",
+                "consultant", "technician", "advisor", "adviser", "operator", "server"}
+
+# Life-stage categories override the job they qualify ("retired solicitor")
+STATUS_CATEGORIES = ("Retired", "Unemployed", "Student", "Homemaker")
+
+# Occupations with known categories: the generated sample personas and the
+# Dalston population, plus common variants
+LABELLED_OCCUPATIONS: list[tuple[str, str]] = [
+    ("Environmental Engineer", "Environmental/Conservation"),
+    ("Software Engineer", "Software/Engineering"),
+    ("Software Developer", "Software/Engineering"),
+    ("Physical Therapist", "Allied Health"),
+    ("Elementary School Teacher", "K-12 Education"),
+    ("Secondary School Teacher", "K-12 Education"),
+    ("History Teacher", "K-12 Education"),
+    ("Primary School Teaching Assistant", "K-12 Education"),
+    ("General Practitioner", "Physician/Doctor"),
+    ("Junior Doctor", "Physician/Doctor"),
+    ("Registered Nurse", "Nurse/Nursing"),
+    ("Architect", "Construction"),
+    ("Consultant", "Consulting"),
+    ("Office Administrator", "Customer Service"),
+    ("Part-time Receptionist", "Customer Service"),
+    ("Customer Service Representative", "Customer Service"),
+    ("Barista", "Food Service/Hospitality"),
+    ("Bartender", "Food Service/Hospitality"),
+    ("Cafe Manager", "Food Service/Hospitality"),
+    ("Chef", "Food Service/Hospitality"),
+    ("Bike Courier", "Transportation/Logistics"),
+    ("Bus Driver", "Transportation/Logistics"),
+    ("Delivery Driver", "Transportation/Logistics"),
+    ("Warehouse Assistant", "Transportation/Logistics"),
+    ("Bricklayer", "Construction"),
+    ("Builder", "Construction"),
+    ("Electrician", "Electrical/Plumbing"),
+    ("Plumber", "Electrical/Plumbing"),
+    ("Cashier", "Retail/Sales"),
+    ("Sales Assistant", "Retail/Sales"),
+    ("Shop Assistant", "Retail/Sales"),
+    ("Cleaner", "Personal Services"),
+    ("Self-employed Seamstress", "Personal Services"),
+    ("University Student", "Student"),
+    ("Retired Teacher", "Retired"),
+    ("Retired Solicitor", "Retired"),
+    ("Unemployed", "Unemployed"),
+    ("Marketing Manager", "Marketing/Advertising"),
+    ("Financial Analyst", "Finance/Banking"),
+    ("Investment Banker", "Finance/Banking"),
+    ("Certified Public Accountant", "Accounting"),
+    ("Data Scientist", "Data/Analytics"),
+    ("Systems Administrator", "IT/Systems"),
+    ("Graphic Designer", "Visual Arts/Design"),
+    ("Freelance Photographer", "Visual Arts/Design"),
+    ("Freelance Journalist", "Writing/Journalism"),
+    ("Professional Musician", "Performing Arts"),
+    ("Film Producer", "Media/Entertainment"),
+    ("Police Officer", "Law Enforcement"),
+    ("Corporate Lawyer", "Legal/Law"),
+    ("Civil Servant", "Government/Civil Service"),
+    ("Army Officer", "Military/Defense"),
+    ("University Professor", "Higher Education"),
+    ("Research Scientist", "Research/Academia"),
+    ("Laboratory Technician", "Laboratory/Technical"),
+    ("Clinical Psychologist", "Mental Health"),
+    ("Social Worker", "Non-profit/Social Work"),
+    ("Real Estate Agent", "Real Estate"),
+    ("Human Resources Manager", "Human Resources"),
+    ("Personal Trainer", "Training/Coaching"),
+    ("Auto Mechanic", "Automotive/Mechanical"),
+    ("Factory Worker", "Manufacturing/Production"),
+    ("Farmer", "Agriculture/Farming"),
+    ("Parish Priest", "Religious/Ministry"),
+    ("Stay-at-home Parent", "Homemaker"),
+]
+
+NGRAM_SIZES = (3, 4)
+
+_WORD = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+
+def normalize_occupation(occupation: str) -> str:
+    """Lowercase, single-spaced words, without punctuation."""
+    return " ".join(_WORD.findall(occupation.lower()))
+
+
+def _ngrams(text: str) -> Counter[str]:
+    padded = f" {text} "
+    return Counter(
+        padded[i : i + n] for n in NGRAM_SIZES for i in range(len(padded) - n + 1)
+    )
+
+
+@dataclass
+class OccupationMatch:
+    """A local classification and how far to trust it (0-1)."""
+
+    category: str
+    confidence: float
+    source: str  # "exact", "keyword", "ngram" or "none"
+
+
+class OccupationClassifier:
+    """Keyword index plus nearest-neighbour character n-gram model."""
+
+    def __init__(
+        self,
+        examples: Iterable[tuple[str, str]] = (),
+        aliases: dict[str, list[str]] | None = None,
+        max_learned: int = 10_000,
+    ):
+        aliases = OCCUPATION_ALIASES if aliases is None else aliases
+        self._aliases: dict[str, str] = {}
+        for category, phrases in aliases.items():
+            for phrase in phrases:
+                self._aliases[normalize_occupation(phrase)] = category
+        self._longest_alias = max((len(a.split()) for a in self._aliases), default=0)
+        self._weak = {normalize_occupation(a) for a in WEAK_ALIASES}
+
+        self._exact: dict[str, str] = {}
+        # Classifications added with learn(), oldest first
+        self._learned: dict[str, str] = {}
+        self.max_learned = max_learned
+        self._labels: list[str] = []
+        self._vectors: list[dict[str, float]] = []
+        self._postings: dict[str, list[tuple[int, float]]] = {}
+        self._idf: dict[str, float] = {}
+        self.fit(examples)
+
+    def fit(self, examples: Iterable[tuple[str, str]]) -> None:
+        """Train on (occupation, category) examples, replacing earlier ones.
+
+        Category names themselves are always included as examples.
+        """
+        labelled = [(c, c) for c in OCCUPATION_CATEGORIES if c != "Other"]
+        labelled += [(normalize_occupation(o), c) for o, c in examples]
+        labelled = [(normalize_occupation(o), c) for o, c in labelled if o]
+
+        self._exact = {text: category for text, category in labelled}
+        counts = [_ngrams(text) for text, _ in labelled]
+        document_frequency: Counter[str] = Counter()
+        for grams in counts:
+            document_frequency.update(grams.keys())
+        total = len(counts)
+        self._idf = {
+            g: math.log((1 + total) / (1 + df)) + 1 for g, df in document_frequency.items()
+        }
+
+        self._labels = [category for _, category in labelled]
+        self._vectors = [self._vector(grams) for grams in counts]
+        self._postings = {}
+        for i, vector in enumerate(self._vectors):
+            for gram, weight in vector.items():
+                self._postings.setdefault(gram, []).append((i, weight))
+
+    def learn(self, occupation: str, category: str) -> None:
+        """Remember a classification (e.g. from the LLM) as an exact match.
+
+        Only the ``max_learned`` most recent are kept.
+        """
+        text = normalize_occupation(occupation)
+        if not text:
+            return
+        self._learned.pop(text, None)
+        self._learned[text] = category
+        if len(self._learned) > self.max_learned:
+            del self._learned[next(iter(self._learned))]
+
+    def _vector(self, grams: Counter[str]) -> dict[str, float]:
+        # Unseen n-grams get the highest weight but match nothing
+        default_idf = math.log(1 + len(self._labels) + 1) + 1
+        vector = {g: count * self._idf.get(g, default_idf) for g, count in grams.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        return {g: w / norm for g, w in vector.items()}
+
+    def _keyword_categories(self, text: str) -> list[tuple[int, str]]:
+        """(phrase length, category) for every alias found in the text.
+
+        Weak aliases are dropped when a more specific one is present.
+        """
+        words = text.split()
+        strong, weak = [], []
+        for size in range(min(self._longest_alias, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                phrase = " ".join(words[start : start + size])
+                category = self._aliases.get(phrase)
+                if category is not None:
+                    (weak if phrase in self._weak else strong).append((size, category))
+        return strong or weak
+
+    def _ngram_scores(self, text: str) -> dict[str, float]:
+        """Best cosine similarity to an example of each category."""
+        similarity: Counter[int] = Counter()
+        for gram, weight in self._vector(_ngrams(text)).items():
+            for i, example_weight in self._postings.get(gram, ()):
+                similarity[i] += weight * example_weight
+        scores: dict[str, float] = {}
+        for i, score in similarity.items():
+            category = self._labels[i]
+            scores[category] = max(scores.get(category, 0.0), score)
+        return scores
+
+    def classify(self, occupation: str) -> OccupationMatch:
+        """The most likely category for an occupation."""
+        text = normalize_occupation(occupation)
+        if not text:
+            return OccupationMatch("Other", 0.0, "none")
+        category = self._learned.get(text) or self._exact.get(text)
+        if category is not None:
+            return OccupationMatch(category, 1.0, "exact")
+
+        found = self._keyword_categories(text)
+        for category in STATUS_CATEGORIES:
+            if any(c == category for _, c in found):
+                return OccupationMatch(category, 0.95, "keyword")
+
+        scores = self._ngram_scores(text)
+        if found:
+            candidates = {c for _, c in found}
+            if len(candidates) == 1:
+                return OccupationMatch(candidates.pop(), 0.9, "keyword")
+            # Conflicting keywords: the longest phrase wins, then the n-gram
+            # model, but the answer is not trusted enough to skip the LLM
+            category = max(found, key=lambda f: (f[0], scores.get(f[1], 0.0)))[1]
+            return OccupationMatch(category, 0.5, "keyword")
+
+        if not scores:
+            return OccupationMatch("Other", 0.0, "none")
+        category = max(scores, key=scores.get)
+        return OccupationMatch(category, round(scores[category], 3), "ngram")
+
+
+def default_classifier() -> OccupationClassifier:
+    """A classifier trained on ``LABELLED_OCCUPATIONS``."""
+    return OccupationClassifier(LABELLED_OCCUPATIONS)
@@ -118,10 +118,10 @@ Political lean: {identity.political_lean}
 
 Personality: {identity.personality_sketch}"""
 from centuria.data import process_personal_folder
+from centuria.data.bundle import BundleWriter
 from centuria.llm import complete, estimate_cost, CostEstimate
 from centuria.models import Persona
 from centuria.persona.file_types import FILE_TYPES, list_file_types
-from centuria.utils import parse_json_response
 
 
 class SyntheticPersonaSpec(BaseModel):
@@ -204,10 +204,8 @@ async def generate_identity(
     constraints = _build_identity_constraints(spec, existing_identities)
 
     prompt = IDENTITY_GENERATION_PROMPT.format(constraints=constraints)
-    result = await complete(prompt)
-
-    data = parse_json_response(result.content)
-    return SyntheticIdentity(**data)
+    result = await complete(prompt, response_model=SyntheticIdentity)
+    return result.parsed
 
 
 async def generate_file_content(identity: SyntheticIdentity, file_type: str) -> str:
@@ -225,24 +223,36 @@ async def generate_file_content(identity: SyntheticIdentity, file_type: str) ->
 
 async def generate_synthetic_files(
     identity: SyntheticIdentity,
-    output_dir: str | Path,
+    output_dir: str | Path | None,
     file_types: list[str] | None = None,
     num_files: int | None = None,
+    bundle: BundleWriter | None = None,
+    persona_id: str | None = None,
 ) -> dict[str, Path]:
     """
     Generate synthetic data files for an identity.
 
     Args:
         identity: The synthetic identity
-        output_dir: Directory to save files
+        output_dir: Directory to save files (None to write only to ``bundle``)
         file_types: Specific file types to generate (None = random selection)
         num_files: Number of files to generate (ignored if file_types specified)
+        bundle: Optional packed bundle to add the files to
+        persona_id: Key for the files in ``bundle`` (defaults to the folder name)
 
     Returns:
-        Dict mapping file type to saved file path
+        Dict mapping file type to saved file path (the bare filename when only
+        written to a bundle)
     """
-    output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
+    if output_dir is None and bundle is None:
+        raise ValueError("Provide an output_dir, a bundle, or both")
+    if bundle is not None and persona_id is None:
+        if output_dir is None:
+            raise ValueError("persona_id is required when writing only to a bundle")
+        persona_id = Path(output_dir).name
+    if output_dir is not None:
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
 
     # Determine which files to generate
     if file_types is None:
@@ -266,14 +276,21 @@ async def generate_synthetic_files(
     # Save files
     saved_files = {}
     for file_type, content in zip(file_types, contents):
-        config = FILE_TYPES[file_type]
-        file_path = output_dir / config["filename"]
-        file_path.write_text(content)
+        filename = FILE_TYPES[file_type]["filename"]
+        file_path = Path(filename)
+        if output_dir is not None:
+            file_path = output_dir / filename
+            file_path.write_text(content)
+        if bundle is not None:
+            bundle.add_file(persona_id, filename, content)
         saved_files[file_type] = file_path
 
     # Also save the identity for reference
-    identity_path = output_dir / "identity.json"
-    identity_path.write_text(identity.model_dump_json(indent=2))
+    identity_json = identity.model_dump_json(indent=2)
+    if output_dir is not None:
+        (output_dir / "identity.json").write_text(identity_json)
+    if bundle is not None:
+        bundle.add_file(persona_id, "identity.json", identity_json)
 
     return saved_files
 
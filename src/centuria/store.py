@@ -0,0 +1,521 @@
+"""SQLite-backed store for a generated population.
+
+A neighbourhood used to live in half a dozen JSON files plus one folder of
+text files per persona, each loaded in full whenever anything needed it. The
+store imports that layout into a single SQLite file:
+
+- ``households``: one row per household (address, tenure, ...)
+- ``personas``: demographic record plus the household member entry, with the
+  filterable fields as indexed columns
+- ``persona_files``: the raw synthetic files (``cv.txt``, ``identity.json``, ...)
+- ``contexts``: the context statement used for surveying each persona
+- ``survey_results``: responses recorded against a run and question
+
+Reads are keyed or filtered lookups, writes are transactional, and
+``export_directory`` writes the original JSON files back out byte for byte.
+
+Usage::
+
+    python -m centuria.store import data/synthetic/dalston_clt dalston.sqlite3
+    python -m centuria.store export dalston.sqlite3 out/dalston_clt
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from centuria.models import Persona
+
+# Persona record fields stored as indexed columns (the full record is kept as JSON)
+PERSONA_COLUMNS = (
+    "name",
+    "age",
+    "gender",
+    "occupation",
+    "industry",
+    "education",
+    "ethnicity",
+    "political_lean",
+    "tenure",
+    "years_in_area",
+    "socioeconomic",
+)
+
+# Fields copied from the demographic record into personas_for_survey.json
+SURVEY_FIELDS = ("id", "name", "age", "gender", "occupation", "ethnicity", "address")
+
+_PERSONA_UPDATE = ("position", "household_id", *PERSONA_COLUMNS, "record", "member")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS households (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS personas (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    household_id TEXT REFERENCES households(id) ON DELETE CASCADE,
+    {", ".join(PERSONA_COLUMNS)},
+    record TEXT NOT NULL,
+    member TEXT
+);
+CREATE TABLE IF NOT EXISTS persona_files (
+    persona_id TEXT NOT NULL REFERENCES personas(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (persona_id, name)
+);
+CREATE TABLE IF NOT EXISTS contexts (
+    persona_id TEXT PRIMARY KEY REFERENCES personas(id) ON DELETE CASCADE,
+    context TEXT NOT NULL,
+    extracted INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS survey_results (
+    run_id TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    persona_id TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (run_id, question_id, persona_id)
+);
+CREATE INDEX IF NOT EXISTS personas_position ON personas(position);
+CREATE INDEX IF NOT EXISTS personas_household ON personas(household_id);
+CREATE INDEX IF NOT EXISTS personas_age ON personas(age);
+CREATE INDEX IF NOT EXISTS personas_occupation ON personas(occupation);
+CREATE INDEX IF NOT EXISTS personas_tenure ON personas(tenure);
+CREATE INDEX IF NOT EXISTS survey_results_question ON survey_results(question_id);
+"""
+
+
+class InvalidFilterError(ValueError):
+    """A filter names an unknown field or has a malformed value."""
+
+
+# Values a field can be compared with
+_SCALARS = (str, int, float, type(None))
+
+
+def parse_filters(filters: dict[str, Any] | None) -> list[tuple[str, str, Any]]:
+    """Check query filters and normalise each to ``(field, kind, value)``.
+
+    ``kind`` is ``"range"`` (value is ``(min, max)``, either may be None),
+    ``"any"`` (value is a list) or ``"eq"``. Checking that the fields exist is
+    left to the caller. Shared by the SQL store and ``centuria.data.query``.
+    """
+    parsed = []
+    for field, condition in (filters or {}).items():
+        if isinstance(condition, dict):
+            unknown = set(condition) - {"min", "max"}
+            if unknown:
+                raise InvalidFilterError(f"Unknown range keys for {field}: {sorted(unknown)}")
+            bounds = (condition.get("min"), condition.get("max"))
+            if any(
+                b is not None and (isinstance(b, bool) or not isinstance(b, (int, float)))
+                for b in bounds
+            ):
+                raise InvalidFilterError(f"Range bounds for {field} must be numbers")
+            parsed.append((field, "range", bounds))
+        elif isinstance(condition, list):
+            if not all(isinstance(v, _SCALARS) for v in condition):
+                raise InvalidFilterError(f"Values for {field} must be strings, numbers or null")
+            parsed.append((field, "any", condition))
+        elif isinstance(condition, _SCALARS):
+            parsed.append((field, "eq", condition))
+        else:
+            raise InvalidFilterError(f"Value for {field} must be a string, number or null")
+    return parsed
+
+
+def _where(filters: dict[str, Any] | None, table: str = "") -> tuple[str, list]:
+    """Translate query filters (value, list of values or min/max range) to SQL."""
+    clauses, params = [], []
+    for field, kind, value in parse_filters(filters):
+        if field not in PERSONA_COLUMNS and field not in ("id", "household_id"):
+            raise InvalidFilterError(f"Unknown field: {field}")
+        column = f"{table}.{field}" if table else field
+        if kind == "range":
+            for op, bound in zip((">=", "<="), value):
+                if bound is not None:
+                    clauses.append(f"{column} {op} ?")
+                    params.append(bound)
+        elif kind == "any":
+            clauses.append(f"{column} IN ({', '.join('?' * len(value))})")
+            params.extend(value)
+        else:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """Write a file via a temporary sibling and rename, so readers never see half a file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _read_json(path: Path) -> Any:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _dump_json(data: Any) -> str:
+    # Matches the formatting of the files written by the neighbourhood notebook
+    return json.dumps(data, indent=2)
+
+
+class PopulationStore:
+    """A population (households, personas, files, contexts, survey results) in SQLite."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "PopulationStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Group writes so they are all applied or none are."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    # -- writes ---------------------------------------------------------------
+
+    def clear(self) -> None:
+        """Remove the population (survey results are kept)."""
+        with self.transaction():
+            self._clear()
+
+    def _clear(self) -> None:
+        for table in ("contexts", "persona_files", "personas", "households", "meta"):
+            self._conn.execute(f"DELETE FROM {table}")
+
+    def put_household(self, household: dict, position: int | None = None) -> None:
+        """Insert or replace a household (members are stored on their personas)."""
+        data = {k: v for k, v in household.items() if k != "members"}
+        if position is None:
+            position = self._next_position("households")
+        self._conn.execute(
+            # Upsert rather than REPLACE, which would cascade-delete the members
+            "INSERT INTO households (id, position, data) VALUES (?, ?, ?)"
+            " ON CONFLICT (id) DO UPDATE SET position = excluded.position, data = excluded.data",
+            (household["id"], position, json.dumps(data)),
+        )
+
+    def put_persona(
+        self, record: dict, member: dict | None = None, position: int | None = None
+    ) -> None:
+        """Insert or replace a persona's demographic record and household member entry."""
+        if position is None:
+            existing = self._conn.execute(
+                "SELECT position FROM personas WHERE id = ?", (record["id"],)
+            ).fetchone()
+            position = existing["position"] if existing else self._next_position("personas")
+        self._conn.execute(
+            f"INSERT INTO personas (id, position, household_id, "
+            f"{', '.join(PERSONA_COLUMNS)}, record, member) "
+            f"VALUES ({', '.join('?' * (len(PERSONA_COLUMNS) + 5))}) "
+            f"ON CONFLICT (id) DO UPDATE SET "
+            f"{', '.join(f'{c} = excluded.{c}' for c in _PERSONA_UPDATE)}",
+            (
+                record["id"],
+                position,
+                record.get("household_id"),
+                *(record.get(c) for c in PERSONA_COLUMNS),
+                json.dumps(record),
+                json.dumps(member) if member is not None else None,
+            ),
+        )
+
+    def put_file(self, persona_id: str, name: str, content: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO persona_files (persona_id, name, content) VALUES (?, ?, ?)",
+            (persona_id, name, content),
+        )
+
+    def put_context(self, persona_id: str, context: str, extracted: bool = True) -> None:
+        """Set a persona's context statement (``extracted`` is False for fallbacks)."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO contexts (persona_id, context, extracted) VALUES (?, ?, ?)",
+            (persona_id, context, int(extracted)),
+        )
+
+    def add_survey_results(self, run_id: str, question_id: str, results: list[dict]) -> None:
+        """Record responses for a run, each a dict with at least ``persona_id``."""
+        now = time.time()
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO survey_results"
+                " (run_id, question_id, persona_id, response, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, question_id, r["persona_id"], json.dumps(r), now) for r in results],
+            )
+
+    def _next_position(self, table: str) -> int:
+        row = self._conn.execute(f"SELECT COALESCE(MAX(position) + 1, 0) FROM {table}").fetchone()
+        return row[0]
+
+    # -- reads ----------------------------------------------------------------
+
+    def get_meta(self, key: str) -> Any:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else json.loads(row["value"])
+
+    def set_meta(self, key: str, value: Any) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value))
+        )
+
+    def get_persona(self, persona_id: str) -> dict | None:
+        """A persona's demographic record, or None."""
+        row = self._conn.execute(
+            "SELECT record FROM personas WHERE id = ?", (persona_id,)
+        ).fetchone()
+        return None if row is None else json.loads(row["record"])
+
+    def personas(self, filters: dict[str, Any] | None = None) -> list[dict]:
+        """Demographic records matching the filters, in population order.
+
+        Raises:
+            InvalidFilterError: If a filter names an unknown field
+        """
+        where, params = _where(filters)
+        rows = self._conn.execute(
+            f"SELECT record FROM personas{where} ORDER BY position", params
+        ).fetchall()
+        return [json.loads(row["record"]) for row in rows]
+
+    def persona_ids(self, filters: dict[str, Any] | None = None) -> list[str]:
+        where, params = _where(filters)
+        rows = self._conn.execute(
+            f"SELECT id FROM personas{where} ORDER BY position", params
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+    def count(self, filters: dict[str, Any] | None = None) -> int:
+        where, params = _where(filters)
+        return self._conn.execute(f"SELECT COUNT(*) FROM personas{where}", params).fetchone()[0]
+
+    def get_household(self, household_id: str) -> dict | None:
+        """A household with its members, or None."""
+        row = self._conn.execute(
+            "SELECT data FROM households WHERE id = ?", (household_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        household = json.loads(row["data"])
+        household["members"] = self._members(household_id)
+        return household
+
+    def households(self) -> list[dict]:
+        """Every household with its members, in population order."""
+        rows = self._conn.execute("SELECT id, data FROM households ORDER BY position").fetchall()
+        members: dict[str, list[dict]] = {}
+        for row in self._conn.execute(
+            "SELECT household_id, member FROM personas WHERE member IS NOT NULL ORDER BY position"
+        ):
+            members.setdefault(row["household_id"], []).append(json.loads(row["member"]))
+        return [
+            {**json.loads(row["data"]), "members": members.get(row["id"], [])} for row in rows
+        ]
+
+    def _members(self, household_id: str) -> list[dict]:
+        rows = self._conn.execute(
+            "SELECT member FROM personas WHERE household_id = ? AND member IS NOT NULL"
+            " ORDER BY position",
+            (household_id,),
+        ).fetchall()
+        return [json.loads(row["member"]) for row in rows]
+
+    def files(self, persona_id: str) -> dict[str, str]:
+        """A persona's synthetic files as {filename: content}, sorted by name."""
+        rows = self._conn.execute(
+            "SELECT name, content FROM persona_files WHERE persona_id = ? ORDER BY name",
+            (persona_id,),
+        ).fetchall()
+        return {row["name"]: row["content"] for row in rows}
+
+    def get_context(self, persona_id: str) -> str | None:
+        row = self._conn.execute(
+            "SELECT context FROM contexts WHERE persona_id = ?", (persona_id,)
+        ).fetchone()
+        return None if row is None else row["context"]
+
+    def survey_personas(self, filters: dict[str, Any] | None = None) -> list[Persona]:
+        """Personas with context statements, ready to survey."""
+        where, params = _where(filters, table="p")
+        rows = self._conn.execute(
+            f"SELECT p.id, p.name, c.context FROM personas p"
+            f" JOIN contexts c ON c.persona_id = p.id{where}"
+            f" ORDER BY p.position",
+            params,
+        ).fetchall()
+        return [Persona(id=row["id"], name=row["name"], context=row["context"]) for row in rows]
+
+    def survey_results(
+        self, run_id: str | None = None, question_id: str | None = None
+    ) -> list[dict]:
+        """Recorded responses, optionally for one run and/or question."""
+        clauses, params = [], []
+        if run_id is not None:
+            clauses.append("run_id = ?")
+            params.append(run_id)
+        if question_id is not None:
+            clauses.append("question_id = ?")
+            params.append(question_id)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        rows = self._conn.execute(
+            f"SELECT response FROM survey_results{where} ORDER BY created_at, rowid", params
+        ).fetchall()
+        return [json.loads(row["response"]) for row in rows]
+
+    # -- JSON layout ------------------------------------------------------------
+
+    def import_directory(self, directory: str | Path) -> int:
+        """Replace the population with the JSON layout in ``directory``.
+
+        Reads ``personas.json`` and whichever of ``neighbourhood.json``,
+        ``personas_enriched.json``, ``context_cache.json`` and ``personas/<id>/``
+        exist. The import is a single transaction.
+
+        Returns:
+            Number of personas imported
+        """
+        directory = Path(directory)
+        records = _read_json(directory / "personas.json")
+
+        neighbourhood_path = directory / "neighbourhood.json"
+        neighbourhood = _read_json(neighbourhood_path) if neighbourhood_path.exists() else None
+        households = neighbourhood["households"] if neighbourhood else []
+        members = {m["id"]: m for h in households for m in h["members"]}
+
+        contexts: dict[str, tuple[str, bool]] = {}
+        enriched_path = directory / "personas_enriched.json"
+        cache_path = directory / "context_cache.json"
+        if enriched_path.exists():
+            for p in _read_json(enriched_path):
+                contexts[p["id"]] = (p["rich_context"], bool(p.get("has_synthetic_files")))
+        elif cache_path.exists():
+            contexts = {pid: (c, True) for pid, c in _read_json(cache_path).items()}
+
+        persona_dirs = directory / "personas"
+        with self.transaction():
+            self._clear()
+            if neighbourhood:
+                self.set_meta(
+                    "neighbourhood", {k: v for k, v in neighbourhood.items() if k != "households"}
+                )
+            for i, household in enumerate(households):
+                self.put_household(household, position=i)
+            for i, record in enumerate(records):
+                self.put_persona(record, members.get(record["id"]), position=i)
+                if record["id"] in contexts:
+                    self.put_context(record["id"], *contexts[record["id"]])
+
+                folder = persona_dirs / record["id"]
+                if folder.is_dir():
+                    for path in sorted(folder.iterdir()):
+                        if path.is_file() and not path.name.startswith("."):
+                            self.put_file(record["id"], path.name, path.read_text(encoding="utf-8"))
+        return len(records)
+
+    def export_directory(self, directory: str | Path) -> None:
+        """Write the population back out in the JSON layout ``import_directory`` reads."""
+        directory = Path(directory)
+        records = self.personas()
+        context_rows = {
+            row["persona_id"]: row
+            for row in self._conn.execute("SELECT persona_id, context, extracted FROM contexts")
+        }
+
+        _write_atomic(directory / "personas.json", _dump_json(records))
+
+        neighbourhood = self.get_meta("neighbourhood")
+        if neighbourhood is not None:
+            _write_atomic(
+                directory / "neighbourhood.json",
+                _dump_json({**neighbourhood, "households": self.households()}),
+            )
+
+        if context_rows:
+            enriched = [
+                {
+                    **r,
+                    "rich_context": context_rows[r["id"]]["context"],
+                    "has_synthetic_files": bool(context_rows[r["id"]]["extracted"]),
+                }
+                for r in records
+                if r["id"] in context_rows
+            ]
+            cache = {
+                p["id"]: p["rich_context"] for p in enriched if p["has_synthetic_files"]
+            }
+            survey = [
+                {**{f: p[f] for f in SURVEY_FIELDS if f in p}, "context": p["rich_context"]}
+                for p in enriched
+            ]
+            _write_atomic(directory / "context_cache.json", _dump_json(cache))
+            _write_atomic(directory / "personas_enriched.json", _dump_json(enriched))
+            _write_atomic(directory / "personas_for_survey.json", _dump_json(survey))
+
+        for row in self._conn.execute(
+            "SELECT persona_id, name, content FROM persona_files ORDER BY persona_id, name"
+        ):
+            _write_atomic(directory / "personas" / row["persona_id"] / row["name"], row["content"])
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 3 or argv[0] not in ("import", "export"):
+        print(__doc__.split("Usage::")[1].strip("\n"))
+        raise SystemExit(2)
+
+    command, *paths = argv
+    if command == "import":
+        source, db = paths
+        with PopulationStore(db) as store:
+            count = store.import_directory(source)
+        print(f"Imported {count} personas from {source} into {db}")
+    else:
+        db, target = paths
+        with PopulationStore(db) as store:
+            store.export_directory(target)
+        print(f"Exported {db} to {target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ from centuria.survey.executor import (
     estimate_survey_cost,
     parse_choice_and_justification,
     run_survey,
+    stream_question,
 )
 
 __all__ = [
@@ -24,4 +25,5 @@ __all__ = [
     "ask_question",
     "estimate_survey_cost",
     "run_survey",
+    "stream_question",
 ]
@@ -1,6 +1,7 @@
 """Survey execution."""
 
 import asyncio
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 
 from centuria.llm import CostEstimate, complete, estimate_cost
@@ -82,11 +83,16 @@ async def ask_question(
     question: Question,
     model: str | None = None,
     api_keys: dict[str, str] | None = None,
+    timeout: float | None = None,
 ) -> QuestionResponse:
-    """Ask a persona a single question."""
+    """Ask a persona a single question.
+
+    The call honours any active ``centuria.llm.deadline()`` as well as the
+    optional per-question ``timeout`` in seconds.
+    """
     system = build_system_prompt(persona)
     user = build_user_prompt(question)
-    result = await complete(user, system=system, model=model, api_keys=api_keys)
+    result = await complete(user, system=system, model=model, api_keys=api_keys, timeout=timeout)
 
     # Parse choice and justification for single_select questions
     if question.question_type == "single_select":
@@ -125,6 +131,49 @@ async def run_survey(
     )
 
 
+async def stream_question(
+    personas: list[Persona],
+    question: Question,
+    model: str | None = None,
+    api_keys: dict[str, str] | None = None,
+    concurrency: int | None = None,
+    return_exceptions: bool = False,
+) -> AsyncIterator[tuple[Persona, QuestionResponse | Exception]]:
+    """Ask many personas one question, yielding each answer as soon as it completes.
+
+    Answers arrive in completion order, not input order. Calls still pending
+    when the consumer stops iterating are cancelled.
+
+    Args:
+        concurrency: Maximum number of calls in flight (None = all at once)
+        return_exceptions: Yield a failed call's exception in place of its
+            answer, instead of raising it (and cancelling the other calls)
+    """
+    semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+
+    async def call(persona: Persona) -> QuestionResponse:
+        if semaphore is None:
+            return await ask_question(persona, question, model=model, api_keys=api_keys)
+        async with semaphore:
+            return await ask_question(persona, question, model=model, api_keys=api_keys)
+
+    async def ask(persona: Persona) -> tuple[Persona, QuestionResponse | Exception]:
+        try:
+            return persona, await call(persona)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return persona, e
+
+    tasks = [asyncio.ensure_future(ask(p)) for p in personas]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
 @dataclass
 class SurveyEstimate:
     """Estimated cost for running a survey."""
@@ -1,15 +1,20 @@
 """Shared utilities for Centuria."""
 
 import json
-import re
+from collections.abc import Iterator
 
 
 def parse_json_response(content: str) -> dict:
     """Parse JSON from LLM response, handling markdown code blocks.
 
     LLMs often wrap JSON in ```json ... ``` blocks. This extracts and parses
-    the JSON regardless of formatting.
+    the JSON regardless of formatting. If that fails, the first JSON value in
+    the text is found and repaired as in ``extract_json_from_text``.
+
+    Raises:
+        json.JSONDecodeError: If the text contains no usable JSON value
     """
+    original = content
     content = content.strip()
 
     # Handle markdown code blocks
@@ -25,35 +30,144 @@ def parse_json_response(content: str) -> dict:
                 content = content[1:]
         content = content.strip()
 
-    return json.loads(content)
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        value = extract_json_from_text(original)
+        if value is None:
+            raise
+        return value
+
 
+# Bracket that closes each kind of JSON container
+_CLOSERS = {"{": "}", "[": "]"}
 
-def extract_json_from_text(text: str) -> dict | None:
-    """Try to extract JSON object from text that may contain other content.
+_SMART_QUOTES = "\u201c\u201d"
+
+# Times extract_json_from_text rescans after a candidate that fails to parse
+_MAX_RESCANS = 4
 
-    Useful when LLM includes explanation before/after the JSON.
-    Returns None if no valid JSON found.
+
+def _json_candidates(text: str, pos: int = 0) -> Iterator[tuple[int, int | None]]:
+    """Spans of balanced ``{...}``/``[...]`` values in ``text[pos:]``, in one pass.
+
+    Brackets inside JSON strings (with escapes) are ignored. A value that
+    never closes, or closes with the wrong bracket, is yielded as
+    ``(start, None)``, followed by its largest complete parts. Spans are
+    disjoint and in order.
     """
-    text = text.strip()
+    stack: list[tuple[str, int]] = []
+    # Spans closed inside the value that is still open
+    nested: list[tuple[int, int]] = []
+    in_string = escaped = False
 
-    # First try direct parse
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
+    def abandon() -> list[tuple[int, int | None]]:
+        # Outermost complete parts, found walking back from the last to close
+        kept, min_start = [], len(text)
+        for start, end in reversed(nested):
+            if end <= min_start:
+                kept.append((start, end))
+                min_start = start
+        failed = [(stack[0][1], None), *reversed(kept)]
+        stack.clear()
+        nested.clear()
+        return failed
+
+    for i in range(pos, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            # Quotes only delimit strings inside a value, not in the prose around it
+            in_string = bool(stack)
+        elif ch in _CLOSERS:
+            stack.append((_CLOSERS[ch], i))
+        elif ch in "}]" and stack:
+            closer, start = stack[-1]
+            if ch != closer:
+                yield from abandon()
+                continue
+            stack.pop()
+            if stack:
+                nested.append((start, i + 1))
+            else:
+                nested.clear()
+                yield start, i + 1
+    if stack:
+        yield from abandon()
 
-    # Try markdown code block extraction
+
+def repair_json(text: str) -> str:
+    """Fix common LLM JSON mistakes: trailing commas and smart quotes.
+
+    Smart quotes are turned into ``"`` where they delimit a string: outside
+    a string, or closing one when the next non-space character is ``:``,
+    ``,``, ``}`` or ``]``. Smart quotes inside string values are kept.
+    """
+    # The next non-space character after each position, computed right to left
+    following = [""] * (len(text) + 1)
+    for i in range(len(text) - 1, -1, -1):
+        following[i] = following[i + 1] if text[i].isspace() else text[i]
+
+    out: list[str] = []
+    in_string = escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"' or (ch in _SMART_QUOTES and following[i + 1] in (":", ",", "}", "]")):
+                ch, in_string = '"', False
+        elif ch == '"' or ch in _SMART_QUOTES:
+            ch, in_string = '"', True
+        elif ch in "}]":
+            # Drop a trailing comma before the closing bracket
+            j = len(out) - 1
+            while j >= 0 and out[j].isspace():
+                j -= 1
+            if j >= 0 and out[j] == ",":
+                del out[j]
+        out.append(ch)
+    return "".join(out)
+
+
+def _loads_lenient(text: str):
     try:
-        return parse_json_response(text)
+        return json.loads(text, strict=False)
     except json.JSONDecodeError:
-        pass
+        return json.loads(repair_json(text), strict=False)
+
 
-    # Try to find JSON object with regex
-    match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', text, re.DOTALL)
-    if match:
-        try:
-            return json.loads(match.group())
-        except json.JSONDecodeError:
-            pass
+def extract_json_from_text(text: str) -> dict | list | None:
+    """Try to extract JSON object from text that may contain other content.
 
-    return None
+    Useful when LLM includes explanation before/after the JSON. Finds the
+    first complete JSON object or array, at any nesting depth, repairing
+    trailing commas and smart quotes (see ``repair_json``) and allowing raw
+    newlines in strings. Returns None if no valid JSON found.
+
+    A quote in the prose can put a candidate's string boundaries out of step
+    (``'a "{" then {"k": "v"}'``), so when a candidate fails to parse the
+    scan restarts just after its opening bracket. Restarts are capped, which
+    keeps the time linear in the length of the text.
+    """
+    pos = rescans = 0
+    while True:
+        for start, end in _json_candidates(text, pos):
+            if end is not None:
+                try:
+                    return _loads_lenient(text[start:end])
+                except json.JSONDecodeError:
+                    pass
+            if rescans < _MAX_RESCANS:
+                rescans += 1
+                pos = start + 1
+                break
+        else:
+            return None
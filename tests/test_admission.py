@@ -0,0 +1,140 @@
+"""Tests for centuria.api.admission module."""
+
+import asyncio
+
+import pytest
+
+from centuria.api.admission import AdmissionController, AdmissionRejected
+from centuria.llm import call_gate
+
+
+class TestAdmit:
+    def test_reserves_and_releases(self):
+        controller = AdmissionController(max_pending=10, max_session_pending=10)
+        with controller.admit("a", 6):
+            assert controller.stats()["pending"] == 6
+        assert controller.stats()["pending"] == 0
+
+    def test_session_limit_is_429_with_retry_after(self):
+        controller = AdmissionController(max_per_session=2, max_session_pending=5)
+        controller.admit("a", 4)
+        with pytest.raises(AdmissionRejected) as exc:
+            controller.admit("a", 3)
+        assert exc.value.status_code == 429
+        assert exc.value.retry_after >= 1
+        controller.admit("b", 3)  # other sessions unaffected
+
+    def test_global_limit(self):
+        controller = AdmissionController(max_pending=5, max_session_pending=5)
+        controller.admit("a", 4)
+        with pytest.raises(AdmissionRejected) as exc:
+            controller.admit("b", 2)
+        assert exc.value.status_code == 429
+
+    def test_oversized_request_is_413(self):
+        controller = AdmissionController(max_session_pending=5)
+        with pytest.raises(AdmissionRejected) as exc:
+            controller.admit("a", 6)
+        assert exc.value.status_code == 413
+        assert exc.value.retry_after is None
+
+
+class TestScheduling:
+    async def test_concurrency_caps(self):
+        controller = AdmissionController(max_concurrent=3, max_per_session=2)
+        running = {"a": 0, "b": 0}
+        peak = {"a": 0, "b": 0, "total": 0}
+
+        async def call(session_id):
+            async with controller.slot(session_id):
+                running[session_id] += 1
+                peak[session_id] = max(peak[session_id], running[session_id])
+                peak["total"] = max(peak["total"], sum(running.values()))
+                await asyncio.sleep(0.01)
+                running[session_id] -= 1
+
+        await asyncio.gather(*[call("a") for _ in range(6)], *[call("b") for _ in range(6)])
+        assert peak == {"a": 2, "b": 2, "total": 3}
+
+    async def test_fair_share_between_sessions(self):
+        controller = AdmissionController(max_concurrent=1, max_per_session=1)
+        order = []
+        release = asyncio.Event()
+
+        async def call(session_id):
+            async with controller.slot(session_id):
+                order.append(session_id)
+                await release.wait()
+
+        # The heavy session queues first, then the light one arrives
+        heavy = [asyncio.create_task(call("heavy")) for _ in range(5)]
+        await asyncio.sleep(0)
+        light = [asyncio.create_task(call("light")) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*heavy, *light)
+        # Light's calls interleave with heavy's backlog instead of waiting behind it
+        assert order == ["heavy", "heavy", "light", "heavy", "light", "heavy", "heavy"]
+
+    async def test_weights(self):
+        controller = AdmissionController(
+            max_concurrent=1, max_per_session=1, weight=lambda s: 3.0 if s == "paid" else 1.0
+        )
+        order = []
+        release = asyncio.Event()
+
+        async def call(session_id):
+            async with controller.slot(session_id):
+                order.append(session_id)
+                await release.wait()
+
+        blocker = asyncio.create_task(call("blocker"))
+        await asyncio.sleep(0)
+        tasks = [asyncio.create_task(call(s)) for s in ["free"] * 4 + ["paid"] * 4]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(blocker, *tasks)
+        assert order[1:6].count("paid") >= 3
+
+    async def test_cancelled_waiter_frees_its_place(self):
+        controller = AdmissionController(max_concurrent=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with controller.slot("a"):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        await holder
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.stats()["running"] == 0
+        assert controller.stats()["waiting"] == 0
+
+
+class TestCallGate:
+    async def test_complete_runs_inside_gate(self, monkeypatch):
+        from centuria.llm import client
+
+        entered = []
+
+        class FakeLiteLLM:
+            async def acompletion(self, **kwargs):
+                raise RuntimeError("stop")
+
+        monkeypatch.setattr(client, "_litellm", lambda: FakeLiteLLM())
+        controller = AdmissionController()
+
+        def gate():
+            entered.append(True)
+            return controller.slot("a")
+
+        with call_gate(gate), pytest.raises(RuntimeError):
+            await client.complete("hi", model="gpt-4o-mini")
+        assert entered == [True]
+        assert controller.stats()["running"] == 0
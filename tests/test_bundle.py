@@ -0,0 +1,169 @@
+"""Tests for centuria.data.bundle module."""
+
+import json
+
+import pytest
+
+from centuria.data.bundle import (
+    BundleError,
+    BundleWriter,
+    PersonaBundle,
+    index_path,
+    pack_directory,
+    unpack_bundle,
+)
+
+
+@pytest.fixture
+def personas_dir(tmp_path):
+    root = tmp_path / "personas"
+    for persona_id, files in {
+        "hh_001_p1": {"cv.txt": "Nurse.", "notes.txt": "Café on Fridays."},
+        "hh_002_p1": {"cv.txt": "Barista.", "playlist.md": "- Burial"},
+    }.items():
+        folder = root / persona_id
+        folder.mkdir(parents=True)
+        for name, content in files.items():
+            (folder / name).write_text(content)
+        (folder / "identity.json").write_text(json.dumps({"name": persona_id}))
+    return root
+
+
+class TestBundle:
+    def test_pack_and_read(self, personas_dir, tmp_path):
+        bundle_path = tmp_path / "personas.bundle"
+        assert pack_directory(personas_dir, bundle_path, {"hh_001_p1": "Ctx"}) == 2
+
+        with PersonaBundle(bundle_path) as bundle:
+            assert bundle.persona_ids() == ["hh_001_p1", "hh_002_p1"]
+            assert bundle.text("hh_001_p1", "notes.txt") == "Café on Fridays."
+            assert bundle.identity("hh_002_p1") == {"name": "hh_002_p1"}
+            assert bundle.context("hh_001_p1") == "Ctx"
+            assert bundle.context("hh_002_p1") is None
+            assert bundle.load_text("hh_002_p1") == "Barista.\n\n- Burial"
+
+    def test_documents_are_views(self, personas_dir, tmp_path):
+        bundle_path = tmp_path / "personas.bundle"
+        pack_directory(personas_dir, bundle_path)
+        with PersonaBundle(bundle_path) as bundle:
+            view = bundle.document("hh_001_p1", "cv.txt")
+            assert isinstance(view, memoryview)
+            assert bytes(view) == b"Nurse."
+            view.release()
+
+    def test_round_trip(self, personas_dir, tmp_path):
+        bundle_path = tmp_path / "personas.bundle"
+        pack_directory(personas_dir, bundle_path, {"hh_002_p1": "Ctx"})
+        out = tmp_path / "out"
+        assert unpack_bundle(bundle_path, out) == {"hh_002_p1": "Ctx"}
+        for path in personas_dir.rglob("*"):
+            if path.is_file():
+                assert (out / path.relative_to(personas_dir)).read_bytes() == path.read_bytes()
+
+    def test_append_replaces_documents(self, personas_dir, tmp_path):
+        bundle_path = tmp_path / "personas.bundle"
+        pack_directory(personas_dir, bundle_path)
+        with BundleWriter(bundle_path, append=True) as writer:
+            writer.add_file("hh_001_p1", "cv.txt", "Midwife.")
+            writer.add_file("hh_003_p1", "cv.txt", "Teacher.")
+        with PersonaBundle(bundle_path) as bundle:
+            assert bundle.text("hh_001_p1", "cv.txt") == "Midwife."
+            assert bundle.text("hh_001_p1", "notes.txt") == "Café on Fridays."
+            assert "hh_003_p1" in bundle
+
+    def test_failed_write_keeps_existing_bundle(self, personas_dir, tmp_path):
+        bundle_path = tmp_path / "personas.bundle"
+        pack_directory(personas_dir, bundle_path)
+        data, index = bundle_path.read_bytes(), index_path(bundle_path).read_bytes()
+
+        with pytest.raises(RuntimeError):
+            with BundleWriter(bundle_path) as writer:
+                writer.add_file("hh_009_p1", "cv.txt", "Half written")
+                raise RuntimeError("disk full")
+        assert bundle_path.read_bytes() == data
+        assert index_path(bundle_path).read_bytes() == index
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "personas",
+            "personas.bundle",
+            index_path(bundle_path).name,
+        ]
+
+    def test_failed_append_is_discarded(self, personas_dir, tmp_path):
+        bundle_path = tmp_path / "personas.bundle"
+        pack_directory(personas_dir, bundle_path)
+        data = bundle_path.read_bytes()
+
+        with pytest.raises(RuntimeError):
+            with BundleWriter(bundle_path, append=True) as writer:
+                writer.add_file("hh_001_p1", "cv.txt", "Half written")
+                raise RuntimeError("disk full")
+        assert bundle_path.read_bytes() == data
+        with PersonaBundle(bundle_path) as bundle:
+            assert bundle.text("hh_001_p1", "cv.txt") == "Nurse."
+
+    def test_missing_index(self, tmp_path):
+        (tmp_path / "x.bundle").write_bytes(b"CNTBNDL1")
+        with pytest.raises(BundleError):
+            PersonaBundle(tmp_path / "x.bundle")
+
+    def test_truncated_data(self, personas_dir, tmp_path):
+        bundle_path = tmp_path / "personas.bundle"
+        pack_directory(personas_dir, bundle_path)
+        bundle_path.write_bytes(bundle_path.read_bytes()[:10])
+        assert index_path(bundle_path).exists()
+        with pytest.raises(BundleError):
+            PersonaBundle(bundle_path)
+
+    def test_index_from_another_write_rejected(self, personas_dir, tmp_path):
+        bundle_path = tmp_path / "personas.bundle"
+        pack_directory(personas_dir, bundle_path)
+        stale_index = index_path(bundle_path).read_bytes()
+        pack_directory(personas_dir, bundle_path)
+        index_path(bundle_path).write_bytes(stale_index)
+        with pytest.raises(BundleError):
+            PersonaBundle(bundle_path)
+
+    def test_unknown_persona(self, personas_dir, tmp_path):
+        bundle_path = tmp_path / "personas.bundle"
+        pack_directory(personas_dir, bundle_path)
+        with PersonaBundle(bundle_path) as bundle, pytest.raises(KeyError):
+            bundle.files("nobody")
+
+    def test_closed_when_block_raises(self, personas_dir, tmp_path):
+        bundle_path = tmp_path / "personas.bundle"
+        pack_directory(personas_dir, bundle_path)
+        with pytest.raises(KeyError), PersonaBundle(bundle_path) as bundle:
+            bundle.text("hh_001_p1", "missing.txt")
+        assert bundle._file.closed
+
+
+class TestGenerateIntoBundle:
+    async def test_generate_synthetic_files_writes_bundle(self, monkeypatch, tmp_path):
+        from centuria.persona import synthetic
+
+        async def fake_content(identity, file_type):
+            return f"{file_type} for {identity.name}"
+
+        monkeypatch.setattr(synthetic, "generate_file_content", fake_content)
+        identity = synthetic.SyntheticIdentity(
+            name="Ada Obi",
+            age=34,
+            gender="female",
+            location="Dalston, London",
+            occupation="nurse",
+            industry="Healthcare",
+            education="Degree",
+            political_lean="centre",
+            personality_sketch="Calm.",
+        )
+
+        bundle_path = tmp_path / "personas.bundle"
+        with BundleWriter(bundle_path) as writer:
+            saved = await synthetic.generate_synthetic_files(
+                identity, None, file_types=["cv"], bundle=writer, persona_id="ada"
+            )
+
+        assert not (tmp_path / "ada").exists()
+        with PersonaBundle(bundle_path) as bundle:
+            assert bundle.text("ada", saved["cv"].name) == "cv for Ada Obi"
+            assert bundle.identity("ada")["occupation"] == "nurse"
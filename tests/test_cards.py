@@ -0,0 +1,152 @@
+"""Tests for centuria.persona.cards module."""
+
+import pytest
+
+import centuria.persona.cards as cards
+import centuria.survey.executor as executor
+from centuria.llm import CompletionResult
+from centuria.llm.tokens import count_tokens
+from centuria.models import Persona
+from centuria.persona.cards import (
+    PROBE_QUESTIONS,
+    build_persona_card,
+    compress_persona,
+    match_option,
+    measure_fidelity,
+    strip_filler,
+)
+
+CONTEXT = (
+    "The individual in question has an undefined name, location, and age range. "
+    "Ayesha Khan is a retired GP living in Dalston. "
+    "Although her years of experience are not provided, she ran a busy practice.\n\n"
+    "She walks or takes the bus everywhere, and votes Labour. "
+    "She volunteers at the food bank, though no information on her income is given. "
+) + "She watches period dramas and gardening shows on the BBC. " * 20
+
+PERSONA = Persona(id="p1", name="Ayesha Khan", context=CONTEXT)
+
+
+def result(content, cost=0.01):
+    return CompletionResult(content=content, prompt_tokens=10, completion_tokens=5, cost=cost)
+
+
+@pytest.fixture
+def answers(monkeypatch):
+    """Survey answers: the first option, unless the context is a card missing "Labour"."""
+    asked = []
+
+    async def complete(prompt, system=None, model=None, api_keys=None, timeout=None):
+        asked.append(system)
+        question = next(q for q in PROBE_QUESTIONS if q.text in prompt)
+        choice = question.options[0]
+        if question.id == "probe_vote" and "Labour" not in system:
+            choice = "Green"
+        return result(f"CHOICE: {choice}.\nJUSTIFICATION: Just me")
+
+    monkeypatch.setattr(executor, "complete", complete)
+    return asked
+
+
+@pytest.fixture
+def rewrites(monkeypatch):
+    """Card rewrites: the first sentence, plus "votes Labour" if the word target allows it."""
+    prompts = []
+
+    async def complete(prompt, model=None):
+        prompts.append(prompt)
+        words = int(prompt.split("at most ")[1].split()[0])
+        card = "Work: retired GP; Dalston."
+        return result(card + (" Views: votes Labour." if words >= 50 else ""), cost=1.0)
+
+    monkeypatch.setattr(cards, "complete", complete)
+    return prompts
+
+
+class TestStripFiller:
+    def test_drops_missing_information_sentences(self):
+        text = strip_filler(CONTEXT)
+        assert "undefined" not in text
+        assert text.startswith("Ayesha Khan is a retired GP living in Dalston.")
+
+    def test_keeps_fact_after_concessive_opening(self):
+        assert "She ran a busy practice." in strip_filler(CONTEXT)
+
+    def test_keeps_fact_before_concessive_tail(self):
+        assert "She volunteers at the food bank." in strip_filler(CONTEXT)
+
+    def test_keeps_paragraphs(self):
+        assert strip_filler(CONTEXT).count("\n\n") == 1
+
+    def test_plain_text_unchanged(self):
+        text = "Ayesha is a retired GP.\n\nShe votes Labour."
+        assert strip_filler(text) == text
+
+    def test_decimals_and_abbreviations_not_split(self):
+        text = "She earns £32.5k, e.g. from locum work.  Her age is unknown. She votes Labour."
+        assert strip_filler(text) == "She earns £32.5k, e.g. from locum work.  She votes Labour."
+
+
+class TestMatchOption:
+    def test_longest_option_wins(self):
+        options = ["Agree", "Strongly agree", "Disagree"]
+        assert match_option("Strongly agree - obviously", options) == "Strongly agree"
+
+    def test_case_and_punctuation(self):
+        assert match_option("bus or train.", ["Car", "Bus or train"]) == "Bus or train"
+
+    def test_no_option_named(self):
+        assert match_option("Hard to say!", ["Yes", "No"]) == "hard to say"
+
+
+class TestBuildPersonaCard:
+    async def test_fits_budget(self, rewrites):
+        card = await build_persona_card(CONTEXT, 20)
+        assert count_tokens(card) <= 20
+        assert "undefined" not in rewrites[0]
+
+    async def test_no_call_when_stripped_context_fits(self, rewrites):
+        context = "Ayesha is a retired GP. Her age is unknown."
+        assert await build_persona_card(context, 100) == "Ayesha is a retired GP."
+        assert rewrites == []
+
+
+class TestFidelity:
+    async def test_agreement(self, answers):
+        report = await measure_fidelity(PERSONA, "Retired GP in Dalston.")
+        assert report.agreement == (len(PROBE_QUESTIONS) - 1) / len(PROBE_QUESTIONS)
+        assert report.disagreements == ["probe_vote"]
+        assert len(answers) == 2 * len(PROBE_QUESTIONS)
+
+    async def test_reuses_full_answers(self, answers):
+        first = await measure_fidelity(PERSONA, "Retired GP; votes Labour.")
+        answers.clear()
+        second = await measure_fidelity(PERSONA, "Retired GP.", full_answers=first.full_answers)
+        assert len(answers) == len(PROBE_QUESTIONS)
+        assert first.agreement == 1.0
+        assert second.agreement < 1.0
+
+
+class TestCompressPersona:
+    async def test_smallest_card_that_keeps_fidelity(self, answers, rewrites):
+        card = await compress_persona(PERSONA, budgets=(150, 40, 80), min_agreement=1.0)
+        assert [c.budget for c in card.candidates] == [40, 80]
+        assert card.budget == 80
+        assert card.agreement == 1.0
+        assert "Labour" in card.card
+        assert card.tokens <= 80 and card.compression < 1
+
+    async def test_cost_includes_rewrites(self, answers, rewrites):
+        card = await compress_persona(PERSONA, budgets=(40, 80), min_agreement=1.0)
+        # Two rewrites, plus the full context and both cards answering every probe
+        assert card.cost == pytest.approx(2 * 1.0 + 3 * len(PROBE_QUESTIONS) * 0.01)
+
+    async def test_full_context_when_no_card_is_good_enough(self, answers, rewrites):
+        card = await compress_persona(PERSONA, budgets=(40,), min_agreement=1.0)
+        assert card.budget is None
+        assert card.card == CONTEXT
+        assert card.candidates[0].agreement < 1.0
+
+    async def test_budgets_above_full_size_skipped(self, answers, rewrites):
+        card = await compress_persona(PERSONA, budgets=(10_000,))
+        assert card.candidates == [] and card.card == CONTEXT
@@ -0,0 +1,168 @@
+"""Tests for centuria.llm.client module."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+from centuria.llm import DeadlineExceeded, StructuredOutputError, client, deadline, track_usage
+
+
+class Pet(BaseModel):
+    name: str
+    age: int
+
+
+class FakeLiteLLM:
+    """Replies with the given contents in turn, recording each call's kwargs."""
+
+    def __init__(self, replies=("ok",), schema=True, json_mode=True, delay=0.0):
+        self.replies = list(replies)
+        self.schema = schema
+        self.json_mode = json_mode
+        self.delay = delay
+        self.calls = []
+
+    async def acompletion(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay)
+        content = self.replies.pop(0)
+        tool_calls = None
+        if isinstance(content, dict):
+            # A tool-call reply: no content, the JSON is in the arguments
+            function = SimpleNamespace(arguments=json.dumps(content))
+            content, tool_calls = None, [SimpleNamespace(function=function)]
+        message = SimpleNamespace(content=content, tool_calls=tool_calls)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message)],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=2),
+        )
+
+    def completion_cost(self, completion_response):
+        return 0.5
+
+    def supports_response_schema(self, model):
+        return self.schema
+
+    def get_supported_openai_params(self, model):
+        return ["response_format"] if self.json_mode else []
+
+
+@pytest.fixture
+def litellm(monkeypatch):
+    def install(**kwargs):
+        fake = FakeLiteLLM(**kwargs)
+        monkeypatch.setattr(client, "_litellm", lambda: fake)
+        return fake
+
+    install()
+    return install
+
+
+class TestTrackUsage:
+    async def test_adds_up_calls_in_tasks(self, litellm):
+        litellm(replies=["a", "b"])
+        with track_usage() as usage:
+            await asyncio.gather(client.complete("a"), client.complete("b"))
+        assert usage.calls == 2
+        assert usage.prompt_tokens == 20
+        assert usage.completion_tokens == 4
+        assert usage.cost == 1.0
+
+    async def test_nested_blocks(self, litellm):
+        litellm(replies=["a", "b", "c"])
+        with track_usage() as outer:
+            await client.complete("a")
+            with track_usage() as inner:
+                await client.complete("b")
+        await client.complete("c")
+        assert inner.calls == 1
+        assert outer.calls == 2
+
+
+class TestDeadline:
+    async def test_reaches_calls_in_gathered_tasks(self, litellm):
+        litellm(replies=["a", "b"], delay=10)
+        started = asyncio.get_running_loop().time()
+        with deadline(0.05):
+            results = await asyncio.gather(
+                client.complete("a"), client.complete("b"), return_exceptions=True
+            )
+        assert all(isinstance(r, DeadlineExceeded) for r in results)
+        assert asyncio.get_running_loop().time() - started < 1
+
+    async def test_timeout_limited_by_time_left(self, litellm):
+        fake = litellm(replies=["a", "b"])
+        with deadline(0.5):
+            await client.complete("a", timeout=30)
+            await client.complete("b", timeout=0.1)
+        assert 0 < fake.calls[0]["timeout"] <= 0.5
+        assert fake.calls[1]["timeout"] == 0.1
+
+    async def test_own_timeout_without_deadline(self, litellm):
+        litellm(replies=["a"], delay=10)
+        with pytest.raises(DeadlineExceeded):
+            await client.complete("a", timeout=0.05)
+
+    async def test_nested_deadline_cannot_extend(self, litellm):
+        fake = litellm(replies=["a"])
+        with deadline(0.2), deadline(60):
+            await client.complete("a")
+        assert fake.calls[0]["timeout"] <= 0.2
+
+    async def test_no_call_after_deadline(self, litellm):
+        fake = litellm(replies=["a"])
+        with deadline(0.01):
+            await asyncio.sleep(0.02)
+            with pytest.raises(DeadlineExceeded):
+                await client.complete("a")
+        assert fake.calls == []
+
+
+class TestStructuredOutput:
+    async def test_json_schema_mode(self, litellm):
+        fake = litellm(replies=['{"name": "Rex", "age": 3}'])
+        result = await client.complete("A pet?", response_model=Pet)
+        assert result.parsed == Pet(name="Rex", age=3)
+        response_format = fake.calls[0]["response_format"]
+        assert response_format["type"] == "json_schema"
+        assert response_format["json_schema"]["schema"] == Pet.model_json_schema()
+        assert fake.calls[0]["messages"][-1]["content"] == "A pet?"
+
+    async def test_json_mode_gets_schema_in_prompt(self, litellm):
+        fake = litellm(replies=['{"name": "Rex", "age": 3}'], schema=False)
+        await client.complete("A pet?", response_model=Pet)
+        assert fake.calls[0]["response_format"] == {"type": "json_object"}
+        assert '"age"' in fake.calls[0]["messages"][-1]["content"]
+
+    async def test_prompt_only_mode(self, litellm):
+        reply = '```json\n{"name": "Rex", "age": 3}\n```'
+        fake = litellm(replies=[reply], schema=False, json_mode=False)
+        result = await client.complete("A pet?", response_model=Pet)
+        assert "response_format" not in fake.calls[0]
+        assert result.parsed.name == "Rex"
+
+    async def test_tool_call_reply(self, litellm):
+        litellm(replies=[{"name": "Rex", "age": 3}])
+        result = await client.complete("A pet?", response_model=Pet)
+        assert result.parsed.age == 3
+
+    async def test_repair_call_on_invalid_reply(self, litellm):
+        fake = litellm(replies=['{"name": "Rex", "age": "three"}', '{"name": "Rex", "age": 3}'])
+        result = await client.complete("A pet?", response_model=Pet)
+        assert result.parsed.age == 3
+        assert len(fake.calls) == 2
+        repair = fake.calls[1]["messages"]
+        assert repair[-2] == {"role": "assistant", "content": '{"name": "Rex", "age": "three"}'}
+        assert "age" in repair[-1]["content"]
+        assert result.prompt_tokens == 20
+        assert result.cost == 1.0
+
+    async def test_gives_up_after_one_repair(self, litellm):
+        fake = litellm(replies=["Sorry.", "Still no."])
+        with pytest.raises(StructuredOutputError) as exc:
+            await client.complete("A pet?", response_model=Pet)
+        assert exc.value.content == "Still no."
+        assert len(fake.calls) == 2
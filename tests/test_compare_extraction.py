@@ -0,0 +1,97 @@
+"""Tests for centuria.data.compare_extraction module."""
+
+import json
+
+import pytest
+
+from centuria.data import compare_extraction, extractors
+from centuria.data.compare_extraction import profile_accuracy, statement_checks, summarize
+from centuria.data.extractors import ExtractedProfile
+from centuria.llm import client
+from centuria.llm.client import CompletionResult
+
+IDENTITY = {
+    "name": "Ada Okafor",
+    "age": 34,
+    "gender": "female",
+    "location": "Dalston, London",
+    "occupation": "nurse",
+    "industry": "Healthcare",
+    "education": "Bachelors degree",
+    "political_lean": "left-leaning",
+    "personality_sketch": "Works nights.",
+}
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Fake complete() that answers each prompt type and reports usage."""
+
+    async def complete(prompt, response_model=None, **kwargs):
+        profile = {"name": "Ada Okafor", "age_range": "30-35", "current_role": "Nurse"}
+        if prompt.startswith("Analyze"):
+            content = json.dumps(profile)
+        elif '"context_statement"' in prompt:
+            content = json.dumps({"profile": profile, "context_statement": "Works as a nurse."})
+        else:
+            content = "Works as a nurse, passionate about night shifts."
+        parsed = response_model.model_validate_json(content) if response_model else None
+        result = CompletionResult(content, len(prompt) // 4, 10, 0.001, parsed=parsed)
+        for totals in client._usage.get():
+            totals.add(result)
+        return result
+
+    monkeypatch.setattr(extractors, "complete", complete)
+
+
+@pytest.fixture
+def personas(tmp_path):
+    for name in ("p1", "p2"):
+        folder = tmp_path / name
+        folder.mkdir()
+        (folder / "identity.json").write_text(json.dumps(IDENTITY))
+        (folder / "cv.txt").write_text("Ada Okafor. Staff nurse at the Homerton.")
+        (folder / "notes.txt").write_text("Night shift again.")
+    (tmp_path / "no_identity").mkdir()
+    return tmp_path
+
+
+class TestMetrics:
+    def test_profile_accuracy(self):
+        profile = ExtractedProfile(name="Ada", age_range="30-35", current_role="Staff Nurse")
+        accuracy = profile_accuracy(profile, IDENTITY)
+        assert accuracy["name"] == 0.5
+        assert accuracy["age"] == 1.0
+        assert accuracy["occupation"] == 1.0
+        assert accuracy["industry"] == 0.0
+
+    def test_statement_checks(self):
+        checks = statement_checks("Works as a nurse. Passionate about data-driven care.", IDENTITY)
+        assert checks["words"] == 8
+        assert checks["banned_phrases"] == 1
+        assert checks["mentions_occupation"] == 1.0
+
+
+class TestCompareExtraction:
+    async def test_compares_both_paths(self, llm, personas):
+        comparisons = await compare_extraction.compare_extraction(personas)
+        assert [c.folder for c in comparisons] == ["p1", "p2"]
+
+        two_call, fused = comparisons[0].paths["two_call"], comparisons[0].paths["fused"]
+        assert two_call.calls == 3
+        assert fused.calls == 1
+        assert fused.prompt_tokens < two_call.prompt_tokens
+        assert fused.accuracy == two_call.accuracy
+        assert two_call.statement["banned_phrases"] == 1
+
+        summary = summarize(comparisons)
+        assert summary["compared"] == 2
+        assert summary["fused"]["calls"] == 1
+        assert summary["two_call"]["accuracy.occupation"] == 1.0
+
+    def test_main_writes_report(self, llm, personas, tmp_path, capsys):
+        report = tmp_path / "ab.json"
+        compare_extraction.main([str(personas), "1", str(report)])
+        assert "Compared 1 of 1 folders" in capsys.readouterr().out
+        data = json.loads(report.read_text())
+        assert [f["folder"] for f in data["folders"]] == ["p1"]
@@ -0,0 +1,121 @@
+"""Tests for centuria.api.datasets module."""
+
+import gzip
+import json
+
+import pytest
+
+from centuria.api.datasets import (
+    Dataset,
+    Entity,
+    InvalidPageError,
+    decode_cursor,
+    directory_version,
+    encode_cursor,
+    json_file_dataset,
+    page_entity,
+    parse_fields,
+)
+
+DATA = {"personas": [{"id": f"p{i}", "context": "x" * 50} for i in range(50)]}
+
+
+class TestEntity:
+    def test_identity_body_round_trips(self):
+        entity = Entity.from_data(DATA)
+        body, encoding, etag = entity.variant("")
+        assert json.loads(body) == DATA
+        assert encoding is None
+        assert etag == entity.etag
+
+    def test_gzip_variant(self):
+        entity = Entity.from_data(DATA)
+        body, encoding, etag = entity.variant("gzip, deflate")
+        assert encoding == "gzip"
+        assert json.loads(gzip.decompress(body)) == DATA
+        assert etag != entity.etag
+
+    def test_small_bodies_not_compressed(self):
+        entity = Entity.from_data({"a": 1})
+        assert entity.variant("gzip, br")[1] is None
+
+    def test_etag_stable_for_same_data(self):
+        assert Entity.from_data(DATA).etag == Entity.from_data(dict(DATA)).etag
+
+    def test_matches_any_variant(self):
+        entity = Entity.from_data(DATA)
+        _, _, gz_etag = entity.variant("gzip")
+        assert entity.matches(entity.etag)
+        assert entity.matches(f'"other", {gz_etag}')
+        assert entity.matches(f"W/{entity.etag}")
+        assert not entity.matches('"other"')
+
+
+class TestDataset:
+    def test_loads_once_until_version_changes(self):
+        loads = []
+        version = [1]
+        dataset = Dataset(lambda: loads.append(1) or {"n": len(loads)}, lambda: version[0])
+
+        assert dataset.entity() is dataset.entity()
+        assert len(loads) == 1
+
+        version[0] = 2
+        assert dataset.data() == {"n": 2}
+
+    def test_projection_entities_memoised_per_key(self):
+        dataset = Dataset(lambda: DATA, lambda: 1)
+        ids = dataset.entity("ids", lambda d: [p["id"] for p in d["personas"]])
+        assert json.loads(ids.body)[:2] == ["p0", "p1"]
+        assert dataset.entity("ids", lambda d: None) is ids
+
+    def test_json_file_dataset(self, tmp_path):
+        path = tmp_path / "data.json"
+        path.write_text(json.dumps({"a": 1}))
+        assert json_file_dataset(path).data() == {"a": 1}
+
+    def test_directory_version_sees_new_files(self, tmp_path):
+        (tmp_path / "a.txt").write_text("a")
+        before = directory_version(tmp_path)
+        (tmp_path / "b.txt").write_text("b")
+        assert directory_version(tmp_path) != before
+
+
+class TestPagination:
+    def test_cursor_round_trip(self):
+        assert decode_cursor(encode_cursor(42)) == 42
+        assert decode_cursor(None) == 0
+
+    def test_bad_cursor(self):
+        with pytest.raises(InvalidPageError):
+            decode_cursor("not-a-cursor")
+
+    def test_parse_fields(self):
+        assert parse_fields("id, name,,id") == ("id", "name")
+        assert parse_fields("") is None
+
+    def test_no_params_serves_full_document(self):
+        dataset = Dataset(lambda: DATA, lambda: 1)
+        assert page_entity(dataset, "personas") is dataset.entity()
+
+    def test_projection(self):
+        dataset = Dataset(lambda: DATA, lambda: 1)
+        body = json.loads(page_entity(dataset, "personas", fields=("id",)).body)
+        assert body["personas"][0] == {"id": "p0"}
+        assert body["next_cursor"] is None
+
+    def test_pages_cover_every_item(self):
+        dataset = Dataset(lambda: DATA, lambda: 1)
+        ids, cursor = [], None
+        while True:
+            body = json.loads(page_entity(dataset, "personas", ("id",), 20, cursor).body)
+            ids += [p["id"] for p in body["personas"]]
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        assert ids == [p["id"] for p in DATA["personas"]]
+
+    def test_unknown_field(self):
+        dataset = Dataset(lambda: DATA, lambda: 1)
+        with pytest.raises(InvalidPageError):
+            page_entity(dataset, "personas", fields=("nope",))
@@ -0,0 +1,66 @@
+"""Tests for centuria.survey.executor module."""
+
+import asyncio
+
+import pytest
+
+import centuria.survey.executor as executor
+from centuria.llm import CompletionResult
+from centuria.models import Persona, Question
+from centuria.survey import stream_question
+
+QUESTION = Question(id="q1", text="Pick one", question_type="single_select", options=["A", "B"])
+
+
+def personas(*names):
+    return [Persona(id=name.lower(), name=name, context="ctx") for name in names]
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Fake calls: "Bad" fails at once, everyone else answers A after a delay."""
+    started = []
+
+    async def complete(prompt, system=None, model=None, api_keys=None, timeout=None):
+        started.append(system)
+        if "You are Bad." in system:
+            raise RuntimeError("Rate limit exceeded")
+        await asyncio.sleep(0.01)
+        return CompletionResult(
+            content="CHOICE: A\nJUSTIFICATION: Why not",
+            prompt_tokens=1,
+            completion_tokens=1,
+            cost=0.5,
+        )
+
+    monkeypatch.setattr(executor, "complete", complete)
+    return started
+
+
+class TestStreamQuestion:
+    async def test_yields_every_answer(self, calls):
+        answers = [
+            (p.id, r.response) async for p, r in stream_question(personas("Ann", "Bob"), QUESTION)
+        ]
+        assert sorted(answers) == [("ann", "A"), ("bob", "A")]
+
+    async def test_failure_raises_by_default(self, calls):
+        with pytest.raises(RuntimeError):
+            async for _ in stream_question(personas("Ann", "Bad"), QUESTION):
+                pass
+
+    async def test_failure_returned_when_asked(self, calls):
+        results = {
+            p.id: r
+            async for p, r in stream_question(
+                personas("Ann", "Bad", "Cat"), QUESTION, return_exceptions=True
+            )
+        }
+        assert isinstance(results["bad"], RuntimeError)
+        assert results["ann"].response == results["cat"].response == "A"
+
+    async def test_concurrency_limit(self, calls):
+        stream = stream_question(personas("Ann", "Bob", "Cat"), QUESTION, concurrency=1)
+        await anext(stream)
+        assert len(calls) <= 2
+        await stream.aclose()
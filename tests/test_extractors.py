@@ -0,0 +1,332 @@
+"""Tests for centuria.data.extractors module."""
+
+import asyncio
+import json
+
+import pytest
+
+from centuria.data import extractors
+from centuria.data.extractors import (
+    ExtractedProfile,
+    ExtractionCache,
+    merge_profiles,
+    process_personal_folder,
+    process_personal_folders,
+)
+from centuria.llm.client import CompletionResult, StructuredOutputError
+from centuria.store import PopulationStore
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Fake complete() that records prompts."""
+    prompts = []
+
+    async def complete(prompt, response_model=None, **kwargs):
+        prompts.append(prompt)
+        if prompt.startswith("Analyze"):
+            content = json.dumps({"name": "Ada", "current_role": "Nurse"})
+        elif '"context_statement"' in prompt:
+            content = json.dumps(
+                {
+                    "profile": {"name": "Ada", "current_role": "Nurse"},
+                    "context_statement": f"Works as a nurse. ({len(prompts)})",
+                }
+            )
+        else:
+            content = f"Works as a nurse. ({len(prompts)})"
+        parsed = response_model.model_validate_json(content) if response_model else None
+        return CompletionResult(content, 1, 1, 0.0, parsed=parsed)
+
+    monkeypatch.setattr(extractors, "complete", complete)
+    return prompts
+
+
+@pytest.fixture
+def folder(tmp_path):
+    folder = tmp_path / "ada"
+    folder.mkdir()
+    (folder / "cv.txt").write_text("Ada. Nurse at the Homerton.")
+    (folder / "notes.md").write_text("Likes swimming.")
+    return folder
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ExtractionCache(tmp_path / "cache")
+    yield cache
+    cache.close()
+
+
+class TestExtractionCache:
+    async def test_unchanged_folder_makes_no_calls(self, llm, folder, cache):
+        profile, context = await process_personal_folder(str(folder), cache=cache)
+        # One extraction per file, one context statement
+        assert len(llm) == 3
+
+        again = await process_personal_folder(str(folder), cache=cache)
+        assert again == (profile, context)
+        assert len(llm) == 3
+        assert cache.stats() == {
+            "profile_hits": 2,
+            "profile_misses": 2,
+            "context_hits": 1,
+            "context_misses": 1,
+            "fused_hits": 0,
+            "fused_misses": 0,
+            "entries": 3,
+        }
+
+    async def test_key_ignores_file_order(self, llm, folder, cache):
+        files = sorted(str(p) for p in folder.iterdir())
+        await extractors.extract_profile_from_files(files, cache=cache)
+        first = await extractors.extract_profile_from_files(files, cache=cache)
+        second = await extractors.extract_profile_from_files(files[::-1], cache=cache)
+        assert first == second
+        assert len(llm) == 2
+
+    async def test_changed_file_is_reextracted_alone(self, llm, folder, cache):
+        await process_personal_folder(str(folder), cache=cache)
+        (folder / "notes.md").write_text("Likes cycling.")
+        llm.clear()
+        await process_personal_folder(str(folder), cache=cache)
+        assert len(llm) == 2
+        assert "Likes cycling." in llm[0]
+        assert "Homerton" not in llm[0]
+
+    async def test_added_file_costs_one_extraction(self, llm, folder, cache):
+        await process_personal_folder(str(folder), cache=cache)
+        (folder / "diary.txt").write_text("Went to the lido.")
+        llm.clear()
+        profile, _ = await process_personal_folder(str(folder), cache=cache)
+        assert len(llm) == 2
+        assert profile.raw_context.index("diary.txt") < profile.raw_context.index("notes.md")
+
+    async def test_same_profile_reuses_context(self, llm, folder, cache):
+        profile, context = await process_personal_folder(str(folder), cache=cache)
+        assert await extractors.build_context_statement(profile, cache=cache) == context
+        assert len(llm) == 3
+
+    async def test_prompt_change_invalidates(self, llm, folder, cache, monkeypatch):
+        await process_personal_folder(str(folder), cache=cache)
+        monkeypatch.setattr(
+            extractors, "PROFILE_EXTRACTION_PROMPT", extractors.PROFILE_EXTRACTION_PROMPT + " "
+        )
+        await process_personal_folder(str(folder), cache=cache)
+        # The files are re-extracted, but the profile comes out the same, so
+        # its context is reused
+        assert len(llm) == 5
+
+    async def test_invalidate(self, llm, folder, cache):
+        await process_personal_folder(str(folder), cache=cache)
+        files = list(folder.iterdir())
+        assert cache.invalidate(files)
+        assert not cache.invalidate(files)
+        assert cache.stats()["entries"] == 0
+
+        await process_personal_folder(str(folder), cache=cache)
+        assert len(llm) == 6
+
+    async def test_clear(self, llm, folder, cache):
+        await process_personal_folder(str(folder), cache=cache)
+        cache.clear()
+        await process_personal_folder(str(folder), cache=cache)
+        assert len(llm) == 6
+
+    async def test_disabled(self, llm, folder, tmp_path):
+        cache = ExtractionCache(tmp_path / "cache", enabled=False)
+        await process_personal_folder(str(folder), cache=cache)
+        await process_personal_folder(str(folder), cache=cache)
+        assert len(llm) == 6
+        assert cache.stats()["entries"] == 0
+        assert not (tmp_path / "cache").exists()
+
+    def test_default_cache_follows_environment(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(extractors, "_default_cache", None)
+        monkeypatch.setenv("ENABLE_CACHE", "false")
+        monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+        cache = extractors.get_extraction_cache()
+        assert not cache.enabled
+        assert cache.directory == tmp_path / "extraction"
+        assert extractors.get_extraction_cache() is cache
+
+
+class TestChunkedExtraction:
+    async def test_large_file_is_split_and_merged(self, llm, tmp_path, cache, monkeypatch):
+        monkeypatch.setattr(extractors, "EXTRACTION_CHUNK_TOKENS", 50)
+        folder = tmp_path / "bob"
+        folder.mkdir()
+        history = "".join(f"Message {i}: see you at the lido.\n\n" for i in range(40))
+        (folder / "messages.txt").write_text(history)
+
+        profile = await extractors.extract_profile_from_file(folder / "messages.txt", cache=cache)
+        assert len(llm) > 2
+        assert all("(part " in prompt for prompt in llm)
+        assert profile.name == "Ada"
+        # The merged profile keeps the whole file, not the chunk headers
+        assert profile.raw_context == f"=== messages.txt ===\n{history}"
+
+    async def test_small_file_is_one_call(self, llm, folder, cache):
+        await extractors.extract_profile_from_file(folder / "cv.txt", cache=cache)
+        assert len(llm) == 1
+        assert "=== cv.txt ===" in llm[0]
+
+    def test_profile_schema_leaves_out_raw_context(self):
+        # The LLM fills the profile fields; raw_context is set from the input
+        assert "raw_context" not in ExtractedProfile.model_json_schema()["properties"]
+
+    async def test_context_prompt_fits_token_budget(self, llm, cache, monkeypatch):
+        monkeypatch.setattr(extractors, "CONTEXT_PROMPT_TOKENS", 1500)
+        body = "Went swimming at the lido again today. " * 200
+        profile = ExtractedProfile(
+            raw_context=f"=== cv.txt ===\n{body}\n\n=== grocery_list.txt ===\n{body}"
+        )
+
+        await extractors.build_context_statement(profile, cache=cache)
+        assert extractors.count_tokens(llm[0]) <= 1500
+        # The CV outranks a grocery list, so keeps more of its text
+        cv, groceries = llm[0].split("=== grocery_list.txt ===")
+        assert cv.count("lido") > groceries.count("lido")
+
+
+class TestFusedExtraction:
+    async def test_one_call_per_folder(self, llm, folder, cache):
+        profile, context = await process_personal_folder(str(folder), cache=cache, fused=True)
+        assert len(llm) == 1
+        assert profile.current_role == "Nurse"
+        assert context == "Works as a nurse. (1)"
+        assert "=== cv.txt ===" in profile.raw_context
+        assert "=== notes.md ===" in profile.raw_context
+
+        again = await process_personal_folder(str(folder), cache=cache, fused=True)
+        assert again == (profile, context)
+        assert len(llm) == 1
+        assert cache.stats()["fused_hits"] == 1
+
+    async def test_enabled_by_environment(self, llm, folder, cache, monkeypatch):
+        monkeypatch.setenv("FUSED_EXTRACTION", "true")
+        await process_personal_folder(str(folder), cache=cache)
+        assert len(llm) == 1
+
+    async def test_unparseable_reply_falls_back(self, llm, folder, cache, monkeypatch):
+        two_call = extractors.complete
+
+        async def complete(prompt, **kwargs):
+            if '"context_statement"' in prompt:
+                llm.append(prompt)
+                raise StructuredOutputError("Not JSON", content="Sorry, no.")
+            return await two_call(prompt, **kwargs)
+
+        monkeypatch.setattr(extractors, "complete", complete)
+        profile, context = await process_personal_folder(str(folder), cache=cache, fused=True)
+        assert len(llm) == 4
+        assert profile.current_role == "Nurse"
+        assert cache.stats()["entries"] == 3
+
+    async def test_large_folder_uses_two_calls(self, llm, folder, cache, monkeypatch):
+        monkeypatch.setattr(extractors, "EXTRACTION_CHUNK_TOKENS", 20)
+        await process_personal_folder(str(folder), cache=cache, fused=True)
+        assert not any('"context_statement"' in prompt for prompt in llm)
+
+    async def test_invalidate(self, llm, folder, cache):
+        await process_personal_folder(str(folder), cache=cache, fused=True)
+        assert cache.invalidate(list(folder.iterdir()))
+        await process_personal_folder(str(folder), cache=cache, fused=True)
+        assert len(llm) == 2
+
+
+@pytest.fixture
+def cohort(tmp_path):
+    root = tmp_path / "cohort"
+    for name, text in [("p1", "Ada. Nurse."), ("p2", "Bob. Plumber."), ("p3", "Cy. Teacher.")]:
+        (root / name).mkdir(parents=True)
+        (root / name / "cv.txt").write_text(text)
+    (root / "empty").mkdir()
+    (root / ".git").mkdir()
+    return root
+
+
+class TestProcessPersonalFolders:
+    async def test_writes_results_to_store(self, llm, cohort, cache, tmp_path):
+        progress = []
+        with PopulationStore(tmp_path / "cohort.sqlite3") as store:
+            results = await process_personal_folders(
+                cohort,
+                store=store,
+                cache=cache,
+                progress_callback=lambda done, total, result: progress.append((done, total)),
+            )
+            assert [r.folder.name for r in results] == ["empty", "p1", "p2", "p3"]
+            assert sorted(store.persona_ids()) == ["p1", "p2", "p3"]
+            assert store.get_persona("p1")["occupation"] == "Nurse"
+            assert store.get_context("p2").startswith("Works as a nurse.")
+        assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+    async def test_failures_are_reported_per_folder(self, llm, cohort, cache):
+        results = await process_personal_folders(cohort, cache=cache)
+        failed = [r for r in results if not r.ok]
+        assert [r.folder.name for r in failed] == ["empty"]
+        assert "No valid files" in failed[0].error
+        assert all(r.context for r in results if r.ok)
+
+    async def test_bounded_concurrency(self, cohort, monkeypatch):
+        running, peak = 0, 0
+
+        async def process_personal_folder(folder_path, cache=None, fused=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return ExtractedProfile(), "context"
+
+        monkeypatch.setattr(extractors, "process_personal_folder", process_personal_folder)
+        results = await process_personal_folders(cohort, concurrency=2)
+        assert len(results) == 4
+        assert peak == 2
+
+
+class TestMergeProfiles:
+    def test_unions_lists_without_duplicates(self):
+        merged = merge_profiles(
+            [
+                ExtractedProfile(key_skills=["Triage", "Phlebotomy"]),
+                ExtractedProfile(key_skills=["triage ", "Rota planning"], media_diet=["Radio 4"]),
+            ]
+        )
+        assert merged.key_skills == ["Triage", "Phlebotomy", "Rota planning"]
+        assert merged.media_diet == ["Radio 4"]
+
+    def test_scalars_take_most_common_value(self):
+        merged = merge_profiles(
+            [
+                ExtractedProfile(location="Hackney", current_role="Nurse"),
+                ExtractedProfile(location="London", current_role=None),
+                ExtractedProfile(location="london", years_experience=12),
+            ]
+        )
+        assert merged.location == "London"
+        assert merged.current_role == "Nurse"
+        assert merged.years_experience == 12
+
+    def test_ties_go_to_earliest(self):
+        merged = merge_profiles(
+            [
+                ExtractedProfile(political_lean="left"),
+                ExtractedProfile(political_lean="center"),
+            ]
+        )
+        assert merged.political_lean == "left"
+
+    def test_joins_raw_context(self):
+        merged = merge_profiles(
+            [
+                ExtractedProfile(raw_context="=== a.txt ===\nA"),
+                ExtractedProfile(),
+                ExtractedProfile(raw_context="=== b.txt ===\nB"),
+            ]
+        )
+        assert merged.raw_context == "=== a.txt ===\nA\n\n=== b.txt ===\nB"
+
+    def test_empty(self):
+        assert merge_profiles([]) == ExtractedProfile()
@@ -0,0 +1,48 @@
+"""Tests for import-time cost of the centuria package."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Heavy dependencies that must only load on first use
+HEAVY_MODULES = ["litellm", "google.genai", "PIL", "pypdf"]
+
+# Wall-clock budget (seconds) for importing each module in a fresh interpreter
+IMPORT_TIME_BUDGET = {
+    "centuria": 0.5,
+    "centuria.data": 1.0,
+    "centuria.persona": 1.0,
+    "centuria.survey": 1.0,
+    "centuria.api.server": 2.0,
+}
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def _import_in_subprocess(module: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", sorted(IMPORT_TIME_BUDGET))
+class TestImportTime:
+    def test_heavy_modules_not_loaded(self, module):
+        loaded = set(_import_in_subprocess(module)["modules"])
+        assert [m for m in HEAVY_MODULES if m in loaded] == []
+
+    def test_within_budget(self, module):
+        elapsed = _import_in_subprocess(module)["elapsed"]
+        assert elapsed < IMPORT_TIME_BUDGET[module]
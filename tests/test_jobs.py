@@ -0,0 +1,278 @@
+"""Tests for centuria.api.jobs module."""
+
+import asyncio
+
+import pytest
+
+import centuria.llm.client as client
+import centuria.survey.executor as executor
+from centuria.api.admission import AdmissionController
+from centuria.api.jobs import (
+    CANCELLED,
+    COMPLETED,
+    FAILED,
+    MISSING_KEYS_ERROR,
+    QUEUED,
+    RUNNING,
+    JobManager,
+    JobStore,
+)
+from centuria.llm import CompletionResult
+
+REQUEST = {
+    "question": {"question_id": "q1", "question_text": "Pick one", "options": ["A", "B"]},
+    "personas": [{"id": f"p{i}", "name": f"Person {i}", "context": "ctx"} for i in range(5)],
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def other_store(store):
+    """A second connection to the job file, as another worker process has."""
+    other = JobStore(store.path)
+    yield other
+    other.close()
+
+
+@pytest.fixture
+def fake_complete(monkeypatch):
+    calls = []
+
+    async def complete(prompt, system=None, model=None, api_keys=None, timeout=None):
+        calls.append(system)
+        await asyncio.sleep(0.01)
+        return CompletionResult(
+            content="CHOICE: A\nJUSTIFICATION: Why not", prompt_tokens=1, completion_tokens=1,
+            cost=0.5,
+        )
+
+    monkeypatch.setattr(executor, "complete", complete)
+    return calls
+
+
+def _keys(session_id):
+    return {"openai": "sk-test"} if session_id else {}
+
+
+async def _wait_for(store, job_id, status):
+    for _ in range(200):
+        if store.get(job_id).status == status:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job never reached {status}")
+
+
+class TestJobStore:
+    def test_create_and_get(self, store):
+        job = store.create(REQUEST, session_id="s1")
+        assert job.status == QUEUED
+        assert job.total == 5
+        assert store.get(job.id).request == REQUEST
+
+    def test_missing_job(self, store):
+        assert store.get("nope") is None
+
+    def test_add_result_accumulates_cost(self, store):
+        job = store.create(REQUEST, session_id="s1")
+        store.add_result(job.id, {"persona_id": "p0", "cost": 0.25})
+        store.add_result(job.id, {"persona_id": "p1", "cost": 0.5})
+        job = store.get(job.id)
+        assert job.completed == 2
+        assert job.total_cost == pytest.approx(0.75)
+        assert [r["persona_id"] for r in store.results(job.id)] == ["p0", "p1"]
+
+    def test_persists_across_reopen(self, store):
+        job = store.create(REQUEST, session_id="s1")
+        reopened = JobStore(store.path)
+        assert reopened.claimable() == [job.id]
+        reopened.close()
+
+    def test_claim_is_exclusive(self, store, other_store):
+        job = store.create(REQUEST, session_id="s1")
+        assert store.claim(job.id, "a")
+        assert not other_store.claim(job.id, "b")
+        assert store.get(job.id).status == RUNNING
+        assert other_store.claimable() == []
+
+    def test_stale_claim_can_be_taken_over(self, store, other_store):
+        job = store.create(REQUEST, session_id="s1")
+        store.claim(job.id, "a")
+        assert other_store.claimable(lease=0) == [job.id]
+        assert other_store.claim(job.id, "b", lease=0)
+        assert not store.heartbeat(job.id, "a")
+
+    def test_cancel_is_final(self, store):
+        job = store.create(REQUEST, session_id="s1")
+        store.claim(job.id, "a")
+        assert store.cancel(job.id)
+        assert not store.add_result(job.id, {"persona_id": "p0", "cost": 0.5}, owner="a")
+        assert not store.finish(job.id, "a", COMPLETED)
+        job = store.get(job.id)
+        assert job.status == CANCELLED
+        assert job.completed == 0
+
+
+class TestJobManager:
+    async def test_runs_job_to_completion(self, store, fake_complete):
+        manager = JobManager(store, get_api_keys=_keys)
+        await manager.start()
+        job = manager.submit(REQUEST, session_id="s1")
+        await _wait_for(store, job.id, COMPLETED)
+        await manager.stop()
+
+        job = store.get(job.id)
+        assert job.completed == 5
+        assert job.total_cost == pytest.approx(2.5)
+
+    async def test_failed_persona_recorded_and_job_goes_on(self, store, monkeypatch):
+        async def complete(prompt, system=None, model=None, api_keys=None, timeout=None):
+            if "Person 2" in system:
+                raise RuntimeError("Rate limit exceeded")
+            return CompletionResult(
+                content="CHOICE: A\nJUSTIFICATION: Why not",
+                prompt_tokens=1,
+                completion_tokens=1,
+                cost=0.5,
+            )
+
+        monkeypatch.setattr(executor, "complete", complete)
+        manager = JobManager(store, get_api_keys=_keys)
+        await manager.start()
+        job = manager.submit(REQUEST, session_id="s1")
+        await _wait_for(store, job.id, COMPLETED)
+        await manager.stop()
+
+        job = store.get(job.id)
+        assert job.completed == 5
+        assert job.total_cost == pytest.approx(2.0)
+        failures = [r for r in store.results(job.id) if "error" in r]
+        assert failures == [
+            {
+                "persona_id": "p2",
+                "persona_name": "Person 2",
+                "error": "Rate limit exceeded",
+                "cost": 0.0,
+            }
+        ]
+
+    async def test_fails_without_keys(self, store, fake_complete):
+        manager = JobManager(store, get_api_keys=_keys)
+        await manager.start()
+        job = manager.submit(REQUEST, session_id=None)
+        await _wait_for(store, job.id, FAILED)
+        await manager.stop()
+        assert store.get(job.id).error == MISSING_KEYS_ERROR
+        assert fake_complete == []
+
+    async def test_runs_once_across_workers(self, store, other_store, fake_complete):
+        managers = [
+            JobManager(store, get_api_keys=_keys, poll_interval=0.01),
+            JobManager(other_store, get_api_keys=_keys, poll_interval=0.01),
+        ]
+        job = managers[0].submit(REQUEST, session_id="s1")
+        # The second worker sees the job in the shared file as well
+        for manager in managers:
+            await manager.start()
+        await _wait_for(store, job.id, COMPLETED)
+        await asyncio.sleep(0.05)
+        for manager in managers:
+            await manager.stop()
+
+        assert store.get(job.id).completed == 5
+        assert len(fake_complete) == 5
+
+    async def test_cancel_from_another_worker(self, store, other_store, fake_complete):
+        runner = JobManager(store, get_api_keys=_keys, concurrency=1, poll_interval=0.01)
+        other = JobManager(other_store, get_api_keys=_keys, workers=0)
+        await runner.start()
+        job = runner.submit(REQUEST, session_id="s1")
+        await _wait_for(store, job.id, RUNNING)
+        await asyncio.sleep(0.015)
+        assert other.cancel(job.id).status == CANCELLED
+        await asyncio.sleep(0.1)
+        await runner.stop()
+
+        job = store.get(job.id)
+        assert job.status == CANCELLED
+        assert job.completed < 5
+        assert len(fake_complete) < 5
+
+    async def test_takes_over_job_of_crashed_worker(self, store, fake_complete):
+        job = store.create(REQUEST, session_id="s1")
+        store.claim(job.id, "crashed-worker")
+
+        manager = JobManager(store, get_api_keys=_keys, poll_interval=0.01, lease=0.02)
+        await manager.start()
+        await _wait_for(store, job.id, COMPLETED)
+        await manager.stop()
+        assert store.get(job.id).completed == 5
+
+    async def test_cancel_queued_job(self, store, fake_complete):
+        manager = JobManager(store, get_api_keys=_keys)
+        job = manager.submit(REQUEST, session_id="s1")
+        assert manager.cancel(job.id).status == CANCELLED
+        await manager.start()
+        await asyncio.sleep(0.05)
+        await manager.stop()
+        assert store.get(job.id).completed == 0
+
+    async def test_resume_skips_answered_personas(self, store, fake_complete):
+        job = store.create(REQUEST, session_id="s1")
+        store.add_result(job.id, {"persona_id": "p0", "cost": 0.5})
+
+        manager = JobManager(store, get_api_keys=_keys)
+        await manager.start()
+        await _wait_for(store, job.id, COMPLETED)
+        await manager.stop()
+
+        ids = [r["persona_id"] for r in store.results(job.id)]
+        assert sorted(ids) == ["p0", "p1", "p2", "p3", "p4"]
+
+    async def test_calls_hold_admission_slots(self, store, monkeypatch):
+        admission = AdmissionController(max_concurrent=2)
+        seen = []
+
+        async def complete(prompt, system=None, model=None, api_keys=None, timeout=None):
+            # Wait for a slot through the installed gate, as the real complete() does
+            async with client._call_gate.get()():
+                seen.append(admission.stats())
+                await asyncio.sleep(0.01)
+            return CompletionResult(
+                content="CHOICE: A\nJUSTIFICATION: Why not",
+                prompt_tokens=1,
+                completion_tokens=1,
+                cost=0.5,
+            )
+
+        monkeypatch.setattr(executor, "complete", complete)
+        manager = JobManager(store, get_api_keys=_keys, admission=admission)
+        await manager.start()
+        job = manager.submit(REQUEST, session_id="s1")
+        await _wait_for(store, job.id, COMPLETED)
+        await manager.stop()
+
+        assert len(seen) == 5
+        assert all(1 <= stats["running"] <= 2 for stats in seen)
+        assert all(stats["pending"] == 5 for stats in seen)
+        assert admission.stats()["pending"] == 0
+
+    async def test_waits_for_session_capacity(self, store, fake_complete):
+        admission = AdmissionController(max_session_pending=5)
+        held = admission.admit("s1", 5)
+        manager = JobManager(store, get_api_keys=_keys, poll_interval=0.01, admission=admission)
+        await manager.start()
+        job = manager.submit(REQUEST, session_id="s1")
+        await asyncio.sleep(0.05)
+        assert store.get(job.id).status == RUNNING
+        assert fake_complete == []
+
+        held.release()
+        await _wait_for(store, job.id, COMPLETED)
+        await manager.stop()
+        assert len(fake_complete) == 5
@@ -0,0 +1,88 @@
+"""Tests for centuria.data.loaders module."""
+
+import pytest
+
+from centuria.data import loaders
+from centuria.data.loaders import TextCache, aload_files, aload_text, load_text
+
+
+def write_pdf(path, texts):
+    """A PDF with one line of text per page."""
+    from pypdf import PdfWriter
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+    writer = PdfWriter()
+    font = writer._add_object(
+        DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/Helvetica"),
+            }
+        )
+    )
+    for text in texts:
+        page = writer.add_blank_page(200, 200)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+        )
+        stream = DecodedStreamObject()
+        stream.set_data(f"BT /F1 12 Tf 10 100 Td ({text}) Tj ET".encode())
+        page[NameObject("/Contents")] = writer._add_object(stream)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = TextCache(tmp_path / "cache")
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def pages():
+    return [f"Page {i}" for i in range(7)]
+
+
+class TestLoadText:
+    def test_text_file(self, tmp_path):
+        (tmp_path / "notes.md").write_text("Likes swimming.")
+        assert load_text(str(tmp_path / "notes.md")) == "Likes swimming."
+
+    def test_pdf_split_into_page_ranges(self, tmp_path, cache, pages, monkeypatch):
+        monkeypatch.setattr(loaders, "PDF_PAGES_PER_TASK", 3)
+        pdf = write_pdf(tmp_path / "cv.pdf", pages)
+        assert load_text(str(pdf), cache=cache) == "\n".join(pages)
+
+    def test_pdf_text_is_cached(self, tmp_path, cache, pages, monkeypatch):
+        pdf = write_pdf(tmp_path / "cv.pdf", pages)
+        text = load_text(str(pdf), cache=cache)
+
+        def fail(*args):
+            raise AssertionError("PDF parsed again")
+
+        monkeypatch.setattr(loaders, "_extract_pages", fail)
+        assert load_text(str(pdf), cache=cache) == text
+
+    def test_changed_pdf_is_extracted_again(self, tmp_path, cache, pages):
+        pdf = write_pdf(tmp_path / "cv.pdf", pages)
+        load_text(str(pdf), cache=cache)
+        write_pdf(pdf, ["Rewritten"])
+        assert load_text(str(pdf), cache=cache) == "Rewritten"
+
+
+class TestAsyncLoad:
+    async def test_aload_pdf_in_page_ranges(self, tmp_path, cache, pages, monkeypatch):
+        monkeypatch.setattr(loaders, "PDF_PAGES_PER_TASK", 2)
+        pdf = write_pdf(tmp_path / "cv.pdf", pages)
+        assert await aload_text(str(pdf), cache=cache) == "\n".join(pages)
+        assert cache.get(cache.key(pdf)) == "\n".join(pages)
+
+    async def test_aload_files_keeps_order(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(loaders, "_default_cache", TextCache(tmp_path / "cache"))
+        write_pdf(tmp_path / "cv.pdf", ["Nurse"])
+        (tmp_path / "notes.md").write_text("Likes swimming.")
+        paths = [str(tmp_path / "notes.md"), str(tmp_path / "cv.pdf")]
+        assert await aload_files(paths) == "Likes swimming.\n\nNurse"
@@ -0,0 +1,107 @@
+"""Tests for centuria.persona.occupations module."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from centuria.config import OCCUPATION_CATEGORIES
+from centuria.persona.occupations import (
+    LABELLED_OCCUPATIONS,
+    OCCUPATION_ALIASES,
+    OccupationClassifier,
+    default_classifier,
+    normalize_occupation,
+)
+
+SAMPLE_PERSONAS = (
+    Path(__file__).parent.parent / "web" / "static" / "sample-data" / "01-random-personas.json"
+)
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return default_classifier()
+
+
+class TestNormalizeOccupation:
+    def test_lowercases_and_strips_punctuation(self):
+        assert normalize_occupation("  Senior, Software-Engineer (Remote) ") == (
+            "senior software-engineer remote"
+        )
+
+    def test_empty(self):
+        assert normalize_occupation("...") == ""
+
+
+class TestOccupationClassifier:
+    def test_labels_are_known_categories(self):
+        assert set(OCCUPATION_ALIASES) <= set(OCCUPATION_CATEGORIES)
+        assert {c for _, c in LABELLED_OCCUPATIONS} <= set(OCCUPATION_CATEGORIES)
+
+    def test_exact_example(self, classifier):
+        match = classifier.classify("registered nurse")
+        assert (match.category, match.confidence, match.source) == ("Nurse/Nursing", 1.0, "exact")
+
+    def test_category_name_is_exact(self, classifier):
+        assert classifier.classify("Student").source == "exact"
+
+    @pytest.mark.parametrize(
+        "occupation, category",
+        [
+            ("Senior Software Engineer", "Software/Engineering"),
+            ("ICU Nurse", "Nurse/Nursing"),
+            ("Restaurant Manager", "Food Service/Hospitality"),
+            ("Pharmacy Technician", "Allied Health"),
+            ("Gas Engineer", "Electrical/Plumbing"),
+        ],
+    )
+    def test_keyword(self, classifier, occupation, category):
+        match = classifier.classify(occupation)
+        assert match.category == category
+        assert match.source == "keyword"
+        assert match.confidence >= 0.9
+
+    def test_life_stage_overrides_job(self, classifier):
+        assert classifier.classify("Retired Police Officer").category == "Retired"
+        assert classifier.classify("part-time university student").category == "Student"
+
+    def test_conflicting_keywords_are_low_confidence(self, classifier):
+        match = classifier.classify("Film Accountant")
+        assert match.category in {"Media/Entertainment", "Accounting"}
+        assert match.confidence < 0.6
+
+    def test_ngram_catches_misspelling(self, classifier):
+        match = classifier.classify("Barrista")
+        assert (match.category, match.source) == ("Food Service/Hospitality", "ngram")
+        assert match.confidence > 0.6
+
+    def test_unknown_is_low_confidence(self, classifier):
+        assert classifier.classify("Astronaut").confidence < 0.3
+        assert classifier.classify("").category == "Other"
+
+    def test_learn(self):
+        classifier = OccupationClassifier(aliases={}, max_learned=2)
+        classifier.learn("Astronaut", "Other")
+        classifier.learn("Zookeeper", "Agriculture/Farming")
+        assert classifier.classify("zookeeper").source == "exact"
+
+        classifier.learn("Glassblower", "Visual Arts/Design")
+        # The oldest learned entry is forgotten
+        assert classifier.classify("Astronaut").source != "exact"
+        assert classifier.classify("Glassblower").category == "Visual Arts/Design"
+
+    def test_fit_replaces_examples(self):
+        classifier = OccupationClassifier([("Zookeeper", "Agriculture/Farming")], aliases={})
+        assert classifier.classify("Zookeeper").source == "exact"
+        classifier.fit([])
+        assert classifier.classify("Zookeeper").source != "exact"
+
+    def test_agrees_with_sample_data(self):
+        # The LLM-labelled sample personas, classified without their examples
+        personas = json.loads(SAMPLE_PERSONAS.read_text())["personas"]
+        classifier = OccupationClassifier()
+        for persona in personas:
+            assert classifier.classify(persona["occupation"]).category == (
+                persona["occupation_category"]
+            )
@@ -0,0 +1,53 @@
+"""Tests for centuria.data.populations module."""
+
+import json
+import os
+
+import pytest
+
+from centuria.data.populations import (
+    PersonaStore,
+    UnknownPersonaError,
+    UnknownPopulationError,
+)
+
+RECORDS = [
+    {"id": "p1", "name": "Alice", "age": 30, "context": "Works nights."},
+    {"id": "p2", "name": "Bob", "age": 60, "context": "Retired."},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / "personas.json"
+    path.write_text(json.dumps(RECORDS))
+    return PersonaStore({"test": path})
+
+
+class TestPersonaStore:
+    def test_all_personas(self, store):
+        assert [p.id for p in store.get_personas("test")] == ["p1", "p2"]
+
+    def test_selected_personas_keep_request_order(self, store):
+        personas = store.get_personas("test", ["p2", "p1"])
+        assert [p.name for p in personas] == ["Bob", "Alice"]
+        assert personas[0].context == "Retired."
+
+    def test_unknown_population(self, store):
+        with pytest.raises(UnknownPopulationError):
+            store.get_personas("missing")
+
+    def test_unknown_persona(self, store):
+        with pytest.raises(UnknownPersonaError):
+            store.get_personas("test", ["p1", "p9"])
+
+    def test_reloads_when_file_changes(self, store):
+        assert len(store.records("test")) == 2
+        path = store.sources["test"]
+        path.write_text(json.dumps(RECORDS[:1]))
+        stat = path.stat()
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+        assert len(store.records("test")) == 1
+
+    def test_query_ids_uses_records_without_demographics(self, store):
+        assert store.query_ids("test", {"age": {"min": 50}}) == ["p2"]
@@ -0,0 +1,109 @@
+"""Tests for centuria.data.query module."""
+
+import pytest
+
+from centuria.data.query import PersonaIndex, query_personas
+from centuria.store import InvalidFilterError
+
+RECORDS = [
+    {"id": "p1", "age": 25, "tenure": "private_rented", "ward": "Dalston"},
+    {"id": "p2", "age": 40, "tenure": "owner", "ward": "Dalston"},
+    {"id": "p3", "age": 67, "tenure": "social_rented", "ward": "Hackney Central"},
+    {"id": "p4", "age": 33, "tenure": "private_rented", "ward": "Hackney Central"},
+    {"id": "p5", "age": 52, "tenure": "owner", "ward": "Dalston", "tags": ["a"]},
+]
+
+
+@pytest.fixture
+def index():
+    return PersonaIndex(RECORDS)
+
+
+def ids(records):
+    return [r["id"] for r in records]
+
+
+class TestPersonaIndex:
+    def test_no_filters_matches_everyone(self, index):
+        assert ids(index.query()) == ["p1", "p2", "p3", "p4", "p5"]
+
+    def test_exact_value(self, index):
+        assert ids(index.query({"tenure": "owner"})) == ["p2", "p5"]
+
+    def test_any_of(self, index):
+        assert ids(index.query({"tenure": ["owner", "social_rented"]})) == ["p2", "p3", "p5"]
+
+    def test_range(self, index):
+        assert ids(index.query({"age": {"min": 30, "max": 52}})) == ["p2", "p4", "p5"]
+        assert ids(index.query({"age": {"min": 60}})) == ["p3"]
+
+    def test_filters_combine_with_and(self, index):
+        filters = {"ward": "Dalston", "age": {"max": 45}}
+        assert ids(index.query(filters)) == ["p1", "p2"]
+        assert index.count(filters) == 2
+
+    def test_unmatched_value(self, index):
+        assert index.query({"ward": "Shoreditch"}) == []
+
+    def test_count_by(self, index):
+        assert index.count_by("ward", {"tenure": "owner"}) == {"Dalston": 2}
+
+    def test_crosstab(self, index):
+        table = index.crosstab("ward", "tenure")
+        assert table["Dalston"] == {"private_rented": 1, "owner": 2}
+        assert table["Hackney Central"] == {"social_rented": 1, "private_rented": 1}
+
+    def test_non_scalar_fields_not_indexed(self, index):
+        assert "tags" not in index.fields
+
+    def test_unknown_field(self, index):
+        with pytest.raises(InvalidFilterError):
+            index.query({"income": 1})
+
+    def test_range_on_text_field(self, index):
+        with pytest.raises(InvalidFilterError):
+            index.query({"ward": {"min": 1}})
+
+    def test_bad_range_keys(self, index):
+        with pytest.raises(InvalidFilterError):
+            index.query({"age": {"from": 1}})
+
+    def test_query_personas(self):
+        assert ids(query_personas(RECORDS, {"age": {"min": 60}})) == ["p3"]
+
+    def test_free_text_not_indexed(self):
+        index = PersonaIndex([{"id": "p1", "name": "Ada", "personality_sketch": "Chatty."}])
+        assert "name" not in index.fields
+        assert "personality_sketch" not in index.fields
+        with pytest.raises(InvalidFilterError):
+            index.query({"name": "Ada"})
+
+    def test_booleans_and_integers_kept_apart(self):
+        index = PersonaIndex([{"id": "p1", "flag": True}, {"id": "p2", "flag": 1}])
+        assert ids(index.query({"flag": True})) == ["p1"]
+        assert ids(index.query({"flag": 1})) == ["p2"]
+        assert ids(index.query({"flag": {"min": 1}})) == ["p2"]
+
+    def test_booleans_and_integers_counted_apart(self):
+        index = PersonaIndex(
+            [{"id": "p1", "flag": True}, {"id": "p2", "flag": 1}, {"id": "p3", "flag": 1}]
+        )
+        assert index.count_by("flag") == {1: 2, "true": 1}
+        assert index.crosstab("flag", "id") == {"true": {"p1": 1}, 1: {"p2": 1, "p3": 1}}
+
+    @pytest.mark.parametrize(
+        "value", [[["x"]], [{"min": 1}], ["owner", ["x"]], ("owner",), {"min": 1}.items()]
+    )
+    def test_non_scalar_values_rejected(self, index, value):
+        with pytest.raises(InvalidFilterError):
+            index.query({"tenure": value})
+
+    def test_range_bounds_must_be_numbers(self, index):
+        with pytest.raises(InvalidFilterError):
+            index.query({"age": {"min": "30"}})
+
+    def test_large_population(self):
+        records = [{"id": f"p{i}", "even": i % 2 == 0} for i in range(100_000)]
+        matches = PersonaIndex(records).query({"even": True})
+        assert len(matches) == 50_000
+        assert matches[-1]["id"] == "p99998"
@@ -0,0 +1,448 @@
+"""Tests for centuria.api.server module."""
+
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+import centuria.survey.executor as executor
+from centuria.api import server
+from centuria.api.admission import AdmissionController
+from centuria.api.datasets import Dataset, file_version
+from centuria.config import MAX_PERSONA_BATCH
+from centuria.data.bundle import index_path, pack_directory
+from centuria.llm.client import (
+    CompletionResult,
+    DeadlineExceeded,
+    StructuredOutputError,
+    _remaining_time,
+)
+from centuria.persona.occupations import OccupationClassifier
+from centuria.survey import SurveyEstimate
+
+DESIGN = {
+    "winning_option": "Community garden",
+    "design_choices": [{"question": "Seating?", "answer": "Benches"}],
+}
+
+
+@pytest.fixture(autouse=True)
+def image_paths(monkeypatch, tmp_path):
+    plot = tmp_path / "plot_1.png"
+    plot.write_bytes(b"\x89PNG plot")
+    monkeypatch.setattr(server, "_plot_image_path", lambda: plot)
+    monkeypatch.setattr(server, "_image_cache_dir", tmp_path / "images")
+
+
+@pytest.fixture(autouse=True)
+def jobs_db(monkeypatch, tmp_path):
+    # The app lifespan opens the job file; keep it out of the repo
+    monkeypatch.setattr(server, "_jobs_db_path", tmp_path / "jobs.sqlite3")
+
+
+@pytest.fixture
+def client():
+    # The session cookie is secure-only, so talk to the app over https
+    with TestClient(server.app, base_url="https://testserver") as client:
+        client.post("/api/keys/set", json={"gemini_key": "g-test"})
+        yield client
+
+
+@pytest.fixture
+def generations(monkeypatch):
+    calls = []
+
+    async def fake_generate(api_key, prompt, source):
+        calls.append((api_key, prompt, len(source)))
+        return b"\x89PNG fake"
+
+    monkeypatch.setattr(server, "_generate_design_image", fake_generate)
+    return calls
+
+
+class TestGenerateImage:
+    def test_returns_url_to_cached_image(self, client, generations):
+        body = client.post("/api/generate-image", json=DESIGN).json()
+        assert body["image_url"].startswith("/api/images/")
+        assert "Benches" in body["prompt_used"]
+
+        image = client.get(body["image_url"])
+        assert image.status_code == 200
+        assert image.content == b"\x89PNG fake"
+        assert "immutable" in image.headers["cache-control"]
+
+    def test_repeat_design_is_served_from_cache(self, client, generations):
+        first = client.post("/api/generate-image", json=DESIGN).json()
+        second = client.post("/api/generate-image", json=DESIGN).json()
+        assert first == second
+        assert len(generations) == 1
+        assert generations[0][2] == len(b"\x89PNG plot")
+
+    def test_different_design_gets_new_image(self, client, generations):
+        client.post("/api/generate-image", json=DESIGN)
+        other = {**DESIGN, "winning_option": "Playground"}
+        client.post("/api/generate-image", json=other)
+        assert len(generations) == 2
+
+    def test_requires_gemini_key(self, generations):
+        with TestClient(server.app, base_url="https://testserver") as client:
+            body = client.post("/api/generate-image", json=DESIGN).json()
+        assert body == {"error": "Gemini API key not configured"}
+        assert generations == []
+
+    def test_unknown_image(self, client):
+        assert client.get(f"/api/images/{'0' * 64}.png").status_code == 404
+        assert client.get("/api/images/..%2F..%2Fsecret.png").status_code == 404
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n", 1)
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Fake complete(): numbered personas, with occupations taken from a list."""
+    # No aliases, so only category names are known up front
+    monkeypatch.setattr(server, "_occupation_classifier", OccupationClassifier(aliases={}))
+    calls = []
+    occupations = iter(["Zyxer", "Student", "Qwopper", "Zyxer", "Potter", "Qwopper", "Vumble"] * 5)
+
+    async def complete(prompt, model=None, api_keys=None, response_model=None, **kwargs):
+        calls.append(prompt)
+        await asyncio.sleep(0.001)
+        if prompt == server.PERSONA_GENERATION_PROMPT:
+            occupation = next(occupations)
+            if occupation == "Potter":
+                content = "not json"
+            else:
+                content = json.dumps({**PERSON, "occupation": occupation})
+        else:
+            count = prompt.count(": A person")
+            content = json.dumps(["Nurse/Nursing"] * count)
+        result = CompletionResult(content=content, prompt_tokens=1, completion_tokens=1, cost=0.0)
+        if response_model is not None:
+            try:
+                result.parsed = response_model.model_validate_json(content)
+            except ValidationError as e:
+                raise StructuredOutputError(str(e), content=content) from e
+        return result
+
+    monkeypatch.setattr(server, "complete", complete)
+    return calls
+
+
+PERSON = {
+    "name": "Ada Example",
+    "age": 40,
+    "location": "Leeds",
+    "latitude": 53.8,
+    "longitude": -1.5,
+    "brief": "A person from Leeds.",
+}
+
+
+class TestGeneratePersonas:
+    def test_streams_classified_personas(self, client, llm):
+        response = client.post("/api/generate-personas?n=7", json={"model": "gpt-4o-mini"})
+        assert response.status_code == 200
+        events = _events(response.text)
+
+        personas = [data for event, data in events if event == "persona"]
+        assert len(personas) == 6
+        assert [event for event, _ in events].count("failed") == 1
+        assert events[-1] == (
+            "summary",
+            {
+                "requested": 7,
+                "generated": 6,
+                "failed": 1,
+                "detail": None,
+            },
+        )
+        students = [p for p in personas if p["occupation"] == "Student"]
+        assert students[0]["occupation_category"] == "Student"
+
+    def test_packs_classification_into_few_calls(self, client, llm):
+        client.post("/api/generate-personas?n=7")
+        generation = [c for c in llm if c == server.PERSONA_GENERATION_PROMPT]
+        classification = [c for c in llm if c != server.PERSONA_GENERATION_PROMPT]
+        assert len(generation) == 7
+        # "Student" is a category name, so only the others need the LLM
+        assert len(classification) == 1
+
+    def test_remembers_classified_occupations(self, client, llm):
+        client.post("/api/generate-personas?n=3")
+        llm.clear()
+        client.post("/api/generate-personas?n=3")
+        assert all(c == server.PERSONA_GENERATION_PROMPT for c in llm)
+
+    def test_reserves_repair_calls(self, client, llm, monkeypatch):
+        # 7 generations that may each need a repair call, plus one packed classification
+        monkeypatch.setattr(server, "_admission", AdmissionController(max_session_pending=14))
+        assert client.post("/api/generate-personas?n=7").status_code == 413
+        assert llm == []
+
+    def test_rejects_oversized_batch(self, client, llm):
+        response = client.post(f"/api/generate-personas?n={MAX_PERSONA_BATCH + 1}")
+        assert response.status_code == 422
+        assert llm == []
+
+
+class TestClassifyOccupations:
+    async def test_unparseable_answers_fall_back_to_other(self, monkeypatch):
+        monkeypatch.setattr(server, "_occupation_classifier", OccupationClassifier(aliases={}))
+
+        async def complete(prompt, model=None, api_keys=None, **kwargs):
+            return CompletionResult(
+                content='["Nurse/Nursing"]', prompt_tokens=1, completion_tokens=1, cost=0.0
+            )
+
+        monkeypatch.setattr(server, "complete", complete)
+        personas = [
+            server.GeneratedPersona(
+                **PERSON,
+                occupation=occupation,
+                occupation_category="Other",
+                gender="F",
+                education="BA",
+                political_leaning="Moderate",
+                country="UK",
+                continent="Europe",
+            )
+            for occupation in ("Zyxer", "Qwopper")
+        ]
+        assert await server.classify_occupations(personas, "gpt-4o-mini", {}) == [
+            "Nurse/Nursing",
+            "Other",
+        ]
+        assert server.classify_occupation_locally("zyxer") == "Nurse/Nursing"
+        assert server.classify_occupation_locally("Qwopper") is None
+
+
+def _survey(*names: str) -> dict:
+    return {
+        "question": {"question_id": "q1", "question_text": "Pick one", "options": ["A", "B"]},
+        "personas": [{"id": name.lower(), "name": name, "context": "ctx"} for name in names],
+    }
+
+
+@pytest.fixture
+def answers(monkeypatch):
+    """Fake survey calls: "Bad" fails, "Slow" runs out of time, everyone else picks A."""
+
+    async def complete(prompt, system=None, model=None, api_keys=None, timeout=None):
+        await asyncio.sleep(0.001)
+        if "You are Bad." in system:
+            raise RuntimeError("Rate limit exceeded")
+        if "You are Slow." in system:
+            raise DeadlineExceeded("LLM call ran past its deadline")
+        return CompletionResult(
+            content="CHOICE: A\nJUSTIFICATION: Why not", prompt_tokens=1, completion_tokens=1,
+            cost=0.5,
+        )
+
+    monkeypatch.setattr(executor, "complete", complete)
+
+
+class TestSurveyStream:
+    def test_streams_responses_then_summary(self, client, answers):
+        response = client.post("/api/survey/run/stream", json=_survey("Ann", "Bob", "Cat"))
+        events = _events(response.text)
+        assert [event for event, _ in events].count("response") == 3
+        event, summary = events[-1]
+        assert event == "summary"
+        assert summary["tallies"] == {"A": 3}
+        assert summary["total_cost"] == 1.5
+        assert summary["failed"] == 0
+
+    def test_failed_persona_does_not_end_stream(self, client, answers):
+        response = client.post("/api/survey/run/stream", json=_survey("Ann", "Bad", "Cat"))
+        events = _events(response.text)
+        failures = [data for event, data in events if event == "failed"]
+        assert failures == [
+            {"persona_id": "bad", "persona_name": "Bad", "detail": "Rate limit exceeded"}
+        ]
+        event, summary = events[-1]
+        assert event == "summary"
+        assert summary["completed"] == 2 and summary["failed"] == 1
+
+    def test_deadline_ends_stream_with_error(self, client, answers):
+        response = client.post("/api/survey/run/stream", json=_survey("Slow", "Ann"))
+        event, error = _events(response.text)[-1]
+        assert event == "error"
+        assert "deadline" in error["detail"]
+
+
+@pytest.fixture
+def estimates(monkeypatch):
+    """Fake cost estimates, recording the sample persona."""
+    personas = []
+
+    def estimate(persona, survey, num_agents=1, model=None):
+        personas.append(persona)
+        return SurveyEstimate(
+            prompt_tokens=100, completion_tokens=10, cost_per_agent=0.01, num_agents=num_agents
+        )
+
+    monkeypatch.setattr(server, "estimate_survey_cost", estimate)
+    return personas
+
+
+class TestEstimateSurvey:
+    def _request(self, **fields) -> dict:
+        return {"question": _survey()["question"], "num_personas": 10, **fields}
+
+    def test_inline_persona(self, client, estimates):
+        persona = {"id": "ann", "name": "Ann", "context": "ctx"}
+        response = client.post("/api/survey/estimate", json=self._request(sample_persona=persona))
+        assert response.status_code == 200
+        assert response.json()["total_cost"] == pytest.approx(0.1)
+        assert estimates[0].name == "Ann"
+
+    def test_inline_persona_wins_over_population(self, client, estimates):
+        persona = {"id": "ann", "name": "Ann", "context": "ctx"}
+        request = self._request(sample_persona=persona, population_id="dalston")
+        assert client.post("/api/survey/estimate", json=request).status_code == 200
+        assert estimates[0].name == "Ann"
+
+    @pytest.mark.parametrize(
+        "fields", [{}, {"sample_persona_id": "p1"}], ids=["no-persona", "no-population"]
+    )
+    def test_incomplete_reference_is_422(self, client, estimates, fields):
+        response = client.post("/api/survey/estimate", json=self._request(**fields))
+        assert response.status_code == 422
+        assert estimates == []
+
+
+class TestSurveyJobs:
+    def test_failed_persona_reported_separately(self, client, answers):
+        job = client.post("/api/jobs/survey", json=_survey("Ann", "Bad", "Cat")).json()
+        for _ in range(200):
+            body = client.get(f"/api/jobs/{job['job_id']}").json()
+            if body["status"] == "completed":
+                break
+            time.sleep(0.01)
+        assert body["status"] == "completed"
+        assert sorted(r["persona_name"] for r in body["responses"]) == ["Ann", "Cat"]
+        assert body["failures"] == [
+            {"persona_id": "bad", "persona_name": "Bad", "detail": "Rate limit exceeded"}
+        ]
+
+
+class FakeRequest:
+    """Reports the client as disconnected after ``connected_for`` seconds."""
+
+    def __init__(self, connected_for: float = 60):
+        self.disconnect_at = asyncio.get_running_loop().time() + connected_for
+
+    async def is_disconnected(self) -> bool:
+        return asyncio.get_running_loop().time() >= self.disconnect_at
+
+
+class TestRunCancellable:
+    async def test_returns_result(self):
+        async def work():
+            return 42
+
+        assert await server.run_cancellable(FakeRequest(), work()) == 42
+
+    async def test_disconnect_cancels_work(self, monkeypatch):
+        monkeypatch.setattr(server, "DISCONNECT_POLL_INTERVAL", 0.01)
+        cancelled = []
+
+        async def call(i):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(i)
+                raise
+
+        async def work():
+            await asyncio.gather(call(1), call(2))
+
+        with pytest.raises(HTTPException) as exc:
+            await server.run_cancellable(FakeRequest(connected_for=0.02), work())
+        await asyncio.sleep(0)
+        assert exc.value.status_code == 499
+        assert sorted(cancelled) == [1, 2]
+
+    async def test_deadline_exceeded_is_504(self):
+        async def work():
+            raise DeadlineExceeded("LLM call ran past its deadline")
+
+        with pytest.raises(HTTPException) as exc:
+            await server.run_cancellable(FakeRequest(), work())
+        assert exc.value.status_code == 504
+
+    async def test_timeout_reaches_llm_calls(self, monkeypatch):
+        seen = []
+
+        async def complete(prompt, system=None, model=None, api_keys=None, timeout=None):
+            # What the real complete() would allow the call
+            seen.append(_remaining_time(timeout))
+            return CompletionResult(
+                content="CHOICE: A", prompt_tokens=1, completion_tokens=1, cost=0.0
+            )
+
+        monkeypatch.setattr(executor, "complete", complete)
+        persona = server.Persona(id="p", name="Ann", context="ctx")
+        question = server.Question(
+            id="q", text="Pick", question_type="single_select", options=["A"]
+        )
+
+        async def work():
+            return await asyncio.gather(server.ask_question(persona, question))
+
+        await server.run_cancellable(FakeRequest(), work(), timeout=5)
+        assert 0 < seen[0] <= 5
+
+    def test_survey_run_past_deadline_is_504(self, client, answers):
+        response = client.post("/api/survey/run", json=_survey("Ann", "Slow"))
+        assert response.status_code == 504
+
+
+@pytest.fixture
+def population(monkeypatch, tmp_path):
+    """A one-persona population folder, not yet packed."""
+    root = tmp_path / "population"
+    (root / "personas" / "p1").mkdir(parents=True)
+    (root / "personas" / "p1" / "notes.md").write_text("From the folder")
+    bundle = root / "personas.bundle"
+    monkeypatch.setattr(server, "_dalston_dir", root)
+    monkeypatch.setattr(server, "_dalston_bundle", bundle)
+    monkeypatch.setattr(
+        server,
+        "_dalston_bundle_index",
+        Dataset(server._load_bundle_index, lambda: file_version(index_path(bundle))),
+    )
+    monkeypatch.setattr(server, "_persona_files", {})
+    return root
+
+
+class TestPersonaFiles:
+    def test_served_from_folder(self, client, population):
+        files = client.get("/api/persona-files/p1").json()["files"]
+        assert files == [{"name": "notes.md", "content": "From the folder"}]
+
+    def test_bundle_packed_later_is_served(self, client, population):
+        client.get("/api/persona-files/p1")
+        (population / "personas" / "p1" / "notes.md").write_text("From the bundle")
+        pack_directory(population / "personas", population / "personas.bundle")
+        (population / "personas" / "p1" / "notes.md").write_text("Stale folder copy")
+
+        files = client.get("/api/persona-files/p1").json()["files"]
+        assert files == [{"name": "notes.md", "content": "From the bundle"}]
+
+
+class TestQueryPopulation:
+    def test_negative_limit_is_422(self, client):
+        response = client.post("/api/personas/dalston/query", json={"limit": -1})
+        assert response.status_code == 422
@@ -0,0 +1,107 @@
+"""Tests for centuria.api.sessions module."""
+
+import pytest
+
+from centuria.api.sessions import (
+    MemorySessionStore,
+    SQLiteSessionStore,
+    create_session_store,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path, clock):
+    if request.param == "memory":
+        yield MemorySessionStore(ttl=60, max_entries=3, clock=clock)
+    else:
+        store = SQLiteSessionStore(tmp_path / "sessions.sqlite3", ttl=60, clock=clock)
+        yield store
+        store.close()
+
+
+class TestSessionStore:
+    def test_keys_are_per_session(self, store):
+        a, b = store.create(), store.create()
+        store.set_key(a, "openai", "sk-a")
+        store.set_key(a, "gemini", "g-a")
+        assert store.get_keys(a) == {"openai": "sk-a", "gemini": "g-a"}
+        assert store.get_keys(b) == {}
+
+    def test_unknown_session(self, store):
+        assert not store.touch("nope")
+        assert store.get_keys("nope") == {}
+
+    def test_expires_after_ttl(self, store, clock):
+        session_id = store.create()
+        store.set_key(session_id, "openai", "sk")
+        clock.now += 61
+        assert not store.touch(session_id)
+        assert store.get_keys(session_id) == {}
+
+    def test_use_extends_lifetime(self, store, clock):
+        session_id = store.create()
+        for _ in range(3):
+            clock.now += 40
+            assert store.touch(session_id)
+
+    def test_set_key_after_expiry_starts_fresh(self, store, clock):
+        session_id = store.create()
+        store.set_key(session_id, "openai", "old")
+        clock.now += 61
+        store.set_key(session_id, "gemini", "new")
+        assert store.get_keys(session_id) == {"gemini": "new"}
+
+
+class TestMemorySessionStore:
+    def test_evicts_least_recently_used(self, clock):
+        store = MemorySessionStore(ttl=60, max_entries=2, clock=clock)
+        a, b = store.create(), store.create()
+        store.touch(a)
+        c = store.create()
+        assert len(store) == 2
+        assert store.touch(a) and store.touch(c)
+        assert not store.touch(b)
+
+
+class TestSQLiteSessionStore:
+    def test_shared_between_connections(self, tmp_path):
+        path = tmp_path / "sessions.sqlite3"
+        first, second = SQLiteSessionStore(path), SQLiteSessionStore(path)
+        session_id = first.create()
+        first.set_key(session_id, "anthropic", "sk-ant")
+        assert second.get_keys(session_id) == {"anthropic": "sk-ant"}
+        first.close()
+        second.close()
+
+    def test_file_private(self, tmp_path):
+        store = SQLiteSessionStore(tmp_path / "sessions.sqlite3")
+        assert store.path.stat().st_mode & 0o077 == 0
+        store.close()
+
+
+class TestCreateSessionStore:
+    def test_backend_from_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("SESSION_BACKEND", "sqlite")
+        store = create_session_store(tmp_path / "s.sqlite3")
+        assert isinstance(store, SQLiteSessionStore)
+        store.close()
+        monkeypatch.delenv("SESSION_BACKEND")
+        assert isinstance(create_session_store(tmp_path / "s.sqlite3"), MemorySessionStore)
+
+    def test_unknown_backend(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("SESSION_BACKEND", "redis")
+        with pytest.raises(ValueError):
+            create_session_store(tmp_path / "s.sqlite3")
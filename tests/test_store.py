@@ -0,0 +1,157 @@
+"""Tests for centuria.store module."""
+
+import json
+
+import pytest
+
+from centuria.store import InvalidFilterError, PopulationStore
+
+HOUSEHOLDS = [
+    {
+        "id": "hh_001",
+        "address": {"street": "Elm Road", "number": "1"},
+        "tenure": "owner",
+        "members": [
+            {"id": "hh_001_p1", "name": "Ada", "age": 34, "relationship": "head"},
+            {"id": "hh_001_p2", "name": "Bea", "age": 71, "relationship": "parent"},
+        ],
+    },
+    {
+        "id": "hh_002",
+        "address": {"street": "Oak Lane", "number": "7"},
+        "tenure": "private_rented",
+        "members": [{"id": "hh_002_p1", "name": "Cai", "age": 25, "relationship": "head"}],
+    },
+]
+
+PERSONAS = [
+    {"id": "hh_001_p1", "name": "Ada", "age": 34, "occupation": "nurse",
+     "household_id": "hh_001", "address": "1 Elm Road", "tenure": "owner"},
+    {"id": "hh_001_p2", "name": "Bea", "age": 71, "occupation": "retired",
+     "household_id": "hh_001", "address": "1 Elm Road", "tenure": "owner"},
+    {"id": "hh_002_p1", "name": "Cai", "age": 25, "occupation": "barista",
+     "household_id": "hh_002", "address": "7 Oak Lane", "tenure": "private_rented"},
+]
+
+
+@pytest.fixture
+def source(tmp_path):
+    directory = tmp_path / "population"
+    directory.mkdir()
+    (directory / "neighbourhood.json").write_text(
+        json.dumps({"name": "Test", "total_residents": 3, "households": HOUSEHOLDS}, indent=2)
+    )
+    (directory / "personas.json").write_text(json.dumps(PERSONAS, indent=2))
+    enriched = [
+        {**p, "rich_context": f"{p['name']} context", "has_synthetic_files": p["age"] < 70}
+        for p in PERSONAS
+    ]
+    (directory / "personas_enriched.json").write_text(json.dumps(enriched, indent=2))
+    folder = directory / "personas" / "hh_001_p1"
+    folder.mkdir(parents=True)
+    (folder / "cv.txt").write_text("Nurse at Homerton.")
+    (folder / "identity.json").write_text('{"name": "Ada"}')
+    return directory
+
+
+@pytest.fixture
+def store(tmp_path, source):
+    store = PopulationStore(tmp_path / "store.sqlite3")
+    store.import_directory(source)
+    yield store
+    store.close()
+
+
+class TestImport:
+    def test_keyed_lookup(self, store):
+        assert store.get_persona("hh_001_p2")["occupation"] == "retired"
+        assert store.get_persona("missing") is None
+
+    def test_household_members(self, store):
+        household = store.get_household("hh_001")
+        assert household["tenure"] == "owner"
+        assert [m["relationship"] for m in household["members"]] == ["head", "parent"]
+
+    def test_files_and_context(self, store):
+        assert store.files("hh_001_p1") == {
+            "cv.txt": "Nurse at Homerton.",
+            "identity.json": '{"name": "Ada"}',
+        }
+        assert store.get_context("hh_002_p1") == "Cai context"
+
+    def test_reimport_replaces(self, store, source):
+        assert store.import_directory(source) == 3
+        assert store.count() == 3
+
+
+class TestFilters:
+    def test_equality_and_range(self, store):
+        assert store.persona_ids({"tenure": "owner", "age": {"max": 40}}) == ["hh_001_p1"]
+
+    def test_any_of(self, store):
+        assert store.count({"occupation": ["nurse", "barista"]}) == 2
+
+    def test_survey_personas(self, store):
+        personas = store.survey_personas({"age": {"min": 30}})
+        assert [(p.id, p.context) for p in personas] == [
+            ("hh_001_p1", "Ada context"),
+            ("hh_001_p2", "Bea context"),
+        ]
+
+    def test_unknown_field(self, store):
+        with pytest.raises(InvalidFilterError):
+            store.personas({"shoe_size": 9})
+
+    def test_non_scalar_value(self, store):
+        with pytest.raises(InvalidFilterError):
+            store.personas({"tenure": [["owner"]]})
+
+
+class TestWrites:
+    def test_updating_persona_keeps_files_and_context(self, store):
+        store.put_persona({**PERSONAS[0], "occupation": "midwife"})
+        assert store.get_persona("hh_001_p1")["occupation"] == "midwife"
+        assert store.persona_ids()[0] == "hh_001_p1"
+        assert "cv.txt" in store.files("hh_001_p1")
+        assert store.get_context("hh_001_p1") == "Ada context"
+
+    def test_failed_transaction_rolls_back(self, store):
+        with pytest.raises(RuntimeError):
+            with store.transaction():
+                store.put_context("hh_001_p1", "changed")
+                raise RuntimeError
+        assert store.get_context("hh_001_p1") == "Ada context"
+
+    def test_survey_results(self, store):
+        store.add_survey_results(
+            "run1", "q1", [{"persona_id": "hh_001_p1", "response": "Garden"}]
+        )
+        store.add_survey_results("run2", "q1", [{"persona_id": "hh_002_p1", "response": "Park"}])
+        assert [r["response"] for r in store.survey_results(question_id="q1")] == [
+            "Garden",
+            "Park",
+        ]
+        assert store.survey_results(run_id="run2")[0]["persona_id"] == "hh_002_p1"
+
+
+class TestExport:
+    def test_round_trip_is_byte_identical(self, store, source, tmp_path):
+        out = tmp_path / "out"
+        store.export_directory(out)
+        for name in ("neighbourhood.json", "personas.json", "personas_enriched.json"):
+            assert (out / name).read_text() == (source / name).read_text()
+        assert (out / "personas" / "hh_001_p1" / "cv.txt").read_text() == "Nurse at Homerton."
+
+    def test_derived_files(self, store, tmp_path):
+        store.export_directory(tmp_path / "out")
+        cache = json.loads((tmp_path / "out" / "context_cache.json").read_text())
+        survey = json.loads((tmp_path / "out" / "personas_for_survey.json").read_text())
+        assert set(cache) == {"hh_001_p1", "hh_002_p1"}
+        assert survey[1] == {
+            "id": "hh_001_p2",
+            "name": "Bea",
+            "age": 71,
+            "occupation": "retired",
+            "address": "1 Elm Road",
+            "context": "Bea context",
+        }
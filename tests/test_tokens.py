@@ -0,0 +1,110 @@
+"""Tests for centuria.llm.tokens module."""
+
+import pytest
+
+from centuria.llm import tokens
+from centuria.llm.tokens import (
+    TRUNCATION_MARKER,
+    Tokenizer,
+    allocate_budget,
+    chunk_text,
+    count_tokens,
+    fit_sections,
+    join_sections,
+    split_sections,
+    truncate_at_sentence,
+)
+
+
+class CharEncoding:
+    """One token per character, so counts are easy to reason about."""
+
+    def encode(self, text, disallowed_special=()):
+        return [ord(c) for c in text]
+
+    def decode(self, ids):
+        return "".join(chr(i) for i in ids)
+
+
+@pytest.fixture
+def per_char(monkeypatch):
+    monkeypatch.setattr(tokens, "get_tokenizer", lambda model=None: Tokenizer(CharEncoding()))
+
+
+class TestTokenizer:
+    def test_estimate_without_encoding(self):
+        tokenizer = Tokenizer(None)
+        assert not tokenizer.exact
+        assert tokenizer.count("") == 0
+        assert tokenizer.count("x" * 35) == 10
+        assert tokenizer.truncate("x" * 100, 10) == "x" * 35
+
+    def test_truncate_with_encoding(self):
+        tokenizer = Tokenizer(CharEncoding())
+        assert tokenizer.truncate("hello world", 5) == "hello"
+        assert tokenizer.truncate("hi", 5) == "hi"
+        assert tokenizer.truncate("hi", 0) == ""
+
+    def test_count_tokens(self):
+        # Exact or estimated, longer text costs more
+        assert 0 < count_tokens("hello") < count_tokens("hello " * 50)
+
+
+class TestChunkText:
+    def test_short_text_is_one_chunk(self, per_char):
+        assert chunk_text("Short.", 100) == ["Short."]
+
+    def test_breaks_at_paragraphs(self, per_char):
+        text = "First para.\n\nSecond para.\n\nThird para."
+        chunks = chunk_text(text, 30)
+        assert chunks == ["First para.\n\nSecond para.\n\n", "Third para."]
+
+    def test_breaks_long_paragraph_at_sentences(self, per_char):
+        text = "One sentence here. Another one here. And a third."
+        chunks = chunk_text(text, 20)
+        assert chunks == ["One sentence here. ", "Another one here. ", "And a third."]
+
+    def test_cuts_overlong_sentence(self, per_char):
+        chunks = chunk_text("x" * 25, 10)
+        assert chunks == ["x" * 10, "x" * 10, "x" * 5]
+
+    def test_chunks_rejoin_and_fit(self):
+        text = ("A sentence about the lido. " * 30 + "\n\n") * 50
+        chunks = chunk_text(text, 500)
+        assert "".join(chunks) == text
+        assert len(chunks) > 1
+        assert all(count_tokens(c) <= 500 for c in chunks)
+
+
+class TestTokenBudgets:
+    def test_split_and_join_sections(self):
+        text = "=== cv.txt ===\nNurse.\n\n=== notes.md ===\nSwims."
+        sections = split_sections(text)
+        assert sections == [("cv.txt", "Nurse."), ("notes.md", "Swims.")]
+        assert join_sections(sections) == text
+
+    def test_truncate_at_sentence(self, per_char):
+        text = "First sentence. Second sentence. Third one."
+        cut = truncate_at_sentence(text, 30)
+        assert cut == "First sentence." + TRUNCATION_MARKER
+        assert len(cut) <= 30
+        assert truncate_at_sentence(text, 100) == text
+
+    def test_allocate_budget_keeps_small_sections_whole(self):
+        # The small section fits; the rest is shared 3:1 between the big ones
+        assert allocate_budget([10, 1000, 1000], [1, 3, 1], 410) == [10, 300, 100]
+        assert allocate_budget([10, 20], [1, 1], 100) == [10, 20]
+        assert allocate_budget([10, 20], [1, 1], 0) == [0, 0]
+
+    def test_fit_sections_by_priority(self, per_char):
+        body = "A sentence about the lido. " * 20
+        text = join_sections([("cv.txt", body), ("notes.md", body)])
+        priority = {"cv.txt": 4, "notes.md": 1}.get
+        fitted = fit_sections(text, 300, priority=priority)
+        assert len(fitted) <= 300
+        (_, cv), (_, notes) = split_sections(fitted)
+        assert len(cv) > len(notes)
+        assert cv.endswith("lido." + TRUNCATION_MARKER)
+
+    def test_fit_sections_leaves_short_text(self, per_char):
+        assert fit_sections("=== cv.txt ===\nNurse.", 100) == "=== cv.txt ===\nNurse."
@@ -1,8 +1,24 @@
 """Tests for centuria.utils module."""
 
+import json
+import time
+
 import pytest
 
-from centuria.utils import extract_json_from_text, parse_json_response
+from centuria.utils import extract_json_from_text, parse_json_response, repair_json
+
+# A profile shaped like the extraction prompt's reply, with nested arrays of objects
+PROFILE = {
+    "name": "Ada Okafor",
+    "key_skills": ["triage", "phlebotomy"],
+    "jobs": [
+        {"role": "Staff nurse", "places": [{"name": "Homerton", "years": [2015, 2019]}]},
+        {
+            "role": "Ward sister",
+            "places": [{"name": "Barts", "notes": "Uses {braces} and \\\"quotes\\\""}],
+        },
+    ],
+}
 
 
 class TestParseJsonResponse:
@@ -33,6 +49,9 @@ class TestParseJsonResponse:
         result = parse_json_response(content)
         assert result == {"name": "Dave", "age": 40}
 
+    def test_falls_back_to_extraction(self):
+        assert parse_json_response('Here you go:\n{"name": "Eve",}') == {"name": "Eve"}
+
     def test_invalid_json_raises(self):
         with pytest.raises(Exception):
             parse_json_response("not json at all")
@@ -57,3 +76,75 @@ That's the data."""
     def test_no_json_returns_none(self):
         result = extract_json_from_text("Just some plain text here")
         assert result is None
+
+    def test_nested_arrays_of_objects(self):
+        text = f"Here is the profile:\n{json.dumps(PROFILE, indent=2)}\nLet me know!"
+        assert extract_json_from_text(text) == PROFILE
+
+    def test_first_value_wins(self):
+        assert extract_json_from_text('{"a": 1} and then {"b": 2}') == {"a": 1}
+        assert extract_json_from_text('Labels: ["Retail", "Other"]') == ["Retail", "Other"]
+
+    def test_skips_bracketed_prose(self):
+        text = 'As noted [above], the format is {name}. Result: {"name": "Test"}'
+        assert extract_json_from_text(text) == {"name": "Test"}
+
+    def test_unclosed_bracket_before_json(self):
+        assert extract_json_from_text('Reply [see below: {"name": "Test"}') == {"name": "Test"}
+
+    def test_brackets_inside_strings(self):
+        assert extract_json_from_text('x {"a": "}]", "b": "\\"{"} y') == {"a": "}]", "b": '"{'}
+
+    def test_brace_quoted_in_prose(self):
+        assert extract_json_from_text('text "quote {" then {"k": "v"}') == {"k": "v"}
+        assert extract_json_from_text('Use "{" or "[" like this: ["a", "b"]') == ["a", "b"]
+
+    def test_truncated_json_returns_none(self):
+        assert extract_json_from_text('{"name": "Test", "skills": [') is None
+
+
+class TestRepairJson:
+    def test_trailing_commas(self):
+        assert json.loads(repair_json('{"a": [1, 2, ], "b": {"c": 3,},}')) == {
+            "a": [1, 2],
+            "b": {"c": 3},
+        }
+
+    def test_commas_in_strings_kept(self):
+        assert repair_json('{"a": "x,]"}') == '{"a": "x,]"}'
+
+    def test_smart_quotes(self):
+        text = "{\u201cname\u201d: \u201cAda \u201cthe nurse\u201d Okafor\u201d}"
+        assert json.loads(repair_json(text)) == {"name": "Ada \u201cthe nurse\u201d Okafor"}
+
+    def test_raw_newlines_in_strings(self):
+        assert extract_json_from_text('{"a": "line one\nline two",}') == {
+            "a": "line one\nline two"
+        }
+
+
+class TestExtractJsonPerformance:
+    """Wall-clock budgets for long LLM replies; the scan is linear, so these are generous."""
+
+    def test_multi_kb_reply(self):
+        prose = "The profile below is based on the files provided. " * 200
+        text = f"{prose}\n```json\n{json.dumps([PROFILE] * 200, indent=2)}\n```\n{prose}"
+        assert len(text) > 100_000
+        start = time.perf_counter()
+        assert extract_json_from_text(text) == [PROFILE] * 200
+        assert time.perf_counter() - start < 0.5
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "{" * 50_000,
+            "[{" * 25_000 + "]" * 25_000,
+            '{"a": ' * 20_000 + "1",
+            "{ " + "x " * 50_000,
+        ],
+        ids=["open-braces", "mismatched", "truncated", "unclosed-prose"],
+    )
+    def test_pathological_input(self, text):
+        start = time.perf_counter()
+        assert extract_json_from_text(text) is None
+        assert time.perf_counter() - start < 0.5